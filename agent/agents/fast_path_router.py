@@ -0,0 +1,181 @@
+"""
+Fast-Path Router: Resolves confirmations, denials, simple slot answers and
+trivial turns with rules, so the Parsing Agent's LLM call is only made when
+the rules are not confident.
+"""
+
+import re
+from typing import Optional
+
+from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+
+log = get_logger("fast_path_router")
+
+CONFIRM_WORDS = [
+    "yes", "yeah", "yep", "yup", "sure", "correct", "right", "confirm",
+    "save", "save it", "log it", "that's right", "ok", "okay", "sounds good",
+    "perfect", "do it", "alright", "all right", "no problem", "no worries",
+]
+# Denials that hold anywhere in the reply, even after a yes ("yes, cancel it")
+DENY_WORDS = [
+    "nope", "nah", "wrong", "incorrect", "cancel", "don't", "not right",
+    "not correct", "wait", "but",
+]
+# Words that only deny as the first thing said ("no, change the weight");
+# later on they are usually harmless ("yep no problem", "nothing to change")
+LEADING_DENY_WORDS = ["no", "change", "actually", "hold on", "hang on"]
+DENY_RE = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in DENY_WORDS) + r")\b")
+SMALL_TALK = [
+    "hi", "hello", "hey", "hey there", "what's up", "whats up", "yo",
+    "thanks", "thank you", "thanks a lot", "cool", "good morning",
+    "good evening", "good afternoon",
+]
+MUSCLE_GROUPS = [
+    "chest", "back", "legs", "shoulders", "arms", "biceps", "triceps",
+    "core", "abs", "glutes", "cardio", "full body",
+]
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "twenty five": 25, "thirty": 30,
+}
+# Words that may surround a slot answer without changing its meaning
+FILLER_WORDS = {
+    "i", "did", "do", "it", "was", "were", "with", "and", "um", "uh", "like",
+    "about", "the", "a", "of", "for", "at", "my", "then", "just", "so",
+    "maybe", "around", "roughly", "each", "per", "set", "sets", "rep",
+    "reps", "x", "times", "on", "worked", "day", "today", "please",
+}
+
+NUM = r"(\d+(?:\.\d+)?)"
+SETS_REPS_RE = re.compile(rf"{NUM}\s*(?:sets?\s*(?:of|x|by)?|x|by)\s*{NUM}(?:\s*reps?)?")
+SETS_RE = re.compile(rf"{NUM}\s*sets?")
+REPS_RE = re.compile(rf"{NUM}\s*reps?")
+WEIGHT_RE = re.compile(rf"{NUM}\s*(pounds?|lbs?|kgs?|kilos?|kilograms?)")
+DURATION_RE = re.compile(rf"{NUM}\s*(minutes?|mins?|hours?|hrs?)")
+
+
+def normalize_transcript(transcript: str) -> str:
+    """Lowercase, strip punctuation and convert number words to digits."""
+    text = transcript.lower().strip()
+    text = re.sub(r"[^\w\s'.]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    for word, value in sorted(NUMBER_WORDS.items(), key=lambda item: -len(item[0])):
+        text = re.sub(rf"\b{word}\b", str(value), text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _has_phrase(text: str, phrases: list) -> bool:
+    return any(re.search(rf"\b{re.escape(phrase)}\b", text) for phrase in phrases)
+
+
+def _starts_with(text: str, phrases: list) -> bool:
+    return any(re.match(rf"{re.escape(phrase)}\b", text) for phrase in phrases)
+
+
+def classify_confirmation(transcript: str) -> Optional[bool]:
+    """Return True for a confirmation, False for a denial, None if unclear."""
+    text = normalize_transcript(transcript)
+    denies = _has_phrase(text, DENY_WORDS)
+    # "not right" is a denial, not a "right"
+    confirms = _has_phrase(DENY_RE.sub(" ", text), CONFIRM_WORDS)
+
+    # The first words are the answer; the rest must not contradict them
+    if _starts_with(text, CONFIRM_WORDS):
+        return None if denies else True
+    if _starts_with(text, DENY_WORDS + LEADING_DENY_WORDS):
+        return None if confirms and not denies else False
+
+    if confirms != denies:
+        return confirms
+    return None
+
+
+def _to_number(value: str):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def extract_slots(transcript: str) -> tuple:
+    """Extract numeric workout slots and return (slots, leftover_words)."""
+    text = normalize_transcript(transcript)
+    slots = {}
+
+    match = SETS_REPS_RE.search(text)
+    if match:
+        slots["sets"] = _to_number(match.group(1))
+        slots["reps"] = _to_number(match.group(2))
+        text = text.replace(match.group(0), " ")
+    else:
+        for key, pattern in (("sets", SETS_RE), ("reps", REPS_RE)):
+            match = pattern.search(text)
+            if match:
+                slots[key] = _to_number(match.group(1))
+                text = text.replace(match.group(0), " ")
+
+    match = WEIGHT_RE.search(text)
+    if match:
+        unit = "kg" if match.group(2).startswith("k") else "pounds"
+        slots["weight"] = f"{match.group(1)} {unit}"
+        text = text.replace(match.group(0), " ")
+
+    match = DURATION_RE.search(text)
+    if match:
+        unit = "hours" if match.group(2).startswith("h") else "minutes"
+        slots["duration"] = f"{match.group(1)} {unit}"
+        text = text.replace(match.group(0), " ")
+
+    for muscle_group in MUSCLE_GROUPS:
+        if re.search(rf"\b{muscle_group}\b", text):
+            slots["muscle_group"] = muscle_group
+            text = re.sub(rf"\b{muscle_group}\b", " ", text)
+            break
+
+    leftover = [word for word in text.split() if word not in FILLER_WORDS]
+    return slots, leftover
+
+
+class FastPathRouter:
+    """Answers turns that don't need the Parsing Agent's LLM call."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def route(self, state: GymmandoState) -> Optional[dict]:
+        """Return an intent if the turn can be resolved by rules, else None."""
+        transcript = state.get("transcript", "")
+
+        # Clear answers to a confirmation request; the parser decides the rest
+        if state.get("pending_workout"):
+            confirmed = classify_confirmation(transcript)
+            if confirmed is None:
+                return None
+            return {"type": "confirm_workout", "data": {"confirmed": confirmed}}
+
+        # Slot answers while a workout is being collected
+        if state.get("collected_workout_data"):
+            slots, leftover = extract_slots(transcript)
+            if slots and not leftover:
+                return {"type": "log_workout", "data": slots}
+            return None
+
+        if normalize_transcript(transcript) in SMALL_TALK:
+            return {"type": "general_query", "data": {}}
+
+        return None
+
+    async def execute(self, state: GymmandoState) -> GymmandoState:
+        """Set the intent directly when the turn is unambiguous."""
+        intent = self.route(state)
+        if intent:
+            intent["source"] = "fast_path"
+            state["intent"] = intent
+            self.hits += 1
+            log.info("fast_path", intent_type=intent["type"])
+        else:
+            self.misses += 1
+        return state
@@ -0,0 +1,263 @@
+"""
+Greetings: A rotating pool of ready-made greetings per personality.
+
+Joining a room used to cost a full LLM generation plus TTS before the user
+heard anything. Now the greeting is picked from a pool, so it can be spoken
+immediately, and its audio is usually already in the TTS cache.
+
+Each personality's pool starts from a seed bank. The pool is saved to
+GREETING_POOL_PATH, so every job process on the host shares it. LiveKit runs
+one job per process, and each job checks the saved pool once, after its
+greeting. When the pool is older than GREETING_REFRESH_HOURS (default 24),
+that job regenerates it in the background with the LLM (`main_greeting_prompt`
++ `greeting_pool_prompt`). A lock file makes sure only one process does so at
+a time. The pool is therefore refreshed by the first session after it goes
+stale, not on a timer. A refresh costs one short LLM call per personality and
+the TTS for the new sentences, once per host per period. Set it to 0 to keep
+the seed greetings.
+
+A greeting can be personalized with cheap template slots. `$name` is filled
+from the participant's display name when it is a real name (not an email
+address or the API's "Gym User" placeholder), and `$last_workout` from
+history already loaded by prewarm. These go in a short opener sentence, and
+the pooled sentences stay the same for every user, so they are served from
+the audio cache.
+"""
+
+import fcntl
+import json
+import os
+import random
+import time
+from collections import deque
+from pathlib import Path
+from string import Template
+from typing import Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from llm.registry import concurrency_limit, get_chat_model
+from prompt_templates.prompt_template_loader import prompts
+from telemetry.logger import get_logger
+
+GREETING_MODEL = "gpt-4o-mini"
+DEFAULT_POOL_PATH = Path(__file__).parent.parent / "data" / "greetings.json"
+MAX_GREETING_CHARS = 200
+# Display names the API and agent fall back to when the user has no name
+PLACEHOLDER_NAMES = {"gym user", "user"}
+
+log = get_logger("greetings")
+
+SEED_GREETINGS = {
+    "bro": [
+        "YOOO what's up! I'm Gymmando, your gym bro AI! Ready to crush some goals today?",
+        "Let's gooo! Gymmando in the house. Tell me what you hit today and I'll log it!",
+        "What's good, bro! Gymmando here. Ready to stack another win on the board?",
+    ],
+    "coach": [
+        "Hello! I'm Gymmando, your fitness assistant. I'm here to help you track workouts and stay consistent.",
+        "Welcome! I'm Gymmando. Tell me about your session and I'll keep track of your progress.",
+        "Good to see you. I'm Gymmando, ready to log your training and keep you on track.",
+    ],
+    "commander": [
+        "ATTENTION! I'm Gymmando. I'm here to make sure you stay disciplined and hit your targets. No excuses.",
+        "Gymmando reporting. Give me your workout, soldier, and make it count.",
+        "On your feet! Gymmando here. Report your training, now.",
+    ],
+}
+
+# Personalized openers; the fields are filled per user
+OPENERS = {
+    "bro": {
+        "name": ["Yo $name!", "$name, my guy!"],
+        "last_workout": ["Last time you smashed $last_workout, bro!"],
+    },
+    "coach": {
+        "name": ["Welcome back, $name.", "Hi $name."],
+        "last_workout": ["Your last session was $last_workout."],
+    },
+    "commander": {
+        "name": ["$name! Front and center!"],
+        "last_workout": ["Last report: $last_workout."],
+    },
+}
+
+
+def _compile_openers(openers: dict) -> dict:
+    """Compile openers into Templates, validating every placeholder."""
+    compiled = {}
+    for personality, kinds in openers.items():
+        compiled[personality] = {}
+        for kind, phrases in kinds.items():
+            templates = [Template(phrase) for phrase in phrases]
+            for template in templates:
+                if not template.is_valid() or set(template.get_identifiers()) != {kind}:
+                    raise ValueError(f"Invalid opener for {personality}/{kind}: {template.template!r}")
+            compiled[personality][kind] = templates
+    return compiled
+
+
+COMPILED_OPENERS = _compile_openers(OPENERS)
+
+
+def valid_greeting(line: str) -> bool:
+    """Whether a generated line can go in the pool as-is."""
+    return (
+        0 < len(line) <= MAX_GREETING_CHARS
+        and not any(c in line for c in "${}")
+        and line[-1] in ".!?"
+    )
+
+
+def spoken_name(display_name: Optional[str], user_id: Optional[str] = None) -> Optional[str]:
+    """The first name to greet the user by, or None if the display name isn't a real name."""
+    name = (display_name or "").strip()
+    if not name or name == user_id or "@" in name or name.lower() in PLACEHOLDER_NAMES:
+        return None
+    first = name.split()[0]
+    return first if any(c.isalpha() for c in first) else None
+
+
+def describe_workout(workout: Optional[dict]) -> Optional[str]:
+    if not workout:
+        return None
+    muscle_group = workout.get("muscle_group")
+    if muscle_group and muscle_group != "general":
+        return f"{muscle_group} day"
+    return workout.get("name")
+
+
+class GreetingPool:
+    """Rotating per-personality greetings, refreshed in the background."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        pool_size: int = 8,
+        refresh_seconds: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.path = Path(path) if path else None
+        self.pool_size = pool_size
+        self.refresh_seconds = refresh_seconds
+        self.rng = rng or random.Random()
+        self.pools: dict = {}
+        self.generated_at = 0.0
+        self._set_pools(SEED_GREETINGS)
+        self.load()
+
+    def _set_pools(self, greetings: dict):
+        pools = {}
+        for mode, seeds in SEED_GREETINGS.items():
+            lines = [g for g in greetings.get(mode) or [] if valid_greeting(g)]
+            lines = lines[: self.pool_size]
+            # Seeds top the pool up when the LLM returned too few
+            lines += [g for g in seeds if g not in lines][: self.pool_size - len(lines)]
+            self.rng.shuffle(lines)
+            pools[mode] = deque(lines)
+        self.pools = pools
+
+    def load(self):
+        """Adopt the pool another process saved, if there is one."""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            self._set_pools(saved["greetings"])
+            self.generated_at = saved.get("generated_at", 0.0)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("greeting_pool_unreadable", path=str(self.path), error=str(e))
+
+    def _save(self, greetings: dict):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"generated_at": self.generated_at, "greetings": greetings}, indent=2))
+        os.replace(tmp_path, self.path)
+
+    def _claim_refresh(self):
+        """Lock the pool for a refresh; None if another process is refreshing it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock = open(self.path.with_suffix(".lock"), "w")
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return None
+        return lock
+
+    @property
+    def stale(self) -> bool:
+        return self.refresh_seconds > 0 and time.time() - self.generated_at >= self.refresh_seconds
+
+    def greeting(
+        self,
+        personality: str = "bro",
+        name: Optional[str] = None,
+        last_workout: Optional[str] = None,
+    ) -> str:
+        """Next greeting from the pool, with a personalized opener if fields are known."""
+        pool = self.pools.get(personality) or self.pools["bro"]
+        body = pool[0]
+        pool.rotate(-1)
+
+        openers = COMPILED_OPENERS.get(personality, COMPILED_OPENERS["bro"])
+        parts = []
+        if name:
+            parts.append(self.rng.choice(openers["name"]).substitute(name=name))
+        if last_workout:
+            parts.append(self.rng.choice(openers["last_workout"]).substitute(last_workout=last_workout))
+        return " ".join(parts + [body])
+
+    def all_greetings(self) -> list:
+        """Every pooled greeting, for pre-rendering audio."""
+        return [greeting for pool in self.pools.values() for greeting in pool]
+
+    async def refresh(self) -> bool:
+        """Generate a new pool with the LLM; keeps the current pool on failure."""
+        lock = None
+        if self.path:
+            lock = self._claim_refresh()
+            if lock is None:
+                log.info("greeting_refresh_skipped", reason="refresh_in_progress")
+                return False
+        try:
+            return await self._refresh()
+        finally:
+            if lock:
+                lock.close()
+
+    async def _refresh(self) -> bool:
+        llm = get_chat_model(GREETING_MODEL, temperature=0.9)
+        greetings = {}
+        try:
+            for mode in SEED_GREETINGS:
+                messages = [
+                    SystemMessage(content=prompts.render("main_greeting_prompt")),
+                    HumanMessage(content=prompts.render(
+                        "greeting_pool_prompt", count=self.pool_size, personality=mode,
+                    )),
+                ]
+                async with concurrency_limit(GREETING_MODEL):
+                    response = await llm.ainvoke(messages)
+                lines = [line.strip().strip('"') for line in str(response.content).splitlines()]
+                greetings[mode] = [line for line in lines if valid_greeting(line)]
+        except Exception as e:
+            log.warning("greeting_refresh_failed", error=str(e))
+            return False
+
+        self.generated_at = time.time()
+        self._set_pools(greetings)
+        self._save({mode: list(pool) for mode, pool in self.pools.items()})
+        log.info("greeting_pool_refreshed", sizes={mode: len(pool) for mode, pool in self.pools.items()})
+        return True
+
+
+def create_greeting_pool() -> GreetingPool:
+    """Create the greeting pool configured by environment variables."""
+    return GreetingPool(
+        path=Path(os.getenv("GREETING_POOL_PATH", DEFAULT_POOL_PATH)),
+        pool_size=int(os.getenv("GREETING_POOL_SIZE", "8")),
+        refresh_seconds=float(os.getenv("GREETING_REFRESH_HOURS", "24")) * 3600,
+    )
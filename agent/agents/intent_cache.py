@@ -0,0 +1,294 @@
+"""
+Intent Cache: Reuses parsed intents for transcripts users repeat often.
+
+Entries are keyed on the normalized transcript, expire after a TTL and are
+evicted least-recently-used beyond a size cap. Turns whose meaning depends
+on the conversation (a pending confirmation, a workout being collected, or
+words like "that" and "again") are never cached.
+
+livekit-agents runs each session in its own job process, so an in-memory
+cache alone would be discarded when the session ends. Entries are therefore
+also written to a shared on-disk store (INTENT_CACHE_DIR), one JSON file per
+transcript, which every job process on the host reads. A new process loads
+the newest entries when it is prewarmed, and a memory miss checks the store
+for intents cached by other sessions since.
+
+An optional similarity tier matches near-identical phrasings ("show my
+workouts" / "show me my workouts") using a local embedding function. It only
+serves intents without extracted entities, and is skipped for transcripts
+that mention numbers or muscle groups, so "show my leg workouts" is never
+answered with a cached "show my workouts".
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import os
+import re
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from agents.fast_path_router import MUSCLE_GROUPS, normalize_transcript
+from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "intent_cache"
+
+log = get_logger("intent_cache")
+
+CONTEXT_WORDS = [
+    "that", "this", "it", "them", "those", "same", "again", "last one",
+    "previous", "instead", "too", "also",
+]
+MUSCLE_STEMS = {group.rstrip("s") for group in MUSCLE_GROUPS}
+
+
+def _mentions_entities(key: str) -> bool:
+    """Whether a normalized transcript carries entities a near match could drop."""
+    return any(
+        word.isdigit() or word.rstrip("s") in MUSCLE_STEMS for word in key.split()
+    )
+
+
+def hashed_ngram_embedding(text: str, dims: int = 256) -> List[float]:
+    """Cheap local embedding: hashed character trigrams, L2-normalized."""
+    vector = [0.0] * dims
+    padded = f"  {text}  "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode()) % dims] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0  # Removed by another process
+
+
+class SharedIntentStore:
+    """Parsed intents saved as JSON files, shared by the job processes on a host.
+
+    Files are named by a hash of the normalized transcript and written under a
+    temporary name first, so readers never see a partial entry. Every
+    `prune_every` writes, the directory is cut back to the newest
+    `max_entries` files.
+    """
+
+    def __init__(self, directory: Path, max_entries: int = 10000, prune_every: int = 100):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _parse(self, path: Path) -> Optional[dict]:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry
+
+    def read(self, key: str) -> Optional[dict]:
+        """The unexpired entry for a transcript: {"key", "intent", "expires_at"}."""
+        entry = self._parse(self._path(key))
+        return entry if entry and entry.get("key") == key else None
+
+    def write(self, key: str, intent: dict, expires_at: float):
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"key": key, "intent": intent, "expires_at": expires_at}))
+        os.replace(tmp_path, path)
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def newest(self, limit: int) -> list:
+        """Up to `limit` unexpired entries, newest first."""
+        entries = []
+        for path in sorted(self.directory.glob("*.json"), key=_mtime, reverse=True):
+            if len(entries) >= limit:
+                break
+            entry = self._parse(path)
+            if entry and "key" in entry and "intent" in entry:
+                entries.append(entry)
+        return entries
+
+    def prune(self):
+        files = sorted(self.directory.glob("*.json"), key=_mtime, reverse=True)
+        for path in files[self.max_entries:]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class IntentCache:
+    """TTL/LRU cache of parsed intents keyed on normalized transcripts."""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 3600,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = 0.92,
+        store: Optional[SharedIntentStore] = None,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.store = store
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, intent, vector)
+        # One thread keeps store reads and writes off the event loop
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-cache") if store else None
+
+        # Hit-rate metrics
+        self.hits = 0
+        self.shared_hits = 0
+        self.similarity_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        if store:
+            # Oldest first, so the newest entries end up most recently used
+            for entry in reversed(store.newest(max_size)):
+                self._remember(entry["key"], entry["intent"], entry["expires_at"])
+
+    def _cache_key(self, state: GymmandoState) -> Optional[str]:
+        """Normalized transcript, or None if the turn depends on context."""
+        if state.get("pending_workout") or state.get("collected_workout_data"):
+            return None
+        key = normalize_transcript(state.get("transcript", ""))
+        if not key:
+            return None
+        if any(re.search(rf"\b{re.escape(word)}\b", key) for word in CONTEXT_WORDS):
+            return None
+        return key
+
+    async def get(self, state: GymmandoState) -> Optional[dict]:
+        """Return a copy of the cached intent for this turn, if any."""
+        key = self._cache_key(state)
+        if key is None:
+            self.bypassed += 1
+            return None
+
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+        if entry:
+            del self._entries[key]
+
+        if self.store:
+            # Cached by another session since this process loaded the store
+            shared = await asyncio.get_running_loop().run_in_executor(self._io, self.store.read, key)
+            if shared:
+                self._remember(key, shared["intent"], shared["expires_at"])
+                self.shared_hits += 1
+                return copy.deepcopy(shared["intent"])
+
+        if self.embed_fn and not _mentions_entities(key):
+            intent = self._similar(key, now)
+            if intent:
+                self.similarity_hits += 1
+                return copy.deepcopy(intent)
+
+        self.misses += 1
+        return None
+
+    def contains(self, state: GymmandoState) -> bool:
+        """Whether `get` would hit this process's memory, without counting a lookup."""
+        key = self._cache_key(state)
+        entry = self._entries.get(key) if key else None
+        return bool(entry and entry[0] > time.monotonic())
+
+    def _similar(self, key: str, now: float) -> Optional[dict]:
+        vector = self.embed_fn(key)
+        best_score, best_intent = 0.0, None
+        for expires_at, intent, cached_vector in self._entries.values():
+            if expires_at <= now or cached_vector is None or intent.get("data"):
+                continue
+            score = sum(a * b for a, b in zip(vector, cached_vector))
+            if score > best_score:
+                best_score, best_intent = score, intent
+        if best_score >= self.similarity_threshold:
+            return best_intent
+        return None
+
+    def _remember(self, key: str, intent: dict, expires_at: float):
+        """Add an entry to the memory tier; `expires_at` is wall-clock time."""
+        vector = self.embed_fn(key) if self.embed_fn else None
+        self._entries[key] = (
+            time.monotonic() + (expires_at - time.time()),
+            copy.deepcopy(intent),
+            vector,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _write_shared(self, key: str, intent: dict, expires_at: float):
+        try:
+            self.store.write(key, intent, expires_at)
+        except OSError as e:
+            log.warning("intent_store_write_failed", error=str(e))
+
+    def put(self, state: GymmandoState, intent: dict):
+        """Cache a freshly parsed intent for this turn's transcript."""
+        key = self._cache_key(state)
+        if key is None or intent.get("malformed"):
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, intent, expires_at)
+        if self.store:
+            self._io.submit(self._write_shared, key, copy.deepcopy(intent), expires_at)
+
+    @property
+    def hit_rate(self) -> float:
+        served = self.hits + self.shared_hits + self.similarity_hits
+        lookups = served + self.misses
+        return served / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Counters for measuring saved LLM calls."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "similarity_hits": self.similarity_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def create_intent_cache() -> IntentCache:
+    """Create the intent cache configured by environment variables."""
+    use_embeddings = os.getenv("INTENT_CACHE_SIMILARITY", "0") == "1"
+    store = None
+    if os.getenv("INTENT_CACHE_SHARED", "1") == "1":
+        store = SharedIntentStore(
+            Path(os.getenv("INTENT_CACHE_DIR", DEFAULT_CACHE_DIR)),
+            max_entries=int(os.getenv("INTENT_CACHE_SHARED_SIZE", "10000")),
+        )
+    return IntentCache(
+        max_size=int(os.getenv("INTENT_CACHE_SIZE", "1024")),
+        ttl_seconds=float(os.getenv("INTENT_CACHE_TTL", "3600")),
+        embed_fn=hashed_ngram_embedding if use_embeddings else None,
+        store=store,
+    )
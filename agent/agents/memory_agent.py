@@ -2,8 +2,11 @@
 Memory Agent: Manages user context, history, and preferences.
 """
 
-from database.supabase_client import supabase
+from database.repository import repository
 from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+
+log = get_logger("memory_agent")
 
 
 class MemoryAgent:
@@ -11,7 +14,7 @@ class MemoryAgent:
 
     async def execute(self, state: GymmandoState) -> GymmandoState:
         """Retrieve relevant user context and history."""
-        print(f"🧠 Memory Agent: Loading user context")
+        log.debug("memory_context_loading", user_id=state.get("user_id"))
 
         # TODO: Query user preferences, PRs, injury history from Supabase
         # TODO: Retrieve recent workout/nutrition history
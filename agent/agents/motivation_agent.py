@@ -1,19 +1,42 @@
 """
 Motivation Agent: Adds personality, humor, and motivational tone to responses.
 Previously known as "Mocking Agent" - renamed to better reflect its purpose.
+
+The response is streamed: each text chunk is emitted on the graph's custom
+stream as `{"response_chunk": text}` as soon as the model produces it, so
+speech can start on the first sentence.
+
+Deterministic workout results (logged, pending confirmation, missing
+details, ...) are rendered from per-personality phrase banks without an LLM
+call. Set RESPONSE_LLM_STYLING=1 to style every turn with the LLM instead.
 """
 
-from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+import os
+from typing import Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.config import get_stream_writer
 
+from agents.response_templates import ResponseRenderer
 from graphs.types import GymmandoState
+from llm.registry import concurrency_limit, get_chat_model
+from prompt_templates.prompt_template_loader import prompts
+from telemetry.logger import get_logger
+
+MOTIVATION_MODEL = "gpt-4o-mini"
+
+log = get_logger("motivation_agent")
 
 
 class MotivationAgent:
     """Adds personality and motivational tone to responses."""
 
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.8)
+    def __init__(self, llm_styling: Optional[bool] = None):
+        self.llm = get_chat_model(MOTIVATION_MODEL, temperature=0.8)
+        self.renderer = ResponseRenderer()
+        if llm_styling is None:
+            llm_styling = os.getenv("RESPONSE_LLM_STYLING", "0") == "1"
+        self.llm_styling = llm_styling
 
         self.personalities = {
             "bro": """You're a loud, enthusiastic gym bro like Eddie Murphy. 
@@ -31,7 +54,15 @@ class MotivationAgent:
 
     async def execute(self, state: GymmandoState) -> GymmandoState:
         """Add personality and motivation to the response."""
-        print(f"💪 Motivation Agent: Adding {state['personality_mode']} personality")
+        writer = get_stream_writer()
+
+        if not self.llm_styling:
+            rendered = self.renderer.render(state)
+            if rendered:
+                writer({"response_chunk": rendered})
+                state["response"] = rendered
+                log.info("response_templated", personality=state["personality_mode"])
+                return state
 
         # Gather all context
         workout_data = state.get("workout_data", {})
@@ -68,6 +99,9 @@ class MotivationAgent:
                 context_parts.append(f"Now I need: {next_field}")
                 context_parts.append("IMPORTANT: Ask the user specifically for this one missing detail. Be friendly and conversational. After they provide it, we'll check for other missing details.")
 
+        if state.get("response"):
+            context_parts.append(f"What to tell the user: {state['response']}")
+
         if nutrition_data:
             context_parts.append(f"Nutrition: {nutrition_data.get('message')}")
 
@@ -82,19 +116,20 @@ class MotivationAgent:
             state["personality_mode"], self.personalities["bro"]
         )
 
-        prompt = f"""
-        {personality}
-        
-        Based on this context, generate a motivational response:
-        {context}
-        
-        Keep it short (2-3 sentences max). Be conversational, fun, and in character.
-        Match the personality mode perfectly.
-        """
-
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-        state["response"] = response.content
-
-        print(f"✅ Motivational response: {state['response'][:60]}...")
+        # The system prompt only varies by personality, so its bytes stay cacheable
+        messages = [
+            SystemMessage(content=prompts.render("motivation_system_prompt", personality=personality)),
+            HumanMessage(content=prompts.render("motivation_user_prompt", context=context)),
+        ]
+
+        chunks = []
+        async with concurrency_limit(MOTIVATION_MODEL):
+            async for chunk in self.llm.astream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    writer({"response_chunk": chunk.content})
+        state["response"] = "".join(chunks)
+
+        log.info("response_generated", personality=state["personality_mode"], chars=len(state["response"]))
         return state
 
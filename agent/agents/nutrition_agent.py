@@ -2,8 +2,11 @@
 Nutrition Agent: Handles meal logging and macro tracking.
 """
 
-from database.supabase_client import supabase
+from database.repository import repository
 from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+
+log = get_logger("nutrition_agent")
 
 
 class NutritionAgent:
@@ -14,7 +17,7 @@ class NutritionAgent:
         intent = state["intent"]
         data = intent.get("data", {})
 
-        print(f"🍗 Nutrition Agent: Processing nutrition request")
+        log.info("nutrition_request", intent_type=intent.get("type"))
 
         # TODO: Implement meal logging, macro tracking
         state["nutrition_data"] = {
@@ -1,55 +1,184 @@
 """
 Parsing Agent: Converts natural language into structured intents.
+
+The intent is requested as a `ParsedIntent` tool call and streamed. The
+intent `type` is the first field of the schema, so it is known before the
+entities finish streaming and `on_intent_type` can start follow-up work
+(such as history prefetch) early.
+
+Unless a workout is awaiting confirmation, the parse only depends on the
+transcript, so it can also be started speculatively on an interim STT
+hypothesis with `speculate`. When the graph reaches the parse node with a
+final transcript that normalizes to the same text, the speculative result is
+used; otherwise it is cancelled. Replies to a pending workout are parsed with
+that workout in the prompt, and never come from the cache or a speculation.
 """
 
+import asyncio
 import json
+import re
+import time
+from typing import Awaitable, Callable, Optional
 
-from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import ValidationError
 
+from agents.fast_path_router import normalize_transcript
+from agents.intent_cache import IntentCache, create_intent_cache
+from data_types.parsing_agent_types import ParsedIntent
 from graphs.types import GymmandoState
+from llm.registry import concurrency_limit, get_chat_model
+from prompt_templates.prompt_template_loader import prompts
+from telemetry.logger import get_logger
+from telemetry.tracing import telemetry
+
+TYPE_FIELD_RE = re.compile(r'"type"\s*:\s*"(\w+)"')
+PARSING_MODEL = "gpt-4o-mini"
+SPECULATION_TTL = 30.0  # Seconds a finished speculative parse stays usable
+
+log = get_logger("parsing_agent")
 
 
 class ParsingAgent:
     """Parses natural language into structured intents."""
 
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    def __init__(
+        self,
+        on_intent_type: Optional[Callable[[str, GymmandoState], Awaitable[None]]] = None,
+        intent_cache: Optional[IntentCache] = None,
+    ):
+        self.llm = get_chat_model(PARSING_MODEL, temperature=0)
+        self.structured_llm = self.llm.bind_tools(
+            [ParsedIntent], tool_choice="ParsedIntent"
+        )
+        self.on_intent_type = on_intent_type
+        self.intent_cache = intent_cache or create_intent_cache()
+
+        # user_id -> (normalized transcript, started_at, parse task)
+        self._speculations: dict = {}
+
+        # Parse quality metrics
+        self.parse_calls = 0
+        self.malformed_outputs = 0
+
+    def speculate(self, user_id: str, transcript: str):
+        """Start parsing an interim transcript before the user has finished."""
+        key = normalize_transcript(transcript)
+        current = self._speculations.get(user_id)
+        if current and current[0] == key:
+            return
+        self.cancel_speculation(user_id)
+        state = {"transcript": transcript, "user_id": user_id}
+        task = asyncio.create_task(self._parse(state))
+        self._speculations[user_id] = (key, time.monotonic(), task)
+        telemetry.add("speculation.started")
+        log.debug("speculation_started", transcript=transcript)
+
+    def cancel_speculation(self, user_id: str):
+        speculation = self._speculations.pop(user_id, None)
+        if speculation and not speculation[2].done():
+            speculation[2].cancel()
+
+    def _take_speculation(self, state: GymmandoState) -> Optional[asyncio.Task]:
+        """The speculative parse for this turn's transcript, if one matches."""
+        speculation = self._speculations.pop(state.get("user_id"), None)
+        if speculation is None:
+            return None
+        key, started_at, task = speculation
+        if key == normalize_transcript(state["transcript"]) and time.monotonic() - started_at < SPECULATION_TTL:
+            return task
+        task.cancel()
+        telemetry.add("speculation.missed")
+        return None
 
     async def execute(self, state: GymmandoState) -> GymmandoState:
         """Parse user transcript into structured intent."""
-        print(f"🧠 Parsing Agent: Processing '{state['transcript']}'")
-
-        prompt = f"""
-        You are a parsing agent for GYMMANDO, a gym and nutrition tracking assistant.
-        Parse the user's message into a structured intent.
-        
-        User message: "{state['transcript']}"
-        
-        Return JSON with:
-        - type: one of [log_workout, view_workouts, search_routines, log_meal, view_macros, general_query, change_personality]
-        - data: extracted entities (exercises, muscle_group, meals, etc.)
-        
-        For workout logging, extract:
-        - exercises (array of exercise names)
-        - muscle_group
-        - sets (number)
-        - reps (number)
-        - weight (string)
-        - duration (optional)
-        - notes (optional)
-        
-        Return ONLY valid JSON, no extra text.
-        """
-
-        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        log.debug("parse_start", transcript=state["transcript"])
 
-        try:
-            intent = json.loads(response.content)
-        except:
-            intent = {"type": "general_query", "data": {}}
+        if state.get("pending_workout"):
+            # The reply only makes sense next to the workout it answers
+            self.cancel_speculation(state.get("user_id"))
+            state["intent"] = await self._parse(state)
+            log.info("intent_parsed", intent_type=state["intent"]["type"], pending_workout=True)
+            return state
+
+        cached = await self.intent_cache.get(state)
+        if cached:
+            if self.on_intent_type:
+                await self.on_intent_type(cached["type"], state)
+            state["intent"] = cached
+            log.info("intent_cached", intent_type=cached["type"], hit_rate=round(self.intent_cache.hit_rate, 3))
+            return state
+
+        speculation = self._take_speculation(state)
+        if speculation is not None:
+            try:
+                intent = await speculation
+                telemetry.add("speculation.committed")
+                log.info("intent_speculated", intent_type=intent["type"])
+            except (asyncio.CancelledError, Exception):
+                # Speculation is best effort; parse the final transcript instead
+                if asyncio.current_task().cancelling():
+                    raise
+                intent = await self._parse(state)
+        else:
+            intent = await self._parse(state)
+
+        self.intent_cache.put(state, intent)
 
         state["intent"] = intent
-        print(f"✅ Parsed intent: {intent['type']}")
+        log.info("intent_parsed", intent_type=intent["type"])
         return state
 
+    @staticmethod
+    def user_prompt(state: GymmandoState) -> str:
+        """The user message for a parse, with the workout awaiting confirmation if any."""
+        workout = state.get("pending_workout")
+        if not workout:
+            return prompts.render("parsing_user_prompt", transcript=state["transcript"])
+        summary = (
+            f"{workout.get('muscle_group', 'general')} workout: "
+            f"{', '.join(workout.get('exercises', []))} ({workout.get('sets_reps', 'N/A')})"
+        )
+        return prompts.render("parsing_confirmation_prompt", transcript=state["transcript"], workout=summary)
+
+    async def _parse(self, state: GymmandoState) -> dict:
+        """Call the parsing LLM for the state's transcript."""
+        # Static instructions first so the provider can cache the prefix
+        messages = [
+            SystemMessage(content=prompts.render("parsing_system_prompt")),
+            HumanMessage(content=self.user_prompt(state)),
+        ]
+
+        self.parse_calls += 1
+        args = ""
+        intent_type = None
+        async with concurrency_limit(PARSING_MODEL):
+            async for chunk in self.structured_llm.astream(messages):
+                for tool_chunk in chunk.tool_call_chunks:
+                    args += tool_chunk.get("args") or ""
+                if intent_type is None:
+                    match = TYPE_FIELD_RE.search(args)
+                    if match:
+                        intent_type = match.group(1)
+                        if self.on_intent_type:
+                            await self.on_intent_type(intent_type, state)
+
+        try:
+            parsed = ParsedIntent.model_validate(json.loads(args))
+            intent = {
+                "type": parsed.type,
+                "data": parsed.data.model_dump(exclude_none=True),
+            }
+        except (json.JSONDecodeError, ValidationError) as e:
+            self.malformed_outputs += 1
+            telemetry.add("parse.malformed")
+            log.warning(
+                "parse_malformed",
+                error=type(e).__name__,
+                malformed=self.malformed_outputs,
+                calls=self.parse_calls,
+                output=args[:200],
+            )
+            intent = {"type": "general_query", "data": {}, "malformed": True}
+        return intent
@@ -0,0 +1,171 @@
+"""
+Response Templates: Per-personality phrase banks for deterministic workout replies.
+
+Every `workout_data["status"]` the Workout Agent produces has a phrase bank
+for each personality (bro, coach, commander). The banks are compiled into
+`string.Template`s once at import, and each placeholder is checked against
+the fields the renderer provides, so a typo fails at startup rather than
+mid-conversation. Free-form turns have no template and go to the LLM.
+"""
+
+import random
+from string import Template
+from typing import Optional
+
+from graphs.types import GymmandoState
+
+FIELDS = {
+    "muscle_group", "exercises", "sets_reps", "question", "count", "workouts",
+}
+
+PHRASE_BANKS = {
+    "bro": {
+        "logged": [
+            "YOOO, $muscle_group day is in the books! $exercises, $sets_reps. Beast mode!",
+            "Let's gooo! Logged your $muscle_group workout: $exercises, $sets_reps. Crushing it, bro!",
+        ],
+        "viewed": [
+            "Bro, you've got $count workout(s) on the board! $workouts. Keep stacking those wins!",
+            "Check it out, $count workout(s)! $workouts. You're a machine!",
+        ],
+        "viewed_empty": [
+            "Nothing logged yet, bro! Tell me what you crushed today and let's get that board started!",
+        ],
+        "pending_confirmation": [
+            "Alright bro, here's the lineup: $exercises for $muscle_group, $sets_reps. Should I lock it in?",
+            "YOOO, $exercises for $muscle_group, $sets_reps. That right? Say yes and it's logged!",
+        ],
+        "incomplete": [
+            "Almost there, bro! $question",
+            "Let's gooo, just one more thing. $question",
+        ],
+        "needs_correction": [
+            "No stress, bro! What do you want to change?",
+        ],
+        "error": [
+            "Ah man, something glitched on my end, bro. Try that again?",
+        ],
+    },
+    "coach": {
+        "logged": [
+            "Great work. Your $muscle_group session is logged: $exercises, $sets_reps. Keep it up.",
+            "Nicely done. I've recorded $exercises for $muscle_group, $sets_reps. Consistency is paying off.",
+        ],
+        "viewed": [
+            "You have $count workout(s) logged. $workouts. Good, steady progress.",
+        ],
+        "viewed_empty": [
+            "You don't have any workouts logged yet. Tell me about your next session and we'll start tracking your progress.",
+        ],
+        "pending_confirmation": [
+            "Let's confirm: $exercises for $muscle_group, $sets_reps. Shall I save it?",
+            "Here's what I have: $exercises for $muscle_group, $sets_reps. Is that correct?",
+        ],
+        "incomplete": [
+            "Good start. $question",
+            "Let's fill in one more detail. $question",
+        ],
+        "needs_correction": [
+            "No problem. What would you like to change?",
+        ],
+        "error": [
+            "Sorry, I couldn't complete that just now. Let's try again in a moment.",
+        ],
+    },
+    "commander": {
+        "logged": [
+            "LOGGED. $muscle_group: $exercises, $sets_reps. Now recover and come back STRONGER.",
+            "Workout recorded, soldier. $exercises, $sets_reps. Is that all you got? Next time, MORE.",
+        ],
+        "viewed": [
+            "$count workout(s) on record. $workouts. Good. Now go add another.",
+        ],
+        "viewed_empty": [
+            "ZERO workouts logged. UNACCEPTABLE. Get out there and report back!",
+        ],
+        "pending_confirmation": [
+            "Report: $exercises for $muscle_group, $sets_reps. Confirm, soldier!",
+            "$exercises, $muscle_group, $sets_reps. Is that accurate? Answer me!",
+        ],
+        "incomplete": [
+            "Incomplete report, soldier! $question",
+            "I need more. $question",
+        ],
+        "needs_correction": [
+            "Then fix it. What needs to change?",
+        ],
+        "error": [
+            "Equipment failure on my end. Repeat that, soldier!",
+        ],
+    },
+}
+
+
+def _compile(banks: dict) -> dict:
+    """Compile phrase banks into Templates, validating every placeholder."""
+    compiled = {}
+    for personality, statuses in banks.items():
+        compiled[personality] = {}
+        for key, phrases in statuses.items():
+            templates = [Template(phrase) for phrase in phrases]
+            for template in templates:
+                if not template.is_valid():
+                    raise ValueError(f"Invalid template for {personality}/{key}: {template.template!r}")
+                unknown = set(template.get_identifiers()) - FIELDS
+                if unknown:
+                    raise ValueError(f"Unknown fields {unknown} in {personality}/{key}")
+            compiled[personality][key] = templates
+    return compiled
+
+
+COMPILED_BANKS = _compile(PHRASE_BANKS)
+
+
+def _describe(workout: dict) -> dict:
+    return {
+        "muscle_group": workout.get("muscle_group") or "your",
+        "exercises": ", ".join(workout.get("exercises") or []) or "your exercises",
+        "sets_reps": workout.get("sets_reps") or "as performed",
+    }
+
+
+def template_key(workout_data: dict) -> Optional[str]:
+    """Phrase bank key for a workout result, or None for free-form turns."""
+    status = workout_data.get("status")
+    if status == "success":
+        if "workout" in workout_data:
+            return "logged"
+        if "workouts" in workout_data:
+            return "viewed" if workout_data["workouts"] else "viewed_empty"
+        return None
+    if status in ("pending_confirmation", "incomplete", "needs_correction", "error"):
+        return status
+    return None
+
+
+class ResponseRenderer:
+    """Renders deterministic workout replies from the compiled phrase banks."""
+
+    def __init__(self, banks: dict = COMPILED_BANKS, rng: Optional[random.Random] = None):
+        self.banks = banks
+        self.rng = rng or random.Random()
+
+    def render(self, state: GymmandoState) -> Optional[str]:
+        """Return the templated reply for this turn, or None if it needs the LLM."""
+        workout_data = state.get("workout_data") or {}
+        key = template_key(workout_data)
+        if key is None:
+            return None
+        bank = self.banks.get(state.get("personality_mode"), self.banks["bro"])
+
+        fields = dict.fromkeys(FIELDS, "")
+        fields.update(_describe(workout_data.get("workout") or {}))
+        workouts = workout_data.get("workouts") or []
+        fields["count"] = str(workout_data.get("total", len(workouts)))
+        fields["workouts"] = "; ".join(
+            f"{w.get('name', 'Workout')}: {', '.join(w.get('exercises') or [])}"
+            for w in workouts
+        )
+        fields["question"] = workout_data.get("message", "")
+
+        return self.rng.choice(bank[key]).substitute(fields)
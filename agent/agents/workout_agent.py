@@ -2,34 +2,71 @@
 Workout Agent: Handles workout logging and retrieval.
 """
 
-from datetime import datetime
+import asyncio
+import uuid
+from datetime import datetime, timezone
 
-from database.supabase_client import supabase
+from agents.fast_path_router import classify_confirmation
+from database.repository import SupabaseRepository, repository as default_repository
+from database.workout_history import WorkoutHistory
+from database.write_behind import WorkoutWriteQueue, create_write_queue
+from graphs.session_state import SessionStateManager, create_session_state
 from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+
+log = get_logger("workout_agent")
+
+# Fixed replies; spoken often enough that tts.prerender caches their audio
+MISSING_FIELD_PROMPTS = {
+    "exercises": "What exercises did you do? For example: bench press, squats, or deadlifts.",
+    "muscle group": "What muscle group did you work? For example: chest, legs, or back.",
+    "sets and reps": "How many sets and reps did you do? For example: 3 sets of 10 reps.",
+    "weight": "What weight did you use? For example: 225 pounds or 100 kg.",
+    "duration": "How long did your workout take? For example: 45 minutes.",
+    "rest time": "What was your rest time between sets? For example: 60 seconds.",
+}
+CORRECTION_PROMPT = "No problem! What would you like to change?"
+CONFIRM_AGAIN_PROMPT = "Sorry, I didn't catch that. Should I save this workout? Say 'yes' to save it or 'no' to change it."
 
 
 class WorkoutAgent:
-    """Handles workout logging and retrieval."""
+    """Handles workout logging and retrieval.
 
-    def __init__(self, user_id: str = "default_user"):
-        self.user_id = user_id
-        self.saved_workouts = []
-        self.pending_workout = None  # Store pending workout for confirmation
-        self.collected_workout_data = {}  # Store collected data across multiple turns
-        self._load_from_supabase()
+    One agent serves every turn in the job process. Conversation slots
+    (`pending_workout`, `collected_workout_data`) live in the graph state,
+    which the checkpointer persists per session; only the lazily loaded
+    history is cached here, bounded by the session state manager.
+    """
 
-    def _load_from_supabase(self):
-        """Load existing workouts from Supabase for the current user."""
-        if not supabase:
-            return
+    def __init__(
+        self,
+        repository: SupabaseRepository = default_repository,
+        write_queue: WorkoutWriteQueue = None,
+        sessions: SessionStateManager = None,
+    ):
+        self.repository = repository
+        self.write_queue = write_queue or create_write_queue(repository)
+        self.sessions = sessions if sessions is not None else create_session_state(repository)
+        self._prefetch_tasks: set = set()
+
+    def history_for(self, user_id: str) -> WorkoutHistory:
+        """Return the cached history view for a user."""
+        return self.sessions.history_for(user_id)
+
+    async def prewarm(self, user_id: str):
+        """Fetch the first page of recent history ahead of the first turn."""
         try:
-            # Filter workouts by user_id
-            response = supabase.table("workouts").select("*").eq("user_id", self.user_id).execute()
-            if response.data:
-                self.saved_workouts = response.data
-                print(f"✅ Loaded {len(self.saved_workouts)} workouts from Supabase for user {self.user_id}")
+            await self.history_for(user_id).recent()
         except Exception as e:
-            print(f"⚠️  Error loading workouts: {e}")
+            log.warning("history_prewarm_failed", user_id=user_id, error=str(e))
+
+    def start_prefetch(self, user_id: str, intent_type: str):
+        """Start loading the data an intent will need, without waiting for it."""
+        if intent_type != "view_workouts":
+            return
+        task = asyncio.create_task(self.prewarm(user_id))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
 
     def _format_workout_summary(self, workout: dict) -> str:
         """Format workout data for confirmation message."""
@@ -44,56 +81,66 @@ class WorkoutAgent:
             summary_parts.append(f"**Notes:** {workout.get('notes')}")
         return "\n".join(summary_parts)
 
-    def _save_to_supabase(self, workout: dict) -> bool:
-        """Save workout to Supabase with user_id."""
-        if not supabase:
-            print("⚠️  Supabase not available, workout not persisted")
+    async def _save_to_supabase(self, workout: dict, user_id: str) -> bool:
+        """Journal the workout for a background batch insert into Supabase."""
+        if not self.repository.available:
+            log.warning("workout_not_persisted", reason="supabase_unavailable")
             return False
         try:
             # Ensure user_id is set
-            workout["user_id"] = self.user_id
-            # Don't set created_at manually - let database handle it with DEFAULT now()
-            # workout["created_at"] = datetime.now().isoformat()
-            
-            print(f"🔍 Attempting to save workout: {workout}")
-            response = supabase.table("workouts").insert(workout).execute()
-            
-            if response.data:
-                print(f"💾 ✅ Saved workout '{workout['name']}' to Supabase for user {self.user_id}")
-                print(f"📋 Workout ID: {workout.get('id')}")
-                return True
-            else:
-                print(f"⚠️  No data returned from Supabase insert")
-                return False
-        except Exception as e:
-            print(f"❌ Error saving workout: {e}")
-            print(f"❌ Error type: {type(e).__name__}")
-            import traceback
-            print(f"❌ Traceback: {traceback.format_exc()}")
+            workout["user_id"] = user_id
+            # Stamp the confirmation time; the insert may happen later (or be replayed)
+            workout["created_at"] = datetime.now(timezone.utc).isoformat()
+
+            log.debug("workout_queueing", workout=workout)
+            await self.write_queue.enqueue(workout)
+            log.info("workout_journaled", workout_id=workout.get("id"), user_id=user_id)
+            return True
+        except Exception:
+            log.exception("workout_save_failed", workout_id=workout.get("id"), user_id=user_id)
             return False
 
     async def execute(self, state: GymmandoState) -> GymmandoState:
         """Process workout-related requests."""
-        # Check if there's a pending workout confirmation (stored in instance)
-        if self.pending_workout:
+        user_id = state.get("user_id", "default_user")
+        history = self.history_for(user_id)
+        pending_workout = state.get("pending_workout")
+        collected_workout_data = dict(state.get("collected_workout_data") or {})
+
+        # Check if there's a pending workout confirmation (stored in graph state)
+        if pending_workout:
             # User is responding to a confirmation request
-            user_transcript_lower = state.get("transcript", "").lower()
-            is_confirmation = any(word in user_transcript_lower for word in ["yes", "yeah", "yep", "correct", "right", "confirm", "save", "log it", "that's right", "ok", "okay"])
-            
+            intent = state.get("intent") or {}
+            if intent.get("type") == "confirm_workout":
+                is_confirmation = intent.get("data", {}).get("confirmed")
+            else:
+                is_confirmation = classify_confirmation(state.get("transcript", ""))
+
+            if is_confirmation is None:
+                # Neither a yes nor a no - keep the workout and ask again
+                state["response"] = CONFIRM_AGAIN_PROMPT
+                state["workout_data"] = {
+                    "status": "pending_confirmation",
+                    "message": CONFIRM_AGAIN_PROMPT,
+                    "workout": pending_workout,
+                    "summary": self._format_workout_summary(pending_workout),
+                }
+                return state
+
             if is_confirmation:
                 # User confirmed - save the pending workout
-                saved = self._save_to_supabase(self.pending_workout)
+                saved = await self._save_to_supabase(pending_workout, user_id)
                 if saved:
-                    self.saved_workouts.append(self.pending_workout)
-                    muscle_group = self.pending_workout.get("muscle_group", "")
-                    state["response"] = f"✅ Logged your {muscle_group} workout! {', '.join(self.pending_workout.get('exercises', []))} - {self.pending_workout.get('sets_reps', '')}"
+                    history.record(pending_workout)
+                    muscle_group = pending_workout.get("muscle_group", "")
+                    state["response"] = f"✅ Logged your {muscle_group} workout! {', '.join(pending_workout.get('exercises', []))} - {pending_workout.get('sets_reps', '')}"
                     state["workout_data"] = {
                         "status": "success",
                         "message": f"✅ Logged your {muscle_group} workout!",
-                        "workout": self.pending_workout,
+                        "workout": pending_workout,
                     }
-                    self.pending_workout = None  # Clear pending workout
-                    self.collected_workout_data = {}  # Clear collected data
+                    state["pending_workout"] = None  # Clear pending workout
+                    state["collected_workout_data"] = None  # Clear collected data
                     return state
                 else:
                     state["response"] = "❌ Failed to save workout. Please try again."
@@ -104,18 +151,18 @@ class WorkoutAgent:
                     return state
             else:
                 # User said no or something else - ask what to change
-                state["response"] = "No problem! What would you like to change?"
+                state["response"] = CORRECTION_PROMPT
                 state["workout_data"] = {
                     "status": "needs_correction",
                     "message": "User wants to change workout details",
                 }
-                self.pending_workout = None  # Clear pending workout
-                self.collected_workout_data = {}  # Clear collected data
+                state["pending_workout"] = None  # Clear pending workout
+                state["collected_workout_data"] = None  # Clear collected data
                 return state
         
         intent = state.get("intent")
         if not intent:
-            print("⚠️  No intent found in state")
+            log.warning("intent_missing")
             state["workout_data"] = {
                 "status": "error",
                 "message": "No intent found",
@@ -126,36 +173,35 @@ class WorkoutAgent:
         intent_type = intent.get("type")
         data = intent.get("data", {})
 
-        print(f"🏋️ Workout Agent: Handling '{intent_type}' for user {self.user_id}")
-        print(f"🔍 Intent data: {data}")
-        print(f"🔍 Previously collected data: {self.collected_workout_data}")
+        log.info("workout_intent", intent_type=intent_type, user_id=user_id)
+        log.debug("workout_slots", data=data, collected=collected_workout_data)
 
         if intent_type == "log_workout":
             # Merge new data with previously collected data
             # Update collected_data with any new information from this turn
             if data.get("exercises"):
-                self.collected_workout_data["exercises"] = data.get("exercises", [])
+                collected_workout_data["exercises"] = data.get("exercises", [])
             if data.get("muscle_group") and data.get("muscle_group") != "general":
-                self.collected_workout_data["muscle_group"] = data.get("muscle_group")
+                collected_workout_data["muscle_group"] = data.get("muscle_group")
             if data.get("sets"):
-                self.collected_workout_data["sets"] = data.get("sets")
+                collected_workout_data["sets"] = data.get("sets")
             if data.get("reps"):
-                self.collected_workout_data["reps"] = data.get("reps")
+                collected_workout_data["reps"] = data.get("reps")
             if data.get("weight"):
-                self.collected_workout_data["weight"] = data.get("weight")
+                collected_workout_data["weight"] = data.get("weight")
             if data.get("duration"):
-                self.collected_workout_data["duration"] = data.get("duration")
+                collected_workout_data["duration"] = data.get("duration")
             if data.get("rest_time"):
-                self.collected_workout_data["rest_time"] = data.get("rest_time")
+                collected_workout_data["rest_time"] = data.get("rest_time")
             if data.get("name"):
-                self.collected_workout_data["name"] = data.get("name")
+                collected_workout_data["name"] = data.get("name")
             if data.get("difficulty"):
-                self.collected_workout_data["difficulty"] = data.get("difficulty")
+                collected_workout_data["difficulty"] = data.get("difficulty")
             if data.get("notes"):
-                self.collected_workout_data["notes"] = data.get("notes", "")
+                collected_workout_data["notes"] = data.get("notes", "")
             
             # Use merged collected data
-            collected_data = self.collected_workout_data.copy()
+            collected_data = collected_workout_data.copy()
             
             # Extract values with defaults
             muscle_group = collected_data.get("muscle_group", "")
@@ -191,20 +237,7 @@ class WorkoutAgent:
                 first_missing = missing_details[0]
                 
                 # Build helpful prompt based on what's missing
-                if first_missing == "exercises":
-                    prompt = "What exercises did you do? For example: bench press, squats, or deadlifts."
-                elif first_missing == "muscle group":
-                    prompt = "What muscle group did you work? For example: chest, legs, or back."
-                elif first_missing == "sets and reps":
-                    prompt = "How many sets and reps did you do? For example: 3 sets of 10 reps."
-                elif first_missing == "weight":
-                    prompt = "What weight did you use? For example: 225 pounds or 100 kg."
-                elif first_missing == "duration":
-                    prompt = "How long did your workout take? For example: 45 minutes."
-                elif first_missing == "rest time":
-                    prompt = "What was your rest time between sets? For example: 60 seconds."
-                else:
-                    prompt = f"I need to know the {first_missing}."
+                prompt = MISSING_FIELD_PROMPTS.get(first_missing, f"I need to know the {first_missing}.")
                 
                 state["response"] = prompt
                 state["workout_data"] = {
@@ -214,6 +247,8 @@ class WorkoutAgent:
                     "collected_data": collected_data,
                     "next_field_to_ask": first_missing,
                 }
+                # Keep what we have so far for the next turn
+                state["collected_workout_data"] = collected_data
                 return state
 
             # All required fields collected - prepare workout for confirmation
@@ -236,15 +271,9 @@ class WorkoutAgent:
             else:
                 sets_reps_final = sets_reps_str
 
-            # Generate workout ID
-            existing_count = len(
-                [
-                    w
-                    for w in self.saved_workouts
-                    if w.get("muscle_group") == muscle_group_lower
-                ]
-            )
-            workout_id = f"{muscle_group_lower}_custom_{existing_count + 1:03d}"
+            # Generate a collision-safe workout ID; counts are per process, so
+            # two sessions for the same user could otherwise pick the same number
+            workout_id = f"{muscle_group_lower}_custom_{uuid.uuid4().hex}"
 
             # Create workout record with defaults for optional fields
             workout = {
@@ -260,11 +289,11 @@ class WorkoutAgent:
             }
             
             # Clear collected data after creating workout
-            self.collected_workout_data = {}
+            state["collected_workout_data"] = None
 
             # First time we have all data - ask for confirmation
             # Store workout in instance for next turn
-            self.pending_workout = workout
+            state["pending_workout"] = workout
             summary = self._format_workout_summary(workout)
             state["response"] = f"Here's what I'm about to log:\n\n{summary}\n\nIs this correct? Say 'yes' to save it!"
             state["workout_data"] = {
@@ -277,51 +306,42 @@ class WorkoutAgent:
 
         elif intent_type == "view_workouts":
             muscle_group = data.get("muscle_group")
-            if muscle_group:
-                filtered = [
-                    w
-                    for w in self.saved_workouts
-                    if w.get("muscle_group") == muscle_group.lower()
-                ]
-            else:
-                filtered = self.saved_workouts
+            # Only fetch the recent window this request needs
+            exercises = data.get("exercises") or []
+            try:
+                recent, total = await history.recent(
+                    limit=5,
+                    muscle_group=muscle_group.lower() if muscle_group else None,
+                    since=WorkoutHistory.since_days(data.get("days")),
+                    exercise=exercises[0] if exercises else None,
+                )
+            except Exception as e:
+                log.warning("workouts_load_failed", user_id=user_id, error=str(e))
+                state["response"] = "I couldn't load your workouts right now. Try again in a moment."
+                state["workout_data"] = {
+                    "status": "error",
+                    "message": "Failed to load workouts",
+                }
+                return state
 
-            if filtered:
+            if recent:
                 workout_list = "\n".join([
                     f"- {w.get('name', 'Workout')}: {', '.join(w.get('exercises', []))} ({w.get('sets_reps', 'N/A')})"
-                    for w in filtered[:5]  # Show first 5
+                    for w in recent  # Show most recent 5
                 ])
-                state["response"] = f"Found {len(filtered)} workout(s):\n{workout_list}"
+                state["response"] = f"Found {total} workout(s):\n{workout_list}"
             else:
                 state["response"] = "No workouts found. Start logging your workouts!"
 
             state["workout_data"] = {
                 "status": "success",
-                "message": f"Found {len(filtered)} workout(s)",
-                "workouts": filtered,
+                "message": f"Found {total} workout(s)",
+                "workouts": recent,
+                "total": total,
             }
 
         else:
-            # Handle general queries or unknown intents
-            # If there's a pending workout, still check for confirmation
-            if self.pending_workout:
-                user_transcript_lower = state.get("transcript", "").lower()
-                is_confirmation = any(word in user_transcript_lower for word in ["yes", "yeah", "yep", "correct", "right", "confirm", "save", "log it", "that's right", "ok", "okay"])
-                if is_confirmation:
-                    saved = self._save_to_supabase(self.pending_workout)
-                    if saved:
-                        self.saved_workouts.append(self.pending_workout)
-                        muscle_group = self.pending_workout.get("muscle_group", "")
-                        state["response"] = f"✅ Logged your {muscle_group} workout! {', '.join(self.pending_workout.get('exercises', []))} - {self.pending_workout.get('sets_reps', '')}"
-                        state["workout_data"] = {
-                            "status": "success",
-                            "message": f"✅ Logged your {muscle_group} workout!",
-                            "workout": self.pending_workout,
-                        }
-                        self.pending_workout = None
-                        return state
-            
-            # No pending workout and not a workout intent - provide helpful response
+            # Not a workout intent (a pending workout was handled above) - provide helpful response
             intent_type = intent.get("type", "unknown")
             if intent_type == "general_query":
                 # Friendly response for general queries
@@ -0,0 +1,141 @@
+"""
+Deterministic stand-ins for the LLM and Supabase, for offline benchmarks.
+
+Both inject latency drawn from a seeded RNG, so runs are repeatable and
+realistic without network access. The fake LLM extracts workout entities
+with simple rules, so multi-turn logging flows progress the way they do
+against the real parser.
+"""
+
+import asyncio
+import random
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from agents.fast_path_router import MUSCLE_GROUPS, extract_slots, normalize_transcript
+from database.repository import SupabaseRepository
+from llm.stub import USER_MESSAGE_RE, StubChatModel
+from telemetry.tracing import telemetry
+
+EXERCISES = [
+    "bench press", "incline press", "push ups", "flyes", "squats", "lunges",
+    "leg press", "deadlifts", "rows", "pull ups", "lat pulldown", "curls",
+    "hammer curls", "dips", "overhead press", "lateral raises", "planks",
+    "crunches", "running",
+]
+VIEW_WORDS = ("show", "view", "what did", "history", "last time")
+DAYS_RE = re.compile(r"last (\d+) days")
+
+
+class LatencyModel:
+    """Seeded latency: a base delay plus uniform jitter, in milliseconds."""
+
+    def __init__(self, base_ms: float, jitter_ms: float = 0.0, seed: int = 0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        return (self.base_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+
+
+def rule_based_intent(text: str) -> dict:
+    """ParsedIntent-shaped intent for a transcript, using keyword rules."""
+    match = USER_MESSAGE_RE.search(text)
+    transcript = normalize_transcript(match.group(1) if match else text)
+    slots, _ = extract_slots(transcript)
+    exercises = [e for e in EXERCISES if re.search(rf"\b{e}\b", transcript)]
+    if exercises:
+        slots["exercises"] = exercises
+
+    if any(word in transcript for word in VIEW_WORDS):
+        data = {k: v for k, v in slots.items() if k in ("muscle_group", "exercises")}
+        if "last week" in transcript:
+            data["days"] = 7
+        days = DAYS_RE.search(transcript)
+        if days:
+            data["days"] = int(days.group(1))
+        return {"type": "view_workouts", "data": data}
+    if slots or "did" in transcript.split() or "log" in transcript.split():
+        return {"type": "log_workout", "data": slots}
+    return {"type": "general_query", "data": {}}
+
+
+class FakeChatModel(StubChatModel):
+    """Stub model with rule-based entity extraction and seeded latency."""
+
+    base_ms: float = 300.0
+    jitter_ms: float = 200.0
+    seed: int = 0
+    _latency: Optional[LatencyModel] = None
+
+    def _delay(self) -> float:
+        if self._latency is None:
+            self._latency = LatencyModel(self.base_ms, self.jitter_ms, self.seed)
+        return self._latency.sample()
+
+    def _intent(self, text: str) -> dict:
+        return rule_based_intent(text)
+
+
+@dataclass
+class FakeResponse:
+    data: list
+    count: Optional[int] = None
+
+
+class FakeSupabaseRepository(SupabaseRepository):
+    """In-memory workouts table with the repository's query surface."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        super().__init__(client=object())
+        self.latency = latency or LatencyModel(40, 40, seed=1)
+        self.rows: dict = {}  # user_id -> list of rows, newest first
+
+    async def _wait(self, name: str):
+        with telemetry.span(f"supabase.{name}"):
+            await asyncio.sleep(self.latency.sample())
+
+    def seed_history(self, user_id: str, workouts: list):
+        """Preload workouts for a user, newest first."""
+        self.rows[user_id] = sorted(
+            workouts, key=lambda w: (w["created_at"], w["id"]), reverse=True
+        )
+
+    async def fetch_workout_page(
+        self,
+        user_id: str,
+        columns: str = "*",
+        limit: int = 20,
+        muscle_group: Optional[str] = None,
+        since: Optional[str] = None,
+        exercises: Optional[list] = None,
+        before: Optional[tuple] = None,
+        with_count: bool = False,
+    ):
+        await self._wait("fetch_workout_page")
+        rows = [
+            r for r in self.rows.get(user_id, [])
+            if (not muscle_group or r.get("muscle_group") == muscle_group)
+            and (not since or r["created_at"] >= since)
+            and (not exercises or set(exercises) & set(r.get("exercises") or []))
+        ]
+        count = len(rows) if with_count else None
+        if before:
+            rows = [r for r in rows if (r["created_at"], r["id"]) < tuple(before)]
+        return FakeResponse(data=rows[:limit], count=count)
+
+    async def insert_workout(self, workout: dict) -> list:
+        return await self.upsert_workouts([workout])
+
+    async def upsert_workouts(self, workouts: list) -> list:
+        await self._wait("upsert_workouts")
+        inserted = []
+        for workout in workouts:
+            rows = self.rows.setdefault(workout["user_id"], [])
+            if any(r["id"] == workout["id"] for r in rows):
+                continue
+            rows.insert(0, dict(workout))
+            inserted.append(workout)
+        return inserted
@@ -0,0 +1,180 @@
+"""
+Offline benchmark for the agent graph.
+
+Drives `GymmandoGraph(...).build().ainvoke` with multi-turn conversations
+(partial logs, confirmations, corrections, history views and small talk).
+The LLM and Supabase are replaced by seeded, latency-injecting stand-ins,
+so no network is needed and runs are repeatable. For each session count it
+reports turn throughput, turn and per-stage latency percentiles, and
+memory per concurrent session.
+
+Usage (from agent/):
+    python -m benchmarks.graph_benchmark --sessions 1 10 50
+    python -m benchmarks.graph_benchmark --transcripts recorded.jsonl --json results.json
+
+A transcripts file has one conversation per line: {"turns": ["...", ...]}.
+"""
+
+import os
+
+# Keep benchmark output readable; must be set before the agents import the logger
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmarks.fakes import FakeChatModel, FakeSupabaseRepository, LatencyModel
+from graphs.checkpointer import create_checkpointer
+from graphs.gymmando import GymmandoGraph
+from llm.registry import registry
+from telemetry.tracing import LatencyHistogram, telemetry
+
+CONVERSATIONS = {
+    "partial_log": ["I did chest today", "bench press and incline press", "3 sets of 10", "yes"],
+    "one_shot_log": ["I did 4 sets of 8 squats for legs at 225 pounds", "yeah save it"],
+    "correction": ["I did 3 sets of 12 curls for arms", "no", "I did 4 sets of 12 curls for arms", "correct"],
+    "views": ["show my workouts", "show my legs workouts from last week", "what did I do for bench press"],
+    "small_talk": ["hey", "thanks"],
+}
+
+
+def load_conversations(path: Path) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["turns"] for line in f if line.strip()]
+
+
+def synthetic_history(user_id: str, count: int = 60) -> list:
+    """Workouts spread over the past few months, so history views page."""
+    now = datetime.now(timezone.utc)
+    groups = [("chest", ["bench press", "flyes"]), ("legs", ["squats", "lunges"]),
+              ("back", ["rows", "pull ups"]), ("arms", ["curls", "dips"])]
+    workouts = []
+    for i in range(count):
+        muscle_group, exercises = groups[i % len(groups)]
+        workouts.append({
+            "id": f"{muscle_group}_seed_{user_id}_{i}",
+            "user_id": user_id,
+            "name": f"{muscle_group.title()} Session",
+            "muscle_group": muscle_group,
+            "exercises": exercises,
+            "sets_reps": "3 sets of 10 reps",
+            "created_at": (now - timedelta(days=i * 2)).isoformat(),
+        })
+    return workouts
+
+
+async def run_session(graph, gymmando_graph, user_id: str, turns: list, latencies: LatencyHistogram):
+    for transcript in turns:
+        turn_input = {
+            "transcript": transcript,
+            "intent": None,
+            "workout_data": None,
+            "response": "",
+            "personality_mode": "bro",
+            "user_id": user_id,
+        }
+        start = time.perf_counter()
+        await graph.ainvoke(turn_input, config=gymmando_graph.thread_config(user_id))
+        latencies.observe(time.perf_counter() - start)
+
+
+async def run_level(gymmando_graph, repository, conversations: list, sessions: int, tag: str) -> dict:
+    graph = gymmando_graph.build()
+    latencies = LatencyHistogram(max_samples=1_000_000)
+    jobs = []
+    for i in range(sessions):
+        user_id = f"bench_{tag}_{i}"
+        repository.seed_history(user_id, synthetic_history(user_id))
+        jobs.append(run_session(graph, gymmando_graph, user_id, conversations[i % len(conversations)], latencies))
+
+    start = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+    return {"elapsed_s": elapsed, "turns": latencies.count, "latencies": latencies}
+
+
+async def measure_memory(gymmando_graph, repository, conversations: list, sessions: int) -> float:
+    """Bytes retained per session (checkpoints, histories, caches) after its turns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await run_level(gymmando_graph, repository, conversations, sessions, tag=f"mem{sessions}")
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / sessions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Offline agent graph benchmark")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--transcripts", type=Path, help="JSONL file of recorded conversations")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Base fake LLM latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--db-ms", type=float, default=40.0, help="Base fake Supabase latency")
+    parser.add_argument("--db-jitter-ms", type=float, default=40.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    conversations = list(CONVERSATIONS.values())
+    if args.transcripts:
+        conversations = load_conversations(args.transcripts)
+
+    # Workout inserts still go through a real (temporary) journal
+    scratch = tempfile.mkdtemp(prefix="gymmando-bench-")
+    os.environ["WORKOUT_JOURNAL_DIR"] = scratch
+    # Start from an empty shared intent cache, so runs are repeatable
+    os.environ["INTENT_CACHE_DIR"] = os.path.join(scratch, "intent_cache")
+    registry.set_model_factory(
+        lambda model, temperature: FakeChatModel(
+            model=model, base_ms=args.llm_ms, jitter_ms=args.llm_jitter_ms, seed=args.seed
+        )
+    )
+    repository = FakeSupabaseRepository(LatencyModel(args.db_ms, args.db_jitter_ms, seed=args.seed))
+
+    # Built after the fake LLM is registered so every agent picks it up
+    gymmando_graph = GymmandoGraph(checkpointer=create_checkpointer("memory"), repository=repository)
+    await gymmando_graph.setup()
+
+    results = []
+    for sessions in args.sessions:
+        telemetry.reset()
+        level = await run_level(gymmando_graph, repository, conversations, sessions, tag=str(sessions))
+        stages = telemetry.summary()["stages"]
+        memory = await measure_memory(gymmando_graph, repository, conversations, sessions)
+        summary = level["latencies"].summary()
+        result = {
+            "sessions": sessions,
+            "turns": level["turns"],
+            "turns_per_s": round(level["turns"] / level["elapsed_s"], 1),
+            "turn": summary,
+            "memory_per_session_kb": round(memory / 1024, 1),
+            "stages": stages,
+        }
+        results.append(result)
+
+        print(
+            f"\n📊 {sessions} session(s): {result['turns']} turns, {result['turns_per_s']} turns/s, "
+            f"turn p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms, "
+            f"{result['memory_per_session_kb']} KB/session"
+        )
+        print(f"   {'stage':<36}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for stage, stats in result["stages"].items():
+            print(
+                f"   {stage:<36}{stats['count']:>7}{stats['p50_ms']:>10}"
+                f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+            )
+
+    await gymmando_graph.workout_agent.write_queue.close()
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
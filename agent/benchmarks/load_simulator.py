@@ -0,0 +1,357 @@
+"""
+Multi-session load simulator for one worker machine.
+
+LiveKit runs each job (one room, one session) in its own process with its
+own event loop, so N concurrent sessions are N processes sharing the
+machine's CPUs and memory. The simulator starts one job process per session.
+Each process builds its own graph (what the `prewarm` hook does) and waits
+until every process is ready, since LiveKit keeps idle job processes warm.
+It then does the per-session setup `entrypoint` does (assistant creation
+and prewarm) and loops through conversation turns: simulated STT, the graph
+(through `llm_node` in direct mode, or the session LLM's tool-call hop and
+`process_command` with `--mode tool`), and a fake TTS that consumes the
+spoken sentences and plays 20 ms audio frames. STT, TTS, the LLMs and
+Supabase are local stand-ins with seeded latency.
+
+For each N it measures:
+- event-loop lag in every process: how late a 10 ms timer fires,
+- audio frame lateness,
+- per-turn latency (user stops speaking -> first audio),
+- RSS per job process, idle and at the end of its session, and the total
+  across the N processes.
+The capacity is the largest N whose worst process loop lag p99 and turn
+latency p95 stay under the given budgets, with the total RSS within the
+memory budget.
+
+Usage (from agent/):
+    python -m benchmarks.load_simulator --sessions 5 10 20 40 --duration 30
+"""
+
+import os
+
+# Keep simulator output readable; must be set before the agents import the logger
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import resource
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from livekit.agents import llm
+
+from benchmarks.fakes import FakeChatModel, FakeSupabaseRepository, LatencyModel
+from benchmarks.graph_benchmark import CONVERSATIONS, synthetic_history
+from graphs.gymmando import get_gymmando_graph
+from llm.registry import registry
+from telemetry.tracing import LatencyHistogram, telemetry
+
+FRAME_SECONDS = 0.02  # LiveKit publishes 20 ms audio frames
+CHARS_PER_SECOND = 15  # Rough speaking rate for simulated playback
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def total_memory_gb() -> float:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**30
+    except (ValueError, OSError):
+        return 0.0
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires on the event loop."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lag = LatencyHistogram(max_samples=1_000_000)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag.observe(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        self._task.cancel()
+
+
+class FakeSession:
+    """Stands in for AgentSession.say: synthesizes and plays sentences."""
+
+    def __init__(self, tts_latency: LatencyModel, frame_lateness: LatencyHistogram):
+        self.tts_latency = tts_latency
+        self.frame_lateness = frame_lateness
+        self.first_audio = asyncio.Event()
+        self.done = asyncio.Event()
+
+    def say(self, text):
+        self.first_audio.clear()
+        self.done.clear()
+        task = asyncio.create_task(self._play(text))
+        task.add_done_callback(lambda _: self.done.set())
+
+    async def _play(self, text):
+        async for sentence in text:
+            await asyncio.sleep(self.tts_latency.sample())
+            self.first_audio.set()
+            frames = max(1, int(len(sentence) / CHARS_PER_SECOND / FRAME_SECONDS))
+            next_frame = time.perf_counter()
+            for _ in range(frames):
+                next_frame += FRAME_SECONDS
+                await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+                self.frame_lateness.observe(max(0.0, time.perf_counter() - next_frame))
+        self.first_audio.set()
+
+
+class FakeRunContext:
+    def __init__(self, session: FakeSession):
+        self.session = session
+
+
+async def run_session(
+    index: int,
+    args,
+    repository: FakeSupabaseRepository,
+    deadline: float,
+    turn_latency: LatencyHistogram,
+    frame_lateness: LatencyHistogram,
+):
+    # Imported lazily: main loads the LiveKit plugins on import
+    from main import GymmandoAssistant
+
+    rng = random.Random(args.seed + index)
+    user_id = f"load_user_{index:04d}_{'x' * 16}"
+    repository.seed_history(user_id, synthetic_history(user_id))
+    stt = LatencyModel(args.stt_ms, args.stt_ms / 2, seed=args.seed + index)
+    session_llm = LatencyModel(args.llm_ms, args.llm_ms / 2, seed=args.seed + index + 1)
+    session = FakeSession(LatencyModel(args.tts_ms, args.tts_ms / 2, seed=args.seed + index + 2), frame_lateness)
+    context = FakeRunContext(session)
+
+    # What entrypoint does once the participant joins
+    assistant = GymmandoAssistant(user_id=user_id, direct_mode=args.mode == "direct", llm_fallback=False)
+    assistant.speculative_parsing = args.speculate
+    await assistant.prewarm()
+
+    conversations = list(CONVERSATIONS.values())
+    await asyncio.sleep(rng.uniform(0, args.think_s))  # Stagger session starts
+    while time.perf_counter() < deadline:
+        for transcript in conversations[rng.randrange(len(conversations))]:
+            if time.perf_counter() >= deadline:
+                return
+            # The user stops speaking: an interim hypothesis is already in,
+            # the final transcript follows end-of-utterance detection
+            start = time.perf_counter()
+            assistant.on_user_transcript(transcript, is_final=False)
+            await asyncio.sleep(stt.sample() + args.eou_ms / 1000)
+            assistant.on_user_transcript(transcript, is_final=True)
+            if args.mode == "direct":
+                chat_ctx = llm.ChatContext.empty()
+                chat_ctx.add_message(role="user", content=transcript)
+                session.say(assistant.llm_node(chat_ctx, [], None))
+            else:
+                await asyncio.sleep(session_llm.sample())  # Session LLM decides to call the tool
+                await assistant.process_command(context, transcript)
+            await session.first_audio.wait()
+            turn_latency.observe(time.perf_counter() - start)
+            await session.done.wait()
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_s)  # User speaks next
+
+
+async def run_job(index: int, args, ready) -> dict:
+    """One job process: build the graph, wait for the others, run one session."""
+    registry.set_model_factory(
+        lambda model, temperature: FakeChatModel(
+            model=model, base_ms=args.llm_ms, jitter_ms=args.llm_ms / 2, seed=args.seed + index
+        )
+    )
+    repository = FakeSupabaseRepository(LatencyModel(args.db_ms, args.db_ms, seed=args.seed + index))
+    gymmando_graph = get_gymmando_graph(repository=repository)
+    await gymmando_graph.setup()
+    import main  # noqa: F401  The LiveKit plugins every job process loads
+    idle_rss = rss_mb()
+
+    # Blocking is fine here: the session has not started yet
+    ready.wait(timeout=args.startup_timeout)
+
+    turn_latency = LatencyHistogram(max_samples=1_000_000)
+    frame_lateness = LatencyHistogram(max_samples=1_000_000)
+    monitor = LoopLagMonitor()
+    monitor.start()
+    deadline = time.perf_counter() + args.duration
+    await run_session(index, args, repository, deadline, turn_latency, frame_lateness)
+    monitor.stop()
+    session_state = gymmando_graph.sweep_sessions()
+    await gymmando_graph.workout_agent.write_queue.close()
+    return {
+        "turn_latency": list(turn_latency.samples),
+        "frame_lateness": list(frame_lateness.samples),
+        "loop_lag_p99_ms": monitor.lag.summary()["p99_ms"],
+        "idle_rss_mb": idle_rss,
+        "rss_mb": rss_mb(),
+        "session_state_bytes": session_state["bytes"],
+        "speculation": {k: v for k, v in telemetry.counters.items() if k.startswith("speculation.")},
+    }
+
+
+def job_process(index: int, args, ready, results):
+    """Entry point of a simulated job process."""
+    try:
+        results.put(asyncio.run(run_job(index, args, ready)))
+    except BaseException:
+        ready.abort()  # Don't leave the other processes waiting
+        results.put({"error": traceback.format_exc()})
+
+
+def histogram(samples) -> LatencyHistogram:
+    merged = LatencyHistogram(max_samples=max(1, len(samples)))
+    for seconds in samples:
+        merged.observe(seconds)
+    return merged
+
+
+def percentile(values: list, q: float) -> float:
+    return histogram(values).percentile(q) if values else 0.0
+
+
+def run_level(sessions: int, args) -> dict:
+    """Run one job process per session and merge what they measured."""
+    context = multiprocessing.get_context("spawn")  # A fresh interpreter per job
+    ready = context.Barrier(sessions + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=job_process, args=(i, args, ready, results), daemon=True)
+        for i in range(sessions)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        ready.wait(timeout=args.startup_timeout)
+    except threading.BrokenBarrierError:
+        pass  # A job process failed to start; its error is in the results
+    jobs = [results.get(timeout=args.duration + args.startup_timeout) for _ in processes]
+    for process in processes:
+        process.join()
+    errors = [job["error"] for job in jobs if "error" in job]
+    if errors:
+        raise RuntimeError(f"{len(errors)} job process(es) failed:\n{errors[0]}")
+
+    turn_latency = histogram([s for job in jobs for s in job["turn_latency"]])
+    speculation: dict = {}
+    for job in jobs:
+        for name, value in job["speculation"].items():
+            speculation[name] = speculation.get(name, 0) + value
+    loop_lag = [job["loop_lag_p99_ms"] for job in jobs]
+    idle_rss = [job["idle_rss_mb"] for job in jobs]
+    rss = [job["rss_mb"] for job in jobs]
+    return {
+        "sessions": sessions,
+        "turns": turn_latency.count,
+        "turn_latency": turn_latency.summary(),
+        "frame_lateness": histogram([s for job in jobs for s in job["frame_lateness"]]).summary(),
+        # Each process has its own loop: report the spread of their p99s
+        "loop_lag_p99_ms": {"p50": percentile(loop_lag, 0.5), "max": max(loop_lag)},
+        "process_rss_mb": {
+            "idle_p50": round(percentile(idle_rss, 0.5), 1),
+            "p50": round(percentile(rss, 0.5), 1),
+            "max": round(max(rss), 1),
+        },
+        "total_rss_mb": round(sum(rss), 1),
+        "session_state_bytes": sum(job["session_state_bytes"] for job in jobs),
+        "speculation": speculation,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent voice sessions on one worker machine")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per level")
+    parser.add_argument("--mode", choices=["direct", "tool"], default="direct",
+                        help="direct: transcripts go straight to the graph; tool: via the session LLM")
+    parser.add_argument("--think-s", type=float, default=2.0, help="Mean user pause between turns")
+    parser.add_argument("--stt-ms", type=float, default=150.0)
+    parser.add_argument("--eou-ms", type=float, default=500.0, help="End-of-utterance silence detection")
+    parser.add_argument("--speculate", action="store_true", help="Parse interim transcripts speculatively")
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="Session and graph LLM latency")
+    parser.add_argument("--tts-ms", type=float, default=200.0, help="TTS time to first audio")
+    parser.add_argument("--db-ms", type=float, default=40.0)
+    parser.add_argument("--lag-budget-ms", type=float, default=20.0, help="Max loop lag p99 of any process")
+    parser.add_argument("--turn-budget-ms", type=float, default=2000.0, help="Max turn latency p95")
+    parser.add_argument("--memory-budget-gb", type=float, default=round(total_memory_gb() * 0.8, 1),
+                        help="Max total RSS of the job processes (default: 80%% of RAM)")
+    parser.add_argument("--startup-timeout", type=float, default=300.0,
+                        help="Seconds to wait for every job process to be ready")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    # Inherited by the job processes; the intent cache store is shared between them
+    scratch = tempfile.mkdtemp(prefix="gymmando-load-")
+    os.environ["WORKOUT_JOURNAL_DIR"] = scratch
+    # Start from an empty shared intent cache, so runs are repeatable
+    os.environ["INTENT_CACHE_DIR"] = os.path.join(scratch, "intent_cache")
+
+    cpus = os.cpu_count()
+    memory = total_memory_gb()
+    print(f"🖥️  Worker: {cpus} CPU(s), {memory:.1f} GB RAM, memory budget {args.memory_budget_gb} GB")
+
+    results = []
+    capacity = 0
+    for sessions in args.sessions:
+        result = run_level(sessions, args)
+        results.append(result)
+        lag, turn, frames = result["loop_lag_p99_ms"], result["turn_latency"], result["frame_lateness"]
+        within_budget = (
+            lag["max"] <= args.lag_budget_ms
+            and turn["p95_ms"] <= args.turn_budget_ms
+            and result["total_rss_mb"] <= args.memory_budget_gb * 1024
+        )
+        if within_budget:
+            capacity = sessions
+        rss = result["process_rss_mb"]
+        print(
+            f"📊 {sessions:>4} sessions: {result['turns']} turns | "
+            f"loop lag p99 per process p50 {lag['p50']}ms max {lag['max']}ms | "
+            f"frame lateness p99 {frames['p99_ms']}ms | "
+            f"turn p50 {turn['p50_ms']}ms p95 {turn['p95_ms']}ms | "
+            f"RSS per process {rss['idle_p50']} MB idle, {rss['p50']} MB in session, "
+            f"{result['total_rss_mb']} MB total | "
+            f"session state {result['session_state_bytes'] // 1024} KB "
+            f"{'✅' if within_budget else '❌'}"
+        )
+
+    print(
+        f"\n🎯 Capacity: {capacity} concurrent sessions per worker "
+        f"({cpus} CPU(s), {memory:.1f} GB) at loop lag p99 <= {args.lag_budget_ms}ms, "
+        f"turn p95 <= {args.turn_budget_ms}ms and total RSS <= {args.memory_budget_gb} GB"
+    )
+    if args.json:
+        args.json.write_text(json.dumps({
+            "cpus": cpus,
+            "memory_gb": round(memory, 1),
+            "capacity": capacity,
+            "levels": results,
+        }, indent=2))
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,16 @@ CREATE TABLE IF NOT EXISTS public.workouts (
 -- Add index on user_id for faster queries
 CREATE INDEX IF NOT EXISTS idx_workouts_user_id ON public.workouts(user_id);
 
+-- Keyset index for paginated history (newest first, optionally per muscle group)
+CREATE INDEX IF NOT EXISTS idx_workouts_user_created
+    ON public.workouts(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_muscle_created
+    ON public.workouts(user_id, muscle_group, created_at DESC, id DESC);
+
+-- Exercise lookups filter on the exercises array (overlap)
+CREATE INDEX IF NOT EXISTS idx_workouts_exercises
+    ON public.workouts USING GIN (exercises);
+
 -- Disable Row Level Security to avoid user_id errors
 ALTER TABLE public.workouts DISABLE ROW LEVEL SECURITY;
 
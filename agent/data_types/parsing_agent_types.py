@@ -0,0 +1,49 @@
+"""
+Structured output schema for the Parsing Agent.
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+IntentType = Literal[
+    "log_workout",
+    "view_workouts",
+    "search_routines",
+    "log_meal",
+    "view_macros",
+    "general_query",
+    "change_personality",
+    "confirm_workout",
+]
+
+
+class IntentData(BaseModel):
+    """Entities extracted from the user's message."""
+
+    exercises: Optional[List[str]] = Field(None, description="Exercise names")
+    muscle_group: Optional[str] = Field(None, description="e.g. chest, legs, back")
+    sets: Optional[int] = None
+    reps: Optional[int] = None
+    weight: Optional[str] = Field(None, description="e.g. '225 pounds'")
+    duration: Optional[str] = Field(None, description="e.g. '45 minutes'")
+    rest_time: Optional[str] = None
+    notes: Optional[str] = None
+    days: Optional[int] = Field(
+        None, description="How many days back to look when viewing workouts"
+    )
+    meals: Optional[List[str]] = None
+    mode: Optional[str] = Field(
+        None, description="Personality mode: bro, coach or commander"
+    )
+    confirmed: Optional[bool] = Field(
+        None, description="For confirm_workout: whether the user agreed to save the workout"
+    )
+
+
+class ParsedIntent(BaseModel):
+    """Record the intent of the user's message."""
+
+    # `type` comes first so it is decoded before the entities while streaming
+    type: IntentType
+    data: IntentData = Field(default_factory=IntentData)
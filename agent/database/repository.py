@@ -0,0 +1,128 @@
+"""
+Async repository layer over the Supabase client.
+
+The Supabase Python client is synchronous, so every query is offloaded to a
+small dedicated thread pool. This keeps database round-trips off the LiveKit
+worker's event loop, and the pool size bounds how many queries a worker can
+have in flight at once.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from database.supabase_client import supabase
+from telemetry.tracing import telemetry
+
+WORKOUTS_TABLE = "workouts"
+
+
+class SupabaseRepository:
+    """Non-blocking access to Supabase tables for all agents."""
+
+    def __init__(self, client=None, max_concurrency: int = 8):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether a Supabase client is configured."""
+        return self.client is not None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="supabase"
+            )
+        return self._executor
+
+    async def run(self, query: Callable[[Any], Any], name: str = "query") -> Any:
+        """Run a synchronous query against the client in the thread pool.
+
+        `query` receives the Supabase client and should return the executed
+        response, e.g. `lambda db: db.table("workouts").select("*").execute()`.
+        `name` labels the query's tracing span.
+        """
+        if not self.available:
+            raise RuntimeError("Supabase client is not configured")
+        loop = asyncio.get_running_loop()
+        with telemetry.span(f"supabase.{name}"):
+            return await loop.run_in_executor(
+                self._get_executor(), query, self.client
+            )
+
+    async def fetch_workout_page(
+        self,
+        user_id: str,
+        columns: str = "*",
+        limit: int = 20,
+        muscle_group: Optional[str] = None,
+        since: Optional[str] = None,
+        exercises: Optional[list] = None,
+        before: Optional[tuple] = None,
+        with_count: bool = False,
+    ):
+        """Fetch one page of a user's workouts, newest first.
+
+        `exercises` keeps rows that include any of the given exercise names.
+        `before` is a `(created_at, id)` keyset cursor taken from the last row
+        of the previous page. When `with_count` is set, the response also
+        carries the total number of matching rows in `response.count`.
+        """
+
+        def query(db):
+            builder = db.table(WORKOUTS_TABLE).select(
+                columns, count="exact" if with_count else None
+            )
+            builder = builder.eq("user_id", user_id)
+            if muscle_group:
+                builder = builder.eq("muscle_group", muscle_group)
+            if since:
+                builder = builder.gte("created_at", since)
+            if exercises:
+                builder = builder.ov("exercises", exercises)
+            if before:
+                created_at, workout_id = before
+                builder = builder.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt."{workout_id}")'
+                )
+            return (
+                builder.order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit)
+                .execute()
+            )
+
+        return await self.run(query, name="fetch_workout_page")
+
+    async def insert_workout(self, workout: dict) -> list:
+        """Insert a workout row and return the inserted rows."""
+        response = await self.run(
+            lambda db: db.table(WORKOUTS_TABLE).insert(workout).execute(),
+            name="insert_workout",
+        )
+        return response.data or []
+
+    async def upsert_workouts(self, workouts: list) -> list:
+        """Bulk insert workout rows, ignoring IDs that already exist."""
+        response = await self.run(
+            lambda db: db.table(WORKOUTS_TABLE)
+            .upsert(workouts, on_conflict="id", ignore_duplicates=True)
+            .execute(),
+            name="upsert_workouts",
+        )
+        return response.data or []
+
+    def shutdown(self):
+        """Release the thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+repository = SupabaseRepository(
+    supabase, max_concurrency=int(os.getenv("SUPABASE_MAX_CONCURRENCY", "8"))
+)
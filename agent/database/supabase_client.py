@@ -8,6 +8,10 @@ from pathlib import Path
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+from telemetry.logger import get_logger
+
+log = get_logger("supabase")
+
 # Load environment variables
 # Try multiple possible .env locations
 env_paths = [
@@ -28,10 +32,8 @@ supabase_key = os.getenv("SUPABASE_KEY")
 
 if supabase_url and supabase_key:
     supabase: Client = create_client(supabase_url, supabase_key)
-    print("✅ Supabase client initialized")
+    log.info("supabase_client_initialized")
 else:
     supabase = None
-    print(
-        "⚠️  Supabase credentials not found. Add SUPABASE_URL and SUPABASE_KEY to .env"
-    )
+    log.warning("supabase_credentials_missing", hint="Add SUPABASE_URL and SUPABASE_KEY to .env")
 
@@ -0,0 +1,238 @@
+"""
+Lazy, cursor-paginated access to a user's workout history.
+
+Nothing is fetched when a session starts. Each query window (all workouts,
+or those of one muscle group or exercise, optionally bounded by a start
+date) is loaded a page at a time the first time an intent needs it, and
+further pages are only fetched when a caller asks for more rows than are
+already loaded. Filters are applied by Supabase, so a query costs the same
+number of round trips however long the history is. Once the whole history
+is loaded, lookups by muscle group, exercise or start date are answered by
+the index.
+"""
+
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from database.repository import SupabaseRepository
+from database.workout_index import WorkoutIndex
+
+# Columns needed to list workouts back to the user
+LIST_COLUMNS = "id,name,muscle_group,exercises,sets_reps,created_at"
+POINTER_BYTES = 8  # One reference to a row from a window's list
+
+
+def row_bytes(row: dict) -> int:
+    """Approximate size of a workout row: a flat dict of scalars and string lists."""
+    size = sys.getsizeof(row)
+    for key, value in row.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def exercise_spellings(exercise: str) -> list:
+    """Casings an exercise name is stored with; array filters are case-sensitive."""
+    exercise = exercise.strip()
+    return list(dict.fromkeys([exercise, exercise.lower(), exercise.capitalize(), exercise.title()]))
+
+
+def _matches(
+    workout: dict, muscle_group: Optional[str], since: Optional[str], exercise: Optional[str]
+) -> bool:
+    """Whether a workout belongs to a history window."""
+    if muscle_group and workout.get("muscle_group") != muscle_group:
+        return False
+    if since and str(workout.get("created_at") or "") < since:
+        return False
+    if exercise and exercise not in {e.lower().strip() for e in workout.get("exercises") or []}:
+        return False
+    return True
+
+
+@dataclass
+class HistoryWindow:
+    """Loaded rows and paging cursor for one history query."""
+
+    workouts: list = field(default_factory=list)
+    total: Optional[int] = None  # Total matching rows, known after first page
+    cursor: Optional[tuple] = None  # (created_at, id) of the oldest loaded row
+    exhausted: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)  # One fetch at a time
+
+
+class WorkoutHistory:
+    """Paginated view over one user's workouts, newest first."""
+
+    def __init__(
+        self,
+        user_id: str,
+        repository: SupabaseRepository,
+        page_size: int = 20,
+        columns: str = LIST_COLUMNS,
+        pending: Optional[Callable[[str], list]] = None,
+    ):
+        self.user_id = user_id
+        self.repository = repository
+        self.page_size = page_size
+        self.columns = columns
+        # The user's confirmed workouts not in Supabase yet, newest first
+        self.pending = pending
+        self._windows: dict = {}
+        # Approximate size of the loaded rows, kept up to date as they arrive
+        self.bytes = 0
+        self._sized: set = set()  # IDs of the rows counted in `bytes`
+        # Covers the unfiltered window, so it is always a newest-first prefix
+        self.index = WorkoutIndex()
+
+    @staticmethod
+    def since_days(days) -> Optional[str]:
+        """Start of the UTC day `days` ago, or None if no window was requested.
+
+        Rounded to the day so repeated queries share one history window.
+        """
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            return None
+        if days <= 0:
+            return None
+        start = datetime.now(timezone.utc) - timedelta(days=days)
+        return start.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+    def _window(self, muscle_group: Optional[str], since: Optional[str], exercise: Optional[str] = None):
+        key = (muscle_group, since, exercise)
+        if key not in self._windows:
+            window = HistoryWindow()
+            if not self.repository.available:
+                window.total = 0
+                window.exhausted = True
+            self._windows[key] = window
+        return self._windows[key]
+
+    async def _fetch_page(
+        self,
+        window: HistoryWindow,
+        muscle_group: Optional[str],
+        since: Optional[str],
+        exercise: Optional[str] = None,
+    ):
+        response = await self.repository.fetch_workout_page(
+            self.user_id,
+            columns=self.columns,
+            limit=self.page_size,
+            muscle_group=muscle_group,
+            since=since,
+            exercises=exercise_spellings(exercise) if exercise else None,
+            before=window.cursor,
+            with_count=window.total is None,
+        )
+        rows = response.data or []
+        if muscle_group is None and since is None and exercise is None:
+            for row in rows:
+                self.index.add(row, newest=False)
+        if window.total is None:
+            window.total = response.count if response.count is not None else len(rows)
+            if self.pending:
+                # Journaled workouts are newer than anything Supabase returned
+                fetched = {row.get("id") for row in rows}
+                unflushed = [
+                    w for w in self.pending(self.user_id)
+                    if w.get("id") not in fetched and _matches(w, muscle_group, since, exercise)
+                ]
+                if muscle_group is None and since is None and exercise is None:
+                    for workout in reversed(unflushed):
+                        self.index.add(workout, newest=True)
+                window.workouts.extend(unflushed)
+                window.total += len(unflushed)
+                self._track(unflushed)
+        window.workouts.extend(rows)
+        self._track(rows)
+        if rows:
+            last = rows[-1]
+            window.cursor = (last.get("created_at"), last.get("id"))
+        if len(rows) < self.page_size:
+            window.exhausted = True
+
+    def _from_index(
+        self, limit: int, muscle_group: Optional[str], since: Optional[str], exercise: Optional[str]
+    ) -> Optional[tuple]:
+        """`(workouts, total)` from the index, if it already holds the whole history.
+
+        Combined filters are left to Supabase, which filters and counts them in one query.
+        """
+        everything = self._windows.get((None, None, None))
+        if everything is None or not everything.exhausted:
+            return None
+        if sum(1 for f in (muscle_group, since, exercise) if f) != 1:
+            return None
+        if since:
+            # since_days() windows start at midnight UTC, so whole dates match
+            return self.index.since(since[:10], limit)
+        if exercise:
+            return self.index.for_exercise(exercise, limit)
+        return self.index.for_muscle_group(muscle_group, limit)
+
+    async def recent(
+        self,
+        limit: int = 5,
+        muscle_group: Optional[str] = None,
+        since: Optional[str] = None,
+        exercise: Optional[str] = None,
+    ) -> tuple:
+        """Return `(workouts, total)` for the newest `limit` matching workouts."""
+        exercise = exercise.lower().strip() if exercise else None
+        indexed = self._from_index(limit, muscle_group, since, exercise)
+        if indexed is not None:
+            return indexed
+
+        window = self._window(muscle_group, since, exercise)
+        async with window.lock:
+            while len(window.workouts) < limit and not window.exhausted:
+                await self._fetch_page(window, muscle_group, since, exercise)
+        return window.workouts[:limit], window.total or len(window.workouts)
+
+    def loaded_latest(self) -> Optional[dict]:
+        """Newest workout already loaded, without fetching anything."""
+        window = self._windows.get((None, None, None))
+        return window.workouts[0] if window and window.workouts else None
+
+    async def load_more(
+        self,
+        muscle_group: Optional[str] = None,
+        since: Optional[str] = None,
+        exercise: Optional[str] = None,
+    ) -> list:
+        """Fetch the next page of a window and return the newly loaded rows."""
+        exercise = exercise.lower().strip() if exercise else None
+        window = self._window(muscle_group, since, exercise)
+        async with window.lock:
+            if window.exhausted:
+                return []
+            loaded = len(window.workouts)
+            await self._fetch_page(window, muscle_group, since, exercise)
+            return window.workouts[loaded:]
+
+    def record(self, workout: dict):
+        """Add a newly saved workout to the index and every loaded window it belongs to."""
+        if not self.index.add(workout, newest=True):
+            return
+        for (muscle_group, since, exercise), window in self._windows.items():
+            if not _matches(workout, muscle_group, since, exercise):
+                continue
+            window.workouts.insert(0, workout)
+            self._track([workout])
+            if window.total is not None:
+                window.total += 1
+
+    def _track(self, rows: list):
+        """Count rows newly held by a window; a row shared by windows is counted once."""
+        for row in rows:
+            self.bytes += POINTER_BYTES
+            if row.get("id") not in self._sized:
+                self._sized.add(row.get("id"))
+                self.bytes += row_bytes(row)
@@ -0,0 +1,94 @@
+"""
+In-memory index over the loaded part of one user's workout history.
+
+The index covers a contiguous newest-first prefix of the history: rows from
+the unfiltered history window as pages are loaded (appended at the old end)
+and workouts saved during the session (added at the new end). Every update
+is incremental. Lookups by muscle group, exercise or start date only touch
+the rows they return, and running counters give the totals without a scan.
+"""
+
+import bisect
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Optional
+
+
+def _date_key(workout: dict) -> str:
+    created_at = workout.get("created_at")
+    if created_at:
+        return str(created_at)[:10]
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class WorkoutIndex:
+    """Newest-first lookups by muscle group, date and exercise."""
+
+    def __init__(self):
+        self._ids: set = set()
+        self.by_muscle_group: defaultdict = defaultdict(deque)
+        self.by_date: defaultdict = defaultdict(deque)
+        self.by_exercise: defaultdict = defaultdict(deque)
+        self.dates: list = []  # Sorted YYYY-MM-DD keys of `by_date`
+        self.muscle_group_counts: Counter = Counter()
+        self.exercise_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, workout: dict, newest: bool = True) -> bool:
+        """Index a workout; `newest` adds it ahead of everything already indexed."""
+        workout_id = workout.get("id")
+        if workout_id in self._ids:
+            return False
+        self._ids.add(workout_id)
+
+        def push(bucket: deque):
+            if newest:
+                bucket.appendleft(workout)
+            else:
+                bucket.append(workout)
+
+        muscle_group = (workout.get("muscle_group") or "").lower()
+        push(self.by_muscle_group[muscle_group])
+        self.muscle_group_counts[muscle_group] += 1
+        date = _date_key(workout)
+        if date not in self.by_date:
+            bisect.insort(self.dates, date)
+        push(self.by_date[date])
+        for exercise in {e.lower().strip() for e in workout.get("exercises") or []}:
+            push(self.by_exercise[exercise])
+            self.exercise_counts[exercise] += 1
+        return True
+
+    def for_muscle_group(self, muscle_group: str, limit: Optional[int] = None) -> tuple:
+        """`(workouts, total)` for a muscle group, newest first."""
+        muscle_group = muscle_group.lower()
+        return self._head(self.by_muscle_group.get(muscle_group), limit), self.muscle_group_counts[muscle_group]
+
+    def for_exercise(self, exercise: str, limit: Optional[int] = None) -> tuple:
+        """`(workouts, total)` for an exercise, newest first."""
+        exercise = exercise.lower().strip()
+        return self._head(self.by_exercise.get(exercise), limit), self.exercise_counts[exercise]
+
+    def on_date(self, date: str, limit: Optional[int] = None) -> list:
+        """Workouts on a YYYY-MM-DD date."""
+        return self._head(self.by_date.get(date), limit)
+
+    def since(self, date: str, limit: Optional[int] = None) -> tuple:
+        """`(workouts, total)` from a YYYY-MM-DD date onwards, newest first."""
+        days = self.dates[bisect.bisect_left(self.dates, date):]
+        total = sum(len(self.by_date[day]) for day in days)
+        workouts = []
+        for day in reversed(days):
+            if limit is not None and len(workouts) >= limit:
+                break
+            workouts += self._head(self.by_date[day], None if limit is None else limit - len(workouts))
+        return workouts, total
+
+    @staticmethod
+    def _head(bucket: Optional[deque], limit: Optional[int]) -> list:
+        if not bucket:
+            return []
+        return list(islice(bucket, limit))
@@ -0,0 +1,269 @@
+"""
+Write-behind queue for workout inserts.
+
+A confirmed workout is acknowledged as soon as it is appended to a local
+append-only journal and fsynced. A background task then upserts queued
+workouts to Supabase in batches, retrying with backoff. Workout IDs are
+unique, so the upsert ignores rows that already exist and retries or replays
+are idempotent.
+
+Each worker process writes its own journal file and holds an exclusive lock
+on it. When a process starts, it adopts any journal whose lock is free,
+because that journal was left by a worker that exited with writes still
+pending. The adopting process replays those writes.
+
+A batch that fails with an error retrying can't fix (a bad row, a schema or
+constraint error) is split until the failing rows are isolated. Those rows
+are moved to a dead-letter file in the journal directory, so they don't
+block the workouts queued behind them. Rows still waiting to be flushed are
+visible through `pending_for`, so history reads include them.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from database.repository import SupabaseRepository, repository as default_repository
+from telemetry.logger import get_logger
+from telemetry.tracing import telemetry
+
+DEFAULT_JOURNAL_DIR = Path(__file__).parent.parent / "data" / "journal"
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+# Errors a retry can't fix: Postgres data exceptions (22), constraint
+# violations (23) and syntax or schema errors (42), and PostgREST request
+# (PGRST1xx) and schema cache (PGRST2xx) errors
+PERMANENT_ERROR_CODES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+log = get_logger("write_behind")
+
+
+def is_permanent(error: Exception) -> bool:
+    """Whether an insert that failed with `error` would fail again on retry."""
+    if isinstance(error, TypeError):
+        return True  # The row can't be serialized
+    code = str(getattr(error, "code", None) or "")
+    return code.startswith(PERMANENT_ERROR_CODES)
+
+
+def _read_pending(path: Path) -> dict:
+    """Return {workout_id: row} for inserts in a journal that were never acked."""
+    pending = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn final line from a crash mid-write
+            if entry.get("op") == "insert":
+                pending[entry["id"]] = entry["row"]
+            elif entry.get("op") == "ack":
+                for workout_id in entry.get("ids", []):
+                    pending.pop(workout_id, None)
+    return pending
+
+
+class WorkoutWriteQueue:
+    """Journals workout inserts locally and flushes them to Supabase in batches."""
+
+    def __init__(
+        self,
+        repository: SupabaseRepository = default_repository,
+        journal_dir: Path = DEFAULT_JOURNAL_DIR,
+        batch_size: int = 50,
+        flush_interval: float = 0.25,
+        max_backoff: float = 30.0,
+        compact_bytes: int = 1_000_000,
+    ):
+        self.repository = repository
+        self.journal_dir = Path(journal_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.compact_bytes = compact_bytes
+
+        self._pending: dict = {}  # workout_id -> row, in insertion order
+        self._journal = None
+        # One thread keeps journal writes ordered and off the event loop
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._wakeup: Optional[asyncio.Event] = None
+        self._drained: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+        # Metrics
+        self.flushed = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def pending_for(self, user_id: str) -> list:
+        """A user's workouts not flushed to Supabase yet, newest first."""
+        return [row for row in reversed(self._pending.values()) if row.get("user_id") == user_id]
+
+    async def _run_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    def _append(self, entries: list):
+        for entry in entries:
+            self._journal.write(json.dumps(entry, default=str) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _compact(self):
+        """Truncate the journal once everything in it has been acked."""
+        if self._journal.tell() >= self.compact_bytes:
+            self._journal.truncate(0)
+            os.fsync(self._journal.fileno())
+
+    def _open_journal(self) -> dict:
+        """Open this process's journal and adopt orphaned journals."""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        path = self.journal_dir / f"workouts-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        self._journal = open(path, "a", encoding="utf-8")
+        fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        adopted = {}
+        for orphan in sorted(self.journal_dir.glob("workouts-*.jsonl")):
+            if orphan == path:
+                continue
+            with open(orphan, "r+", encoding="utf-8") as f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # Owned by a live worker
+                pending = _read_pending(orphan)
+                # Copy into our own journal before removing the orphan
+                self._append(
+                    [{"op": "insert", "id": k, "row": v} for k, v in pending.items()]
+                )
+                orphan.unlink()
+                adopted.update(pending)
+        return adopted
+
+    async def start(self):
+        """Open the journal, replay unflushed writes and start the flusher."""
+        async with self._start_lock:
+            if self._flusher is not None:
+                return
+            self._wakeup = asyncio.Event()
+            self._drained = asyncio.Event()
+            adopted = await self._run_io(self._open_journal)
+            if adopted:
+                log.info("journal_replay", workouts=len(adopted))
+            self._pending.update(adopted)
+            self._flusher = asyncio.create_task(self._flush_loop())
+            self._wakeup.set()
+
+    async def enqueue(self, workout: dict) -> bool:
+        """Durably journal a workout; it is flushed to Supabase in the background."""
+        await self.start()
+        row = dict(workout)
+        # Register before journaling so compaction never truncates this entry
+        self._pending[row["id"]] = row
+        self._drained.clear()
+        await self._run_io(self._append, [{"op": "insert", "id": row["id"], "row": row}])
+        self._wakeup.set()
+        return True
+
+    def _write_dead_letter(self, row: dict, error: str):
+        with open(self.journal_dir / DEAD_LETTER_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"row": row, "error": error}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _insert(self, batch: list) -> list:
+        """Upsert a batch and return its settled IDs, inserted or dead-lettered.
+
+        Raises if the batch failed with an error worth retrying.
+        """
+        try:
+            await self.repository.upsert_workouts(batch)
+            return [row["id"] for row in batch]
+        except Exception as e:
+            if not is_permanent(e):
+                raise
+            if len(batch) > 1:
+                # Split to find the bad rows; the rest still go in
+                middle = len(batch) // 2
+                return await self._insert(batch[:middle]) + await self._insert(batch[middle:])
+            row = batch[0]
+            await self._run_io(self._write_dead_letter, row, str(e))
+            self.dead_lettered += 1
+            telemetry.add("workouts.dead_lettered")
+            log.error("workout_dead_lettered", workout_id=row["id"], user_id=row.get("user_id"), error=str(e))
+            return [row["id"]]
+
+    async def _flush_loop(self):
+        backoff = self.flush_interval
+        while True:
+            if not self._pending:
+                self._drained.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Give concurrent confirmations a moment to join the batch
+            await asyncio.sleep(self.flush_interval)
+
+            batch = list(self._pending.values())[: self.batch_size]
+            dead_lettered = self.dead_lettered
+            try:
+                ids = await self._insert(batch)
+            except Exception as e:
+                self.failed_attempts += 1
+                log.warning("workout_batch_failed", rows=len(batch), retry_in=round(backoff, 1), error=str(e))
+                await asyncio.sleep(backoff * (1 + random.random()))
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = self.flush_interval
+            await self._run_io(self._append, [{"op": "ack", "ids": ids}])
+            for workout_id in ids:
+                self._pending.pop(workout_id, None)
+            if not self._pending:
+                await self._run_io(self._compact)
+            self.flushed += len(ids) - (self.dead_lettered - dead_lettered)
+            self.batches += 1
+            log.debug("workouts_flushed", rows=len(batch))
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until every queued workout has been flushed."""
+        if self._flusher is None or not self._pending:
+            return
+        await asyncio.wait_for(self._drained.wait(), timeout)
+
+    async def close(self, timeout: float = 5.0):
+        """Flush what we can, then stop. Anything left stays in the journal."""
+        try:
+            await self.drain(timeout)
+        except asyncio.TimeoutError:
+            log.warning("journal_left_for_replay", workouts=self.pending_count)
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._journal:
+            journal = self._journal
+            self._journal = None
+            # Nothing left to replay, so the journal can go
+            if not self._pending:
+                os.unlink(journal.name)
+            await self._run_io(journal.close)
+
+
+def create_write_queue(
+    repository: SupabaseRepository = default_repository,
+) -> WorkoutWriteQueue:
+    """Create the write queue configured by environment variables."""
+    return WorkoutWriteQueue(
+        repository=repository,
+        journal_dir=Path(os.getenv("WORKOUT_JOURNAL_DIR", DEFAULT_JOURNAL_DIR)),
+        batch_size=int(os.getenv("WORKOUT_BATCH_SIZE", "50")),
+    )
@@ -0,0 +1,113 @@
+"""
+Checkpointers that hold per-session conversation state for the agent graph.
+
+The backend is chosen with GRAPH_CHECKPOINTER:
+- memory (default): in-process LRU, bounded by GRAPH_CHECKPOINT_MAX_THREADS;
+  lost when the job process exits, so nothing carries over to a later session
+- sqlite: durable local file at GRAPH_CHECKPOINT_URL (needs langgraph-checkpoint-sqlite),
+  shared by the job processes on one host
+- redis: Redis-compatible server at GRAPH_CHECKPOINT_URL (needs langgraph-checkpoint-redis),
+  which lets a session resume its pending confirmation on another worker
+"""
+
+import os
+from collections import OrderedDict
+from typing import Any
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class LRUMemorySaver(InMemorySaver):
+    """In-memory checkpointer that keeps only the latest checkpoint per thread
+    and evicts the least recently used threads beyond `max_threads`."""
+
+    def __init__(self, max_threads: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self._threads: OrderedDict = OrderedDict()
+        self._latest_blobs: dict = {}
+
+    def _touch(self, thread_id: str):
+        self._threads[thread_id] = None
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            evicted, _ = self._threads.popitem(last=False)
+            self.delete_thread(evicted)
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._threads:
+            self._threads.move_to_end(thread_id)
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        result = super().put(config, checkpoint, metadata, new_versions)
+
+        # Drop superseded checkpoints along with their pending writes
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in list(checkpoints):
+            if checkpoint_id != checkpoint["id"]:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        # Drop channel values that the new checkpoint no longer references
+        for channel, version in new_versions.items():
+            key = (thread_id, checkpoint_ns, channel)
+            previous = self._latest_blobs.get(key)
+            if previous is not None and previous != version:
+                self.blobs.pop((thread_id, checkpoint_ns, channel, previous), None)
+            self._latest_blobs[key] = version
+
+        self._touch(thread_id)
+        return result
+
+    def total_bytes(self) -> int:
+        """Serialized size of every stored checkpoint, channel value and pending write."""
+        size = sum(
+            len(checkpoint[1]) + len(metadata[1])
+            for namespaces in self.storage.values()
+            for checkpoints in namespaces.values()
+            for checkpoint, metadata, _ in checkpoints.values()
+        )
+        size += sum(len(write[2][1]) for writes in self.writes.values() for write in writes.values())
+        size += sum(len(blob[1]) for blob in self.blobs.values())
+        return size
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._threads.pop(thread_id, None)
+        for key in [k for k in self._latest_blobs if k[0] == thread_id]:
+            del self._latest_blobs[key]
+
+
+def create_checkpointer(backend: str = None, url: str = None) -> Any:
+    """Create the checkpointer configured for this worker."""
+    backend = (backend or os.getenv("GRAPH_CHECKPOINTER", "memory")).lower()
+    url = url or os.getenv("GRAPH_CHECKPOINT_URL")
+
+    if backend == "memory":
+        max_threads = int(os.getenv("GRAPH_CHECKPOINT_MAX_THREADS", "1000"))
+        return LRUMemorySaver(max_threads=max_threads)
+
+    if backend == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(
+                "GRAPH_CHECKPOINTER=sqlite requires langgraph-checkpoint-sqlite"
+            ) from e
+        return AsyncSqliteSaver(aiosqlite.connect(url or "checkpoints.sqlite"))
+
+    if backend == "redis":
+        try:
+            from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+        except ImportError as e:
+            raise ImportError(
+                "GRAPH_CHECKPOINTER=redis requires langgraph-checkpoint-redis"
+            ) from e
+        return AsyncRedisSaver(redis_url=url or "redis://localhost:6379")
+
+    raise ValueError(f"Unknown GRAPH_CHECKPOINTER backend: {backend}")
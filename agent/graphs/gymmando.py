@@ -1,37 +1,178 @@
 """
 Graph Orchestrator: Defines the agent workflow and routing logic.
+
+livekit-agents runs each job (one session) in its own process, so the graph
+is compiled once per job process, ideally while the process is prewarmed.
+Conversation state is kept by the checkpointer, keyed by a thread ID derived
+from the user ID and the session (the LiveKit room), so anonymous sessions
+that share a user ID never share a pending workout. The default in-memory
+checkpointer goes away with the job process: a pending confirmation only
+survives into a later session with GRAPH_CHECKPOINTER=sqlite (same host) or
+redis (any host). Cached per-user data is bounded by the session state
+manager, which a background sweep keeps within its budget.
 """
 
+import asyncio
+import os
+from collections import defaultdict
+
 from langgraph.graph import END, StateGraph
 
+from agents.fast_path_router import FastPathRouter
+from agents.motivation_agent import MotivationAgent
 from agents.parsing_agent import ParsingAgent
 from agents.workout_agent import WorkoutAgent
+from database.repository import SupabaseRepository, repository as default_repository
+from database.write_behind import create_write_queue
+from graphs.checkpointer import LRUMemorySaver, create_checkpointer
+from graphs.session_state import create_session_state
 from graphs.types import GymmandoState
+from telemetry.logger import get_logger
+from telemetry.tracing import telemetry
+
+log = get_logger("graph")
+
+# Per-turn fields; everything else in the state is the conversational slots
+TURN_FIELDS = {"transcript": "", "intent": None, "workout_data": None, "response": ""}
 
 
 class GymmandoGraph:
     """Main graph orchestrator for GYMMANDO agent system."""
 
-    def __init__(self, user_id: str = "default_user"):
-        """Initialize the graph with user_id."""
-        self.user_id = user_id
-        self.parsing_agent = ParsingAgent()
-        self.workout_agent = WorkoutAgent(user_id=user_id)
+    def __init__(
+        self,
+        checkpointer=None,
+        repository: SupabaseRepository = default_repository,
+    ):
+        """Initialize the graph and its checkpointer."""
+        self.checkpointer = checkpointer or create_checkpointer()
+        self.fast_path_router = FastPathRouter()
+        self.parsing_agent = ParsingAgent(on_intent_type=self._on_intent_type)
+        write_queue = create_write_queue(repository)
+        # History reads include workouts still waiting in the write-behind journal
+        self.sessions = create_session_state(
+            repository, on_evict=self._compact_thread, pending_writes=write_queue.pending_for
+        )
+        self.workout_agent = WorkoutAgent(
+            repository=repository, write_queue=write_queue, sessions=self.sessions
+        )
+        self.motivation_agent = MotivationAgent()
         self.graph = None
+        self._checkpointer_ready = False
+        self._sweeper = None
+        self._user_threads: defaultdict = defaultdict(set)  # user_id -> thread IDs
         self._build_graph()
 
+    def thread_config(self, user_id: str, session_id: str = None) -> dict:
+        """Graph config that selects a session's conversation thread."""
+        thread_id = f"{user_id}:{session_id}" if session_id else user_id
+        self._user_threads[user_id].add(thread_id)
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def setup(self):
+        """Prepare checkpointer backends that need async initialization,
+        replay any workout writes a previous worker left in the journal and
+        start the session state sweep."""
+        if self._checkpointer_ready:
+            return
+        asetup = getattr(self.checkpointer, "asetup", None)
+        if asetup:
+            await asetup()
+        if self.workout_agent.repository.available:
+            await self.workout_agent.write_queue.start()
+        interval = float(os.getenv("SESSION_SWEEP_INTERVAL", "30"))
+        if interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+        self._checkpointer_ready = True
+
+    async def flush_writes(self, timeout: float = 5.0):
+        """Wait for queued workout inserts to reach Supabase."""
+        try:
+            await self.workout_agent.write_queue.drain(timeout)
+        except asyncio.TimeoutError:
+            log.warning("writes_still_queued", workouts=self.workout_agent.write_queue.pending_count)
+
+    async def prewarm(self, user_id: str):
+        """Load user data the first turns are likely to need."""
+        await self.setup()
+        await self.workout_agent.prewarm(user_id)
+
+    async def end_session(self, user_id: str):
+        """The user left; their cached state is evicted first when memory is tight."""
+        self.parsing_agent.cancel_speculation(user_id)
+        self.sessions.end_session(user_id)
+
+    async def speculate(self, user_id: str, transcript: str, session_id: str = None):
+        """Start parsing an interim transcript if the final one is likely to need it."""
+        try:
+            snapshot = await self.graph.aget_state(self.thread_config(user_id, session_id))
+            state = {**(snapshot.values or {}), **TURN_FIELDS, "transcript": transcript, "user_id": user_id}
+            # Turns the rules or the intent cache answer never reach the parsing LLM,
+            # and replies to a pending workout are parsed with it in the prompt
+            if (
+                state.get("pending_workout")
+                or self.fast_path_router.route(state)
+                or self.parsing_agent.intent_cache.contains(state)
+            ):
+                return
+            self.parsing_agent.speculate(user_id, transcript)
+        except Exception:
+            log.exception("speculation_failed")
+
+    def sweep_sessions(self) -> dict:
+        """Evict idle or over-budget sessions and report the worker's session memory."""
+        stats = self.sessions.sweep()
+        if isinstance(self.checkpointer, LRUMemorySaver):
+            stats["checkpoint_bytes"] = self.checkpointer.total_bytes()
+        telemetry.set_gauge("session_state.sessions", stats["sessions"])
+        telemetry.set_gauge("session_state.bytes", stats["bytes"])
+        if "checkpoint_bytes" in stats:
+            telemetry.set_gauge("session_state.checkpoint_bytes", stats["checkpoint_bytes"])
+        return stats
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                log.debug("session_sweep", **self.sweep_sessions())
+            except Exception:
+                log.exception("session_sweep_failed")
+
+    async def _compact_thread(self, user_id: str):
+        """Reduce an evicted user's checkpoints to the conversational slots."""
+        # Keep the registration: the user may come back and be evicted again
+        thread_ids = list(self._user_threads.get(user_id, ()))
+        # Durable backends don't hold the state in worker memory
+        if not isinstance(self.checkpointer, LRUMemorySaver):
+            return
+        for thread_id in thread_ids:
+            config = {"configurable": {"thread_id": thread_id}}
+            snapshot = await self.graph.aget_state(config)
+            if snapshot.next or not any(snapshot.values.get(k) for k in TURN_FIELDS):
+                continue  # Mid-turn, or nothing to drop
+            await self.graph.aupdate_state(config, dict(TURN_FIELDS), as_node="respond")
+
+    async def _on_intent_type(self, intent_type: str, state: GymmandoState):
+        """Start prefetching as soon as the intent type has streamed in."""
+        self.workout_agent.start_prefetch(state.get("user_id", "default_user"), intent_type)
+
+    def _should_parse(self, state: GymmandoState) -> str:
+        """Skip the parsing LLM when the fast path already resolved the intent."""
+        if state.get("intent"):
+            return "workout"
+        return "parse"
+
     def _should_route_to_agent(self, state: GymmandoState) -> str:
         """Route based on intent type or pending workout confirmation."""
         # Check if there's a pending workout confirmation
-        workout_data = state.get("workout_data")
-        if workout_data and workout_data.get("status") == "pending_confirmation":
+        if state.get("pending_workout"):
             # Route to workout agent to handle confirmation
             return "workout"
-        
+
         intent = state.get("intent")
         if not intent:
             return "workout"  # Default route
-        
+
         intent_type = intent.get("type")
 
         if intent_type in ["log_workout", "view_workouts", "search_routines"]:
@@ -45,12 +186,21 @@ class GymmandoGraph:
         # Create the graph
         workflow = StateGraph(GymmandoState)
 
-        # Add nodes
-        workflow.add_node("parse", self.parsing_agent.execute)
-        workflow.add_node("workout", self.workout_agent.execute)
+        # Add nodes, each traced as its own span
+        workflow.add_node("pre_route", telemetry.traced("node.pre_route", self.fast_path_router.execute))
+        workflow.add_node("parse", telemetry.traced("node.parse", self.parsing_agent.execute))
+        workflow.add_node("workout", telemetry.traced("node.workout", self.workout_agent.execute))
+        workflow.add_node("respond", telemetry.traced("node.respond", self.motivation_agent.execute))
 
         # Set entry point
-        workflow.set_entry_point("parse")
+        workflow.set_entry_point("pre_route")
+
+        # Only call the parsing LLM when the rules aren't confident
+        workflow.add_conditional_edges(
+            "pre_route",
+            self._should_parse,
+            {"parse": "parse", "workout": "workout"},
+        )
 
         # Add conditional routing from parsing
         workflow.add_conditional_edges(
@@ -59,20 +209,33 @@ class GymmandoGraph:
             {"workout": "workout"},
         )
 
-        # Workout agent goes directly to END
-        workflow.add_edge("workout", END)
+        # Workout results are voiced in the user's personality, then END
+        workflow.add_edge("workout", "respond")
+        workflow.add_edge("respond", END)
 
         # Compile the graph
-        self.graph = workflow.compile()
-        print("✅ Agent graph compiled successfully")
+        self.graph = workflow.compile(checkpointer=self.checkpointer)
+        log.info("graph_compiled")
 
     def build(self):
         """Return the compiled graph."""
         return self.graph
 
 
-def build_graph(user_id: str = "default_user"):
-    """Build and compile the LangGraph workflow."""
-    graph_instance = GymmandoGraph(user_id=user_id)
-    return graph_instance.build()
+_shared_graph = None
+
+
+def get_gymmando_graph(**options) -> GymmandoGraph:
+    """Return this job process's graph, compiling it on first use.
+
+    `options` are passed to GymmandoGraph and only apply to that first call.
+    """
+    global _shared_graph
+    if _shared_graph is None:
+        _shared_graph = GymmandoGraph(**options)
+    return _shared_graph
+
 
+def build_graph():
+    """Return this process's compiled LangGraph workflow."""
+    return get_gymmando_graph().build()
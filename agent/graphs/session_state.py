@@ -0,0 +1,172 @@
+"""
+Bounded per-user session state for the worker process.
+
+Every user seen by the worker gets a `SessionEntry` holding their lazily
+loaded workout history. The history counts the bytes of its rows as they are
+loaded, so the sweep only sums per-session totals and never walks the rows
+on the event loop. The sweep keeps the total bounded:
+- ended sessions idle for longer than `idle_seconds` are evicted; a user
+  still connected but resting between sets keeps their history,
+- when the total exceeds `max_bytes`, the least recently used sessions are
+  evicted, ended ones first.
+
+Eviction drops the cached history and calls `on_evict`, which the graph uses
+to compact the user's checkpoint down to the conversational slots
+(`pending_workout`, `collected_workout_data`). A returning user keeps their
+half-logged workout and simply reloads history on the next view. The graph
+runs the sweep every SESSION_SWEEP_INTERVAL seconds.
+
+Configuration:
+- SESSION_IDLE_SECONDS (default 600)
+- SESSION_STATE_MAX_MB (default 64)
+- SESSION_SWEEP_INTERVAL (default 30)
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from database.repository import SupabaseRepository
+from database.workout_history import WorkoutHistory
+from telemetry.logger import get_logger
+from telemetry.tracing import telemetry
+
+log = get_logger("session_state")
+
+
+@dataclass
+class SessionEntry:
+    """Cached state and accounting for one user on this worker."""
+
+    history: WorkoutHistory
+    last_active: float = field(default_factory=time.monotonic)
+    active: bool = True  # False once the user's session has ended
+
+    @property
+    def bytes(self) -> int:
+        return self.history.bytes
+
+
+class SessionStateManager:
+    """Tracks, measures and evicts per-user session state."""
+
+    def __init__(
+        self,
+        repository: SupabaseRepository,
+        max_sessions: int = 256,
+        max_bytes: int = 64 * 2**20,
+        idle_seconds: float = 600.0,
+        on_evict: Optional[Callable[[str], Awaitable[None]]] = None,
+        pending_writes: Optional[Callable[[str], list]] = None,
+    ):
+        self.repository = repository
+        self.pending_writes = pending_writes
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.on_evict = on_evict
+        self._sessions: OrderedDict = OrderedDict()  # user_id -> SessionEntry, LRU first
+        self._evict_tasks: set = set()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def history_for(self, user_id: str) -> WorkoutHistory:
+        """Return the user's cached history and mark their session active."""
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            entry = SessionEntry(
+                history=WorkoutHistory(user_id, self.repository, pending=self.pending_writes)
+            )
+            self._sessions[user_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._notify_evicted(evicted, reason="max_sessions")
+        else:
+            self._sessions.move_to_end(user_id)
+            entry.last_active = time.monotonic()
+            entry.active = True
+        return entry.history
+
+    def end_session(self, user_id: str):
+        """Mark a user's session as ended; it becomes first in line for eviction."""
+        entry = self._sessions.get(user_id)
+        if entry is not None:
+            entry.active = False
+
+    def evict(self, user_id: str, reason: str = "idle") -> bool:
+        """Drop a user's cached history and compact their conversation state."""
+        entry = self._sessions.pop(user_id, None)
+        if entry is None:
+            return False
+        self._notify_evicted(user_id, reason, entry.bytes)
+        return True
+
+    def _notify_evicted(self, user_id: str, reason: str, freed: int = 0):
+        telemetry.add(f"session_state.evicted.{reason}")
+        log.info("session_evicted", user_id=user_id, reason=reason, freed_bytes=freed)
+        if self.on_evict is None:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self.on_evict(user_id))
+        except RuntimeError:
+            return  # No event loop (e.g. offline use); nothing to compact
+        self._evict_tasks.add(task)
+        task.add_done_callback(self._evict_tasks.discard)
+
+    def total_bytes(self) -> int:
+        """Bytes held by every session's loaded history."""
+        return sum(entry.bytes for entry in self._sessions.values())
+
+    def sweep(self, now: Optional[float] = None) -> dict:
+        """Evict idle ended sessions, then trim to the byte budget. Returns `stats()`."""
+        now = time.monotonic() if now is None else now
+        for user_id in [
+            user_id for user_id, entry in self._sessions.items()
+            if not entry.active and now - entry.last_active > self.idle_seconds
+        ]:
+            self.evict(user_id, reason="idle")
+
+        total = self.total_bytes()
+        if total > self.max_bytes:
+            # Ended sessions go first, then the least recently used active ones
+            victims = sorted(self._sessions.items(), key=lambda item: item[1].active)
+            for user_id, entry in victims:
+                if total <= self.max_bytes:
+                    break
+                total -= entry.bytes
+                self.evict(user_id, reason="memory")
+
+        return self.stats(total)
+
+    def stats(self, total: Optional[int] = None) -> dict:
+        """Session totals for this worker."""
+        entries = list(self._sessions.values())
+        return {
+            "sessions": len(entries),
+            "active_sessions": sum(1 for e in entries if e.active),
+            "bytes": self.total_bytes() if total is None else total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def session_bytes(self) -> dict:
+        """Bytes per user."""
+        return {user_id: entry.bytes for user_id, entry in self._sessions.items()}
+
+
+def create_session_state(
+    repository: SupabaseRepository,
+    on_evict: Optional[Callable[[str], Awaitable[None]]] = None,
+    pending_writes: Optional[Callable[[str], list]] = None,
+) -> SessionStateManager:
+    """Session state manager configured from the environment."""
+    return SessionStateManager(
+        repository,
+        max_bytes=int(float(os.getenv("SESSION_STATE_MAX_MB", "64")) * 2**20),
+        idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", "600")),
+        on_evict=on_evict,
+        pending_writes=pending_writes,
+    )
@@ -14,4 +14,6 @@ class GymmandoState(TypedDict):
     response: str  # Final response to user
     personality_mode: str  # bro, coach, or commander
     user_id: str  # User identifier
+    pending_workout: Optional[dict]  # Workout awaiting the user's confirmation
+    collected_workout_data: Optional[dict]  # Workout fields collected across turns
 
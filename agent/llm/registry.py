@@ -0,0 +1,127 @@
+"""
+LLM client registry shared by every agent in the worker process.
+
+Chat models are cached per (model, temperature), so all agents and graphs
+reuse the same clients. Every client sends requests through one keep-alive
+HTTP/2 connection pool. Each model gets a token-bucket rate limiter and a
+concurrency limit, which keeps us under OpenAI rate limits during peaks.
+
+Set GYMMANDO_LLM_BACKEND=stub to use a local stub model, which needs no
+network access or API key.
+"""
+
+import asyncio
+import os
+from typing import Callable, Optional
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from llm.stub import StubChatModel
+from telemetry.llm_callback import llm_callback
+
+
+class LLMRegistry:
+    """Process-wide cache of chat models with shared limits per model."""
+
+    def __init__(
+        self,
+        backend: str = "openai",
+        max_concurrency: int = 16,
+        requests_per_second: float = 50.0,
+        max_connections: int = 100,
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_connections = max_connections
+
+        self._models: dict = {}  # (model, temperature) -> chat model
+        self._limiters: dict = {}  # model -> InMemoryRateLimiter
+        self._semaphores: dict = {}  # model -> asyncio.Semaphore
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._model_factory: Optional[Callable[[str, float], BaseChatModel]] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """One pooled HTTP/2 client, so a turn never waits on a new TLS handshake."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=120,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+        return self._http_client
+
+    def _rate_limiter(self, model: str) -> Optional[InMemoryRateLimiter]:
+        if self.requests_per_second <= 0:
+            return None
+        if model not in self._limiters:
+            self._limiters[model] = InMemoryRateLimiter(
+                requests_per_second=self.requests_per_second,
+                check_every_n_seconds=0.01,
+                max_bucket_size=max(self.requests_per_second, 1),
+            )
+        return self._limiters[model]
+
+    def get_chat_model(self, model: str, temperature: float = 0.0) -> BaseChatModel:
+        """Return the shared chat model for (model, temperature)."""
+        key = (model, temperature)
+        if key not in self._models:
+            if self._model_factory is not None:
+                chat_model = self._model_factory(model, temperature)
+                chat_model.callbacks = [llm_callback]
+            elif self.backend == "stub":
+                chat_model = StubChatModel(model=model, callbacks=[llm_callback])
+            else:
+                # Imported here so the stub backend works without the OpenAI client
+                from langchain_openai import ChatOpenAI
+
+                chat_model = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    http_async_client=self.http_client,
+                    rate_limiter=self._rate_limiter(model),
+                    stream_usage=True,
+                    callbacks=[llm_callback],
+                )
+            self._models[key] = chat_model
+        return self._models[key]
+
+    def set_model_factory(self, factory: Optional[Callable[[str, float], BaseChatModel]]):
+        """Build chat models with `factory(model, temperature)`, e.g. fakes for benchmarks."""
+        self._model_factory = factory
+        self._models.clear()
+
+    def concurrency_limit(self, model: str) -> asyncio.Semaphore:
+        """Semaphore that caps in-flight requests to a model across the process."""
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[model]
+
+    async def close(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+registry = LLMRegistry(
+    backend=os.getenv("GYMMANDO_LLM_BACKEND", "openai"),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+    requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", "50")),
+)
+
+
+def get_chat_model(model: str, temperature: float = 0.0) -> BaseChatModel:
+    """Return the shared chat model for (model, temperature)."""
+    return registry.get_chat_model(model, temperature)
+
+
+def concurrency_limit(model: str) -> asyncio.Semaphore:
+    """Semaphore that caps in-flight requests to a model across the process."""
+    return registry.concurrency_limit(model)
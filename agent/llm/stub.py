@@ -0,0 +1,106 @@
+"""
+Local stub chat model for tests and offline runs.
+
+It answers deterministically without network access. Tool-bound calls return
+a call to the first tool with a keyword-based intent, streamed in small chunks
+like the real API. Plain calls return a short canned reply. An optional delay
+(GYMMANDO_STUB_LATENCY_MS) simulates model latency.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+VIEW_WORDS = ("show", "view", "what did", "history", "last time")
+USER_MESSAGE_RE = re.compile(r'User message: "(.*)"')
+STUB_REPLY = "Nice work! Keep it up."
+
+
+def stub_intent(text: str) -> dict:
+    """Keyword intent for a transcript, shaped like ParsedIntent."""
+    # Prompts quote the transcript; only classify that part
+    match = USER_MESSAGE_RE.search(text)
+    lowered = (match.group(1) if match else text).lower()
+    if any(word in lowered for word in VIEW_WORDS):
+        return {"type": "view_workouts", "data": {}}
+    if any(word in lowered for word in ("did", "workout", "log")):
+        return {"type": "log_workout", "data": {}}
+    return {"type": "general_query", "data": {}}
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic chat model that never leaves the process."""
+
+    model: str = "stub"
+    latency_ms: float = float(os.getenv("GYMMANDO_STUB_LATENCY_MS", "0"))
+
+    @property
+    def _llm_type(self) -> str:
+        return "gymmando-stub"
+
+    def _delay(self) -> float:
+        """Seconds to wait before answering."""
+        return self.latency_ms / 1000
+
+    def _intent(self, text: str) -> dict:
+        return stub_intent(text)
+
+    def bind_tools(self, tools: list, tool_choice: Optional[str] = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _message(self, messages: List[BaseMessage], tools: Optional[list]) -> AIMessage:
+        if tools:
+            text = messages[-1].content if messages else ""
+            return AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": tools[0]["function"]["name"],
+                    "args": self._intent(text),
+                    "id": "stub_call",
+                }],
+            )
+        return AIMessage(content=STUB_REPLY)
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+    def _chunks(self, message: AIMessage) -> Iterator[AIMessageChunk]:
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            args = json.dumps(call["args"])
+            for i in range(0, len(args), 8):
+                yield AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{
+                        "name": call["name"] if i == 0 else None,
+                        "args": args[i:i + 8],
+                        "id": call["id"] if i == 0 else None,
+                        "index": 0,
+                    }],
+                )
+        else:
+            for word in message.content.split(" "):
+                yield AIMessageChunk(content=word + " ")
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay())
+        for chunk in self._chunks(self._message(messages, tools)):
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay())
+        for chunk in self._chunks(self._message(messages, tools)):
+            yield ChatGenerationChunk(message=chunk)
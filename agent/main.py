@@ -2,66 +2,217 @@
 Main entry point for GYMMANDO with LiveKit integration.
 """
 
+import asyncio
 import os
+import re
 from datetime import datetime
-from pathlib import Path
 
 from livekit import agents
-from livekit.agents import Agent, AgentSession, RunContext
+from livekit.agents import Agent, AgentSession, JobProcess, RunContext, llm
 from livekit.agents.llm import function_tool
+# LiveKit plugins register themselves on import, which must happen on the main thread
 from livekit.plugins import deepgram, openai, silero
 
-from graphs.gymmando import build_graph
-from graphs.types import GymmandoState
+from prompt_templates.prompt_template_loader import prompts
+from telemetry.logger import bind_context, get_logger
+from telemetry.tracing import telemetry
+from tts.audio_cache import CachedAudio, TTSAudioCache, create_audio_cache
 
 from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, auth
 
 load_dotenv()
 
-# Initialize Firebase Admin SDK for agent
-firebase_credentials_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
-if firebase_credentials_path and os.path.exists(firebase_credentials_path):
-    try:
-        cred = credentials.Certificate(firebase_credentials_path)
-        firebase_admin.initialize_app(cred)
-        print("✅ Firebase Admin SDK initialized in agent")
-    except Exception as e:
-        print(f"⚠️  Firebase Admin SDK initialization failed: {e}")
-else:
-    # Try using default credentials (for GCP deployment)
-    try:
-        firebase_admin.initialize_app()
-        print("✅ Firebase Admin SDK initialized (using default credentials)")
-    except Exception as e:
-        print(f"⚠️  Firebase Admin SDK not initialized: {e}")
-
-# Get project root directory
-PROJECT_ROOT = Path(__file__).parent
-PROMPTS_DIR = PROJECT_ROOT / "prompt_templates"
+log = get_logger("assistant")
 
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+SPECULATION_MIN_WORDS = 2
+TTS_MODEL = os.getenv("TTS_MODEL", "gpt-4o-mini-tts")
+TTS_VOICE = os.getenv("TTS_VOICE", "onyx")
+TTS_CACHE_VOICE = f"openai:{TTS_MODEL}:{TTS_VOICE}"  # Audio cache namespace
+FALLBACK_RESPONSE = "I'm here to help! Try saying something like 'I did bench press' to log a workout."
+ERROR_RESPONSE = "Sorry, something went wrong on my end. Try that again?"
 
-class GymmandoAssistant(Agent):
-    """LiveKit agent powered by the multi-agent graph."""
 
-    def __init__(self, user_id: str = "default_user"):
-        # Load system prompt directly
-        system_prompt = (PROMPTS_DIR / "main_system_prompt.md").read_text()
+def split_sentences(buffer: str) -> tuple:
+    """Split streamed text into (complete sentences, unfinished remainder)."""
+    parts = SENTENCE_END_RE.split(buffer)
+    return [p for p in parts[:-1] if p.strip()], parts[-1]
+
+
+def sentences_of(text: str) -> list:
+    """All sentences of a complete text, split the way speech is."""
+    sentences, rest = split_sentences(text)
+    return sentences + ([rest] if rest.strip() else [])
+
 
-        super().__init__(instructions=system_prompt)
+async def stream_sentences(text):
+    """Regroup a stream of text chunks into whole sentences."""
+    buffer = ""
+    async for chunk in text:
+        buffer += chunk
+        sentences, buffer = split_sentences(buffer)
+        for sentence in sentences:
+            yield sentence
+    if buffer.strip():
+        yield buffer
 
+
+class GymmandoAssistant(Agent):
+    """LiveKit agent powered by the multi-agent graph.
+
+    In direct mode (GRAPH_DIRECT_MODE, on by default) each final user
+    transcript goes straight into the graph and its sentences go straight to
+    TTS, skipping the session LLM's tool-calling hop. The session LLM is only
+    used for turns without a user message (the greeting) and, with
+    GRAPH_LLM_FALLBACK, when the graph fails before saying anything; the
+    fallback runs without tools, under its own short instructions.
+
+    With SPECULATIVE_PARSING, the intent is parsed from interim STT
+    transcripts once they stop changing for SPECULATIVE_STABLE_MS, so the
+    parsing LLM overlaps the user's trailing speech and end-of-turn silence.
+
+    With an `audio_cache`, speech is synthesized sentence by sentence and
+    sentences heard before are played from the cache.
+    """
+
+    def __init__(
+        self,
+        user_id: str = "default_user",
+        session_id: str = None,
+        direct_mode: bool = None,
+        llm_fallback: bool = None,
+        audio_cache: TTSAudioCache = None,
+    ):
+        super().__init__(instructions=prompts.render("main_system_prompt"))
+
+        if direct_mode is None:
+            direct_mode = os.getenv("GRAPH_DIRECT_MODE", "1") == "1"
+        if llm_fallback is None:
+            llm_fallback = os.getenv("GRAPH_LLM_FALLBACK", "1") == "1"
+        self.direct_mode = direct_mode
+        self.llm_fallback = llm_fallback
+        self.audio_cache = audio_cache
         self.user_id = user_id
+        self.session_id = session_id
         self.user_name = "User"
-        self.graph = build_graph(user_id=user_id)
+        # Imported here: the graph pulls in LangGraph, LangChain and Supabase,
+        # which only job processes need
+        from graphs.gymmando import get_gymmando_graph
+
+        self.gymmando_graph = get_gymmando_graph()
+        self.graph = self.gymmando_graph.build()
+        self.thread_config = self.gymmando_graph.thread_config(user_id, session_id)
         self.personality_mode = "bro"
 
+        self.speculative_parsing = os.getenv("SPECULATIVE_PARSING", "0") == "1"
+        self.speculation_delay = float(os.getenv("SPECULATIVE_STABLE_MS", "250")) / 1000
+        self._heard_segments: list = []  # Final STT segments of the current user turn
+        self._speculation_timer = None
+        self._speculation_tasks: set = set()
+
         # Verification counters
         self.total_messages = 0
         self.graph_calls = 0
 
+    async def prewarm(self):
+        """Load the user's data while the session is starting."""
+        await self.gymmando_graph.prewarm(self.user_id)
+
+    def greeting_fields(self) -> dict:
+        """Greeting personalization from data already at hand (no fetches)."""
+        from agents.greetings import describe_workout, spoken_name
+
+        latest = self.gymmando_graph.workout_agent.history_for(self.user_id).loaded_latest()
+        return {
+            "name": spoken_name(self.user_name, self.user_id),
+            "last_workout": describe_workout(latest),
+        }
+
+    async def close(self):
+        """Release the user's cached state when the session ends."""
+        await self.gymmando_graph.end_session(self.user_id)
+
+    def on_user_transcript(self, transcript: str, is_final: bool):
+        """Speculatively parse the user's words once the interim hypothesis settles."""
+        if not self.speculative_parsing:
+            return
+        if self._speculation_timer is not None:
+            self._speculation_timer.cancel()
+            self._speculation_timer = None
+        if is_final:
+            # The turn's text is every final segment; the next interim extends it
+            self._heard_segments.append(transcript)
+            return
+        hypothesis = " ".join(self._heard_segments + [transcript]).strip()
+        if len(hypothesis.split()) < SPECULATION_MIN_WORDS:
+            return
+        self._speculation_timer = asyncio.get_running_loop().call_later(
+            self.speculation_delay, self._start_speculation, hypothesis
+        )
+
+    def _start_speculation(self, hypothesis: str):
+        self._speculation_timer = None
+        task = asyncio.create_task(self.gymmando_graph.speculate(self.user_id, hypothesis, self.session_id))
+        self._speculation_tasks.add(task)
+        task.add_done_callback(self._speculation_tasks.discard)
+
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        """Answer user turns from the graph directly in direct mode."""
+        last = chat_ctx.items[-1] if chat_ctx.items else None
+        is_user_turn = getattr(last, "type", None) == "message" and last.role == "user"
+        if not (self.direct_mode and is_user_turn and last.text_content):
+            async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+                yield chunk
+            return
+
+        self.graph_calls += 1
+        try:
+            async for sentence in telemetry.timed_stream(
+                "direct_turn",
+                self._stream_response(last.text_content, self.graph_calls, raise_errors=self.llm_fallback),
+            ):
+                # Sentences are separate chunks of one reply; keep them apart for TTS
+                yield sentence + " "
+        except Exception:
+            # Nothing has been said yet, so the session LLM can still take the
+            # turn; without tools, so it can't route back into the failed graph
+            log.warning("graph_fallback_to_llm")
+            telemetry.add("direct_turn.llm_fallback")
+            fallback_ctx = chat_ctx.copy(exclude_function_call=True, exclude_instructions=True)
+            fallback_ctx.items.insert(
+                0, llm.ChatMessage(role="system", content=[prompts.render("fallback_system_prompt")])
+            )
+            async for chunk in Agent.default.llm_node(self, fallback_ctx, [], model_settings):
+                yield chunk
+
+    async def tts_node(self, text, model_settings):
+        """Play cached sentences; synthesize and cache the rest."""
+        if self.audio_cache is None:
+            async for frame in Agent.default.tts_node(self, text, model_settings):
+                yield frame
+            return
+
+        async for sentence in stream_sentences(text):
+            audio = await self.audio_cache.get(sentence)
+            if audio is not None:
+                telemetry.add("tts_cache.hits")
+                for frame in audio.frames():
+                    yield frame
+                continue
+
+            telemetry.add("tts_cache.misses")
+            frames = []
+            async with self.session.tts.synthesize(
+                sentence, conn_options=self.session.conn_options.tts_conn_options
+            ) as stream:
+                async for ev in stream:
+                    frames.append(ev.frame)
+                    yield ev.frame
+            if frames:
+                await self.audio_cache.put(sentence, CachedAudio.from_frames(frames))
+
     @function_tool
-    async def process_command(self, context: RunContext, transcript: str) -> str:
+    async def process_command(self, context: RunContext, transcript: str) -> None:
         """
         MANDATORY: Process ALL user input through the intelligent agent graph.
 
@@ -72,15 +223,34 @@ class GymmandoAssistant(Agent):
         - Any other user input
 
         The graph handles intent classification, data processing, and response generation.
+        The response is spoken directly, so there is nothing to add afterwards.
         """
 
-        # ✅ VERIFICATION: Log that graph is being called
+        # ✅ VERIFICATION: Count graph calls (logged per turn)
         self.graph_calls += 1
-        print(f"\n{'🔥'*30}")
-        print(f"✅ GRAPH CALL #{self.graph_calls} - WORKING CORRECTLY!")
-        print(f"{'🔥'*30}")
 
-        initial_state: GymmandoState = {
+        # Speak sentences as the graph streams them; returning None means the
+        # session LLM doesn't generate a second reply from the tool output
+        context.session.say(
+            telemetry.timed_stream(
+                "process_command", self._stream_response(transcript, self.graph_calls)
+            )
+        )
+
+    async def _stream_response(self, transcript: str, turn: int = 0, raise_errors: bool = False):
+        """Run the graph for one turn and yield the response sentence by sentence.
+
+        With `raise_errors`, a graph failure before the first sentence is
+        raised instead of being answered with an apology.
+        """
+        bind_context(turn_id=str(turn))
+        self._heard_segments.clear()
+        log.info("turn_start", graph_calls=self.graph_calls, total_messages=self.total_messages)
+        log.debug("user_transcript", transcript=transcript)
+
+        # Only per-turn fields are passed in; the user's pending workout and
+        # collected slots are restored from the checkpointer
+        turn_input = {
             "transcript": transcript,
             "intent": None,
             "workout_data": None,
@@ -89,36 +259,50 @@ class GymmandoAssistant(Agent):
             "user_id": self.user_id,
         }
 
-        print(f"\n{'='*60}")
-        print(f"🎤 User: {transcript}")
-        print(f"{'='*60}")
-
-        final_state = await self.graph.ainvoke(initial_state)
-
-        # Ensure response is always set
-        response = final_state.get("response", "")
-        if not response or response.strip() == "":
-            response = "I'm here to help! Try saying something like 'I did bench press' to log a workout."
-
-        print(f"{'='*60}")
-        print(f"🤖 Gymmando ({self.personality_mode} mode): {response}")
-        print(f"{'='*60}")
-        print(
-            f"📊 Stats: {self.graph_calls} graph calls / {self.total_messages} total messages"
-        )
-        print(f"{'='*60}\n")
-
-        # Handle personality mode changes
-        if (
-            final_state.get("intent")
-            and final_state["intent"].get("type") == "change_personality"
-        ):
-            new_mode = final_state["intent"].get("data", {}).get("mode", "bro")
-            if new_mode.lower() in ["bro", "coach", "commander"]:
-                self.personality_mode = new_mode.lower()
-                return f"Switched to {new_mode} mode! {response}"
-
-        return response
+        buffer = ""
+        spoken = []
+        final_state = {}
+        switched = False
+        try:
+            async for mode, chunk in self.graph.astream(
+                turn_input,
+                config=self.thread_config,
+                stream_mode=["custom", "values"],
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    # Handle personality mode changes as soon as the intent is known
+                    intent = chunk.get("intent") or {}
+                    if not switched and intent.get("type") == "change_personality":
+                        switched = True
+                        new_mode = intent.get("data", {}).get("mode", "bro")
+                        if new_mode.lower() in ["bro", "coach", "commander"]:
+                            self.personality_mode = new_mode.lower()
+                            spoken.append(f"Switched to {new_mode} mode!")
+                            yield spoken[-1]
+                    continue
+
+                buffer += chunk.get("response_chunk", "")
+                sentences, buffer = split_sentences(buffer)
+                for sentence in sentences:
+                    spoken.append(sentence)
+                    yield sentence
+        except Exception:
+            log.exception("graph_failed")
+            if raise_errors and not spoken:
+                raise
+            buffer = ERROR_RESPONSE
+
+        if buffer.strip():
+            spoken.append(buffer)
+            yield buffer
+        elif not spoken:
+            # Ensure response is always set
+            spoken.append(final_state.get("response") or FALLBACK_RESPONSE)
+            yield spoken[-1]
+
+        log.info("turn_done", personality=self.personality_mode, sentences=len(spoken))
+        log.debug("assistant_response", response=" ".join(spoken))
 
     @function_tool
     async def get_current_date_and_time(self, context: RunContext) -> str:
@@ -129,101 +313,166 @@ class GymmandoAssistant(Agent):
     def increment_message_counter(self):
         """Track total messages received."""
         self.total_messages += 1
-        print(f"\n📨 Message #{self.total_messages} received")
+        log.debug("message_received", total_messages=self.total_messages)
 
         # ⚠️ WARNING: Check if graph is being bypassed
         if self.total_messages > self.graph_calls:
-            print(
-                f"⚠️  WARNING: Graph not called! ({self.graph_calls} calls vs {self.total_messages} messages)"
-            )
-            print(f"⚠️  This means the LLM responded directly without using the graph!")
+            # The LLM responded directly without using the graph
+            log.warning("graph_bypassed", graph_calls=self.graph_calls, total_messages=self.total_messages)
+
+
+def resolve_user_identity(participant) -> tuple:
+    """Return (user_id, user_name) for a participant, or None if it isn't a real user."""
+    # Try multiple ways to get participant identity
+    participant_identity = getattr(participant, 'identity', None)
+    participant_name = getattr(participant, 'name', None)
+
+    if not participant_identity and hasattr(participant, 'attributes'):
+        participant_identity = participant.attributes.get('identity', None)
+
+    if not participant_identity and hasattr(participant, 'info'):
+        participant_identity = getattr(participant.info, 'identity', None) if participant.info else None
+
+    log.debug(
+        "participant",
+        sid=getattr(participant, 'sid', None),
+        identity=participant_identity,
+        name=participant_name,
+        attributes=getattr(participant, 'attributes', None),
+    )
+
+    # Verify the identity is a valid Firebase UID (not fake_human or default)
+    if participant_identity and participant_identity not in ["fake_human", "default_user", "user_123"]:
+        # Optionally verify it's a valid Firebase UID format (28 chars, alphanumeric)
+        if len(participant_identity) > 20:  # Firebase UIDs are typically 28 chars
+            return participant_identity, participant_name or participant_identity
+        log.warning("identity_not_firebase_uid", identity=participant_identity)
+    elif participant_identity in ["fake_human", "user_123"]:
+        # The Firebase token may not be working; check the API logs
+        log.warning("placeholder_identity", identity=participant_identity)
+    return None
+
+
+def prewarm(proc: JobProcess):
+    """Load models and clients in an idle job process, before a room is assigned.
+
+    LiveKit runs one job per process, so this is not shared between sessions.
+    The gain is latency: the VAD model, plugin clients and graph are loaded
+    while the process waits for a job, not after the participant joins.
+    """
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(model="nova-2")
+    proc.userdata["tts"] = openai.TTS(model=TTS_MODEL, voice=TTS_VOICE)
+    proc.userdata["audio_cache"] = create_audio_cache(voice=TTS_CACHE_VOICE)
+    proc.userdata["llm"] = openai.LLM(model=os.getenv("LLM_CHOICE", "gpt-4o-mini"))
+
+    # Compile the graph and load the prompt templates up front too
+    from agents.greetings import create_greeting_pool
+    from graphs.gymmando import get_gymmando_graph
+
+    get_gymmando_graph()
+    proc.userdata["greetings"] = create_greeting_pool() if os.getenv("GREETING_POOL", "1") == "1" else None
+    log.info("job_process_prewarmed", pid=os.getpid())
+
+
+async def refresh_greetings(greetings, audio_cache, tts):
+    """Refresh the shared greeting pool if it is stale, and cache its audio.
+
+    LiveKit runs one job per process, so this runs once per job: the pool is
+    refreshed by the first session after it goes stale, not on a timer.
+    """
+    if greetings.stale:
+        greetings.load()  # Another job process may have refreshed it already
+    if greetings.stale:
+        await greetings.refresh()
+    if audio_cache is not None:
+        sentences = [s for greeting in greetings.all_greetings() for s in sentences_of(greeting)]
+        rendered = await audio_cache.prerender(tts, sentences)
+        if rendered:
+            log.info("greeting_audio_cached", sentences=rendered)
 
 
 async def entrypoint(ctx: agents.JobContext):
     """LiveKit entry point."""
+    # Every log record from this job carries its ID
+    bind_context(session_id=ctx.job.id)
 
-    # Load greeting prompt directly
-    greeting_prompt = (PROMPTS_DIR / "main_greeting_prompt.md").read_text()
+    # Compiled once at worker start; used when the greeting pool is disabled
+    greeting_prompt = prompts.render("main_greeting_prompt")
 
+    # Loaded once per process by prewarm
+    plugins = ctx.proc.userdata
     session = AgentSession(
-        stt=deepgram.STT(model="nova-2"),
-        tts=openai.TTS(voice="onyx"),
-        llm=openai.LLM(model=os.getenv("LLM_CHOICE", "gpt-4o-mini")),
-        vad=silero.VAD.load(),
+        stt=plugins["stt"],
+        tts=plugins["tts"],
+        llm=plugins["llm"],
+        vad=plugins["vad"],
     )
 
-    # Extract user_id from participant identity (set in LiveKit token)
+    # Attribute turn latency to STT, end-of-utterance detection and TTS too
+    telemetry.start()
+    session.on("metrics_collected", lambda ev: telemetry.record_livekit_metrics(ev.metrics))
+
+    # Wait for the user to join, then extract user_id from participant identity
+    # (set in LiveKit token) before building anything user-specific
+    await ctx.connect()
+    participant = await ctx.wait_for_participant()
+
     user_id = "default_user"
     user_name = "User"
-    
-    # Initialize assistant with default first
-    assistant = GymmandoAssistant(user_id=user_id)
+    identity = resolve_user_identity(participant)
+    if identity:
+        user_id, user_name = identity
+
+    # Conversation state is per room; anonymous users also get a thread per job,
+    # since they all share the default_user ID
+    session_id = ctx.room.name if identity else f"{ctx.room.name}:{ctx.job.id}"
+
+    # The graph is shared by every session on this worker
+    assistant = GymmandoAssistant(
+        user_id=user_id, session_id=session_id, audio_cache=plugins["audio_cache"]
+    )
     assistant.user_name = user_name
-    
-    await session.start(room=ctx.room, agent=assistant)
-    
-    # Wait a moment for participants to connect, then extract user_id
-    import asyncio
-    await asyncio.sleep(1.0)  # Wait longer for participant to fully join
-    
-    # Extract user_id from remote participants
-    if ctx.room:
-        print(f"🔍 Checking room participants...")
-        print(f"🔍 Room name: {ctx.room.name}")
-        print(f"🔍 Remote participants count: {len(ctx.room.remote_participants)}")
-        print(f"🔍 Remote participant SIDs: {list(ctx.room.remote_participants.keys())}")
-        
-        # Try multiple ways to get participant identity
-        for sid, participant in ctx.room.remote_participants.items():
-            # Method 1: Direct attribute access
-            participant_identity = getattr(participant, 'identity', None)
-            participant_name = getattr(participant, 'name', None)
-            
-            # Method 2: Try through attributes dict if available
-            if not participant_identity and hasattr(participant, 'attributes'):
-                participant_identity = participant.attributes.get('identity', None)
-            
-            # Method 3: Try through info if available
-            if not participant_identity and hasattr(participant, 'info'):
-                participant_identity = getattr(participant.info, 'identity', None) if participant.info else None
-            
-            print(f"🔍 Participant SID: {sid}")
-            print(f"🔍 Participant identity (method 1): {participant_identity}")
-            print(f"🔍 Participant name: {participant_name}")
-            print(f"🔍 Participant attributes: {getattr(participant, 'attributes', 'N/A')}")
-            
-            # Verify the identity is a valid Firebase UID (not fake_human or default)
-            if participant_identity and participant_identity not in ["fake_human", "default_user", "user_123"]:
-                # Optionally verify it's a valid Firebase UID format (28 chars, alphanumeric)
-                if len(participant_identity) > 20:  # Firebase UIDs are typically 28 chars
-                    user_id = participant_identity
-                    user_name = participant_name or participant_identity
-                    print(f"✅ Extracted Firebase user_id: {user_id} ({user_name})")
-                    
-                    # Update assistant with correct user_id
-                    assistant.user_id = user_id
-                    assistant.user_name = user_name
-                    # Rebuild graph with correct user_id
-                    assistant.graph = build_graph(user_id=user_id)
-                    break
-                else:
-                    print(f"⚠️  Identity '{participant_identity}' doesn't look like a Firebase UID")
-            elif participant_identity in ["fake_human", "user_123"]:
-                print(f"⚠️  Warning: Participant has '{participant_identity}' identity - Firebase token may not be working")
-                print(f"⚠️  Check API logs to see if Firebase token is being verified correctly")
-    
-    print(f"👤 Agent initialized for user: {user_id} ({user_name})")
-    
-    if user_id == "default_user":
-        print(f"⚠️  WARNING: Using default_user - workouts will not be user-specific!")
-        print(f"⚠️  Check that:")
-        print(f"   1. UI is sending Firebase token in Authorization header")
-        print(f"   2. API is verifying token and setting identity in LiveKit token")
-        print(f"   3. Participant identity is being extracted correctly")
 
-    await session.generate_reply(instructions=greeting_prompt)
+    # Give queued workout inserts a chance to land before the job exits
+    ctx.add_shutdown_callback(assistant.gymmando_graph.flush_writes)
+    ctx.add_shutdown_callback(assistant.close)
 
+    ctx.add_shutdown_callback(telemetry.shutdown)
 
-if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    # Interim transcripts drive speculative intent parsing
+    session.on(
+        "user_input_transcribed",
+        lambda ev: assistant.on_user_transcript(ev.transcript, ev.is_final),
+    )
+
+    # Load the user's data while the session connects audio
+    await asyncio.gather(
+        session.start(room=ctx.room, agent=assistant),
+        assistant.prewarm(),
+    )
 
+    log.info("agent_initialized", room=ctx.room.name, user_id=user_id, user_name=user_name)
+
+    if user_id == "default_user":
+        # Workouts will not be user-specific. Check that the UI sends the
+        # Firebase token, the API verifies it and sets the LiveKit identity,
+        # and the participant identity is extracted correctly.
+        log.warning("anonymous_session", room=ctx.room.name)
+
+    greetings = plugins["greetings"]
+    if greetings is None:
+        await session.generate_reply(instructions=greeting_prompt)
+        return
+
+    # A pooled greeting needs no LLM call, and its audio is usually cached
+    session.say(greetings.greeting(assistant.personality_mode, **assistant.greeting_fields()))
+    # After the greeting so it doesn't compete with it; prewarm runs before
+    # the job's event loop exists, so this can't start there
+    plugins["greeting_refresh"] = asyncio.create_task(
+        refresh_greetings(greetings, plugins["audio_cache"], plugins["tts"])
+    )
+
+
+if __name__ == "__main__":
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -1,4 +1,133 @@
+"""
+Prompt template loader.
+
+All `*.md` templates in this directory are read, validated and compiled once
+when the worker starts. Templates use `$variable` placeholders
+(`string.Template`), so JSON braces in prompts need no escaping. Templates
+without placeholders render to the same bytes on every call. Prompts put
+their static text first, so the provider's prompt cache can reuse it.
+
+With hot reload enabled (PROMPT_HOT_RELOAD=1), edited files are picked up
+on the next render, checked at most once per poll interval. A template that
+fails validation keeps its previous version.
+"""
+
+import os
+import time
+from pathlib import Path
+from string import Template
+
+from telemetry.logger import get_logger
+
+PROMPTS_DIR = Path(__file__).parent
+
+# Templates the agents depend on, and the variables each one must declare
+REQUIRED_TEMPLATES = {
+    "main_system_prompt": set(),
+    "main_greeting_prompt": set(),
+    "fallback_system_prompt": set(),
+    "greeting_pool_prompt": {"count", "personality"},
+    "parsing_system_prompt": set(),
+    "parsing_user_prompt": {"transcript"},
+    "parsing_confirmation_prompt": {"transcript", "workout"},
+    "motivation_system_prompt": {"personality"},
+    "motivation_user_prompt": {"context"},
+}
+
+log = get_logger("prompts")
+
+
+class PromptTemplate:
+    """A compiled prompt template."""
+
+    def __init__(self, name: str, text: str, mtime: float = 0.0):
+        self.name = name
+        self.text = text
+        self.mtime = mtime
+        self.template = Template(text)
+        if not self.template.is_valid():
+            raise ValueError(f"Prompt template '{name}' has an invalid placeholder")
+        self.variables = frozenset(self.template.get_identifiers())
+
+    def render(self, **variables) -> str:
+        """Fill in the template; missing variables raise KeyError."""
+        if not self.variables:
+            return self.text
+        return self.template.substitute(variables)
+
+
 class PromptTemplateLoader:
     """Class to load prompt templates from files."""
-    pass
 
+    def __init__(
+        self,
+        directory: Path = PROMPTS_DIR,
+        hot_reload: bool = False,
+        poll_interval: float = 1.0,
+        required: dict = REQUIRED_TEMPLATES,
+    ):
+        self.directory = Path(directory)
+        self.hot_reload = hot_reload
+        self.poll_interval = poll_interval
+        self.required = required
+        self.templates: dict = {}
+        self._last_poll = 0.0
+        self.load_all()
+
+    def _compile(self, path: Path) -> PromptTemplate:
+        name = path.stem
+        text = path.read_text(encoding="utf-8")
+        if not text.strip():
+            raise ValueError(f"Prompt template '{name}' is empty")
+        template = PromptTemplate(name, text, path.stat().st_mtime)
+        expected = self.required.get(name)
+        if expected is not None and template.variables != expected:
+            raise ValueError(
+                f"Prompt template '{name}' uses {sorted(template.variables)}, "
+                f"expected {sorted(expected)}"
+            )
+        return template
+
+    def load_all(self):
+        """Read and compile every template; fail fast if any is missing or invalid."""
+        templates = {path.stem: self._compile(path) for path in sorted(self.directory.glob("*.md"))}
+        missing = set(self.required) - set(templates)
+        if missing:
+            raise FileNotFoundError(f"Missing prompt templates: {sorted(missing)}")
+        self.templates = templates
+        self._last_poll = time.monotonic()
+        log.info("prompt_templates_loaded", templates=len(templates))
+
+    def _reload_changed(self):
+        for path in self.directory.glob("*.md"):
+            current = self.templates.get(path.stem)
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue  # Removed or renamed mid-edit; keep the loaded version
+            if current and mtime == current.mtime:
+                continue
+            try:
+                self.templates[path.stem] = self._compile(path)
+                log.info("prompt_template_reloaded", template=path.stem)
+            except (OSError, ValueError) as e:
+                log.warning("prompt_template_rejected", template=path.stem, error=str(e))
+                if current:
+                    # Don't retry the broken file until it changes again
+                    current.mtime = mtime
+
+    def get(self, name: str) -> PromptTemplate:
+        if self.hot_reload and time.monotonic() - self._last_poll >= self.poll_interval:
+            self._last_poll = time.monotonic()
+            self._reload_changed()
+        return self.templates[name]
+
+    def render(self, name: str, **variables) -> str:
+        """Render a template by name (the file name without `.md`)."""
+        return self.get(name).render(**variables)
+
+
+prompts = PromptTemplateLoader(
+    hot_reload=os.getenv("PROMPT_HOT_RELOAD", "0") == "1",
+    poll_interval=float(os.getenv("PROMPT_RELOAD_INTERVAL", "1.0")),
+)
@@ -0,0 +1,61 @@
+"""
+LangChain callback that records LLM calls in the process telemetry.
+
+Kept out of `telemetry.tracing` so modules that only need spans and
+counters (such as the LiveKit entrypoint) don't import LangChain.
+"""
+
+import asyncio
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from telemetry.tracing import Telemetry, telemetry
+
+
+class LLMTelemetryCallback(BaseCallbackHandler):
+    """Times LLM calls and counts tokens for every model from the registry."""
+
+    run_inline = True
+
+    def __init__(self, telemetry: Telemetry):
+        self.telemetry = telemetry
+        self._runs: dict = {}  # run_id -> (stage, start, span, first_token_seen)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name", "unknown")
+        stage = f"llm.{model}"
+        span = self.telemetry.tracer.start_span(stage, attributes={"llm.model": model})
+        self._runs[run_id] = [stage, time.perf_counter(), span, False]
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        if run and not run[3]:
+            run[3] = True
+            self.telemetry.record(f"{run[0]}.ttft", time.perf_counter() - run[1])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        stage, start, span, _ = run
+        self.telemetry.record(stage, time.perf_counter() - start)
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage:
+            self.telemetry.add(f"{stage}.input_tokens", usage.get("input_tokens", 0))
+            self.telemetry.add(f"{stage}.output_tokens", usage.get("output_tokens", 0))
+            span.set_attribute("llm.input_tokens", usage.get("input_tokens", 0))
+            span.set_attribute("llm.output_tokens", usage.get("output_tokens", 0))
+        span.end()
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run:
+            # Cancelled calls (e.g. dropped speculative parses) aren't failures
+            kind = "cancelled" if isinstance(error, asyncio.CancelledError) else "errors"
+            self.telemetry.add(f"{run[0]}.{kind}")
+            run[2].end()
+
+
+llm_callback = LLMTelemetryCallback(telemetry)
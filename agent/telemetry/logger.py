@@ -0,0 +1,172 @@
+"""
+Structured, non-blocking logging for the agent's hot paths.
+
+Each log call is a named event with keyword fields. The record is formatted
+on the calling thread and then put on a queue. A background listener thread
+does the actual stdout write, so log I/O never blocks the audio event loop.
+Every record carries the session and turn correlation IDs bound with
+`bind_context`.
+
+Configuration:
+- LOG_LEVEL sets the minimum level (default INFO).
+- LOG_FORMAT is `json` or `text` (default text).
+- LOG_SAMPLE_RATE keeps that fraction of DEBUG/INFO records (default 1.0).
+
+Calls below the configured level return before any fields are formatted,
+so debug dumps cost nothing when disabled.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Optional
+
+session_id_var: contextvars.ContextVar = contextvars.ContextVar("session_id", default=None)
+turn_id_var: contextvars.ContextVar = contextvars.ContextVar("turn_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind_context(session_id: Optional[str] = None, turn_id: Optional[str] = None):
+    """Set correlation IDs for logs from the current task and tasks it starts."""
+    if session_id is not None:
+        session_id_var.set(session_id)
+    if turn_id is not None:
+        turn_id_var.set(turn_id)
+
+
+class ContextFilter(logging.Filter):
+    """Attach correlation IDs and drop a sample of low-severity records."""
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.sample_rate < 1.0:
+            if random.random() >= self.sample_rate:
+                return False
+        record.session_id = session_id_var.get()
+        record.turn_id = turn_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            "session_id": getattr(record, "session_id", None),
+            "turn_id": getattr(record, "turn_id", None),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        fields = " ".join(f"{k}={v}" for k, v in getattr(record, "fields", {}).items())
+        ids = "/".join(str(i) for i in (record.session_id, record.turn_id) if i)
+        line = f"{timestamp} {record.levelname:<7} {record.name} [{ids}] {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class FormattingQueueHandler(logging.handlers.QueueHandler):
+    """Formats on the caller's thread so fields are captured before they change."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = self.format(record)
+        record = logging.makeLogRecord({"msg": message, "levelno": record.levelno, "levelname": record.levelname})
+        return record
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    sample_rate: float = 1.0,
+    stream=None,
+):
+    """Route `gymmando.*` loggers through a queue to a background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = FormattingQueueHandler(log_queue)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    handler.addFilter(ContextFilter(sample_rate))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger("gymmando")
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    root.propagate = False
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class StructuredLogger:
+    """Logs named events with keyword fields."""
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"gymmando.{name}")
+
+    def _log(self, level: int, event: str, fields: dict, exc_info=None):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def is_debug(self) -> bool:
+        return self._logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, event: str, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event: str, **fields):
+        """Log an error with the active exception's traceback."""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    if _listener is None:
+        configure_logging(
+            level=os.getenv("LOG_LEVEL", "INFO"),
+            fmt=os.getenv("LOG_FORMAT", "text"),
+            sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        )
+    return StructuredLogger(name)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,356 @@
+"""
+Per-turn latency tracing.
+
+Spans cover each graph node, each LLM call (with token counts) and each
+Supabase query, and every turn is timed from `process_command` to its first
+and last spoken sentence. LiveKit's own STT/LLM/TTS/end-of-utterance metrics
+are recorded alongside them, so a slow voice turn can be attributed to a
+stage. LLM calls are timed by the LangChain callback in
+`telemetry.llm_callback`, kept separate so importing this module doesn't
+load LangChain.
+
+Every span duration goes into an in-process histogram. The histograms keep
+the most recent samples per stage and report p50/p95/p99. They can be dumped
+to JSON, or served in Prometheus text format on METRICS_PORT. Spans are also
+sent to OpenTelemetry. When OTEL_EXPORTER_OTLP_ENDPOINT is set, they are
+exported over OTLP; this requires the optional `opentelemetry-sdk` and
+`opentelemetry-exporter-otlp-proto-http` packages.
+
+livekit-agents runs every job in its own process, so with METRICS_PORT set
+each process publishes a snapshot of its samples to METRICS_DIR every
+METRICS_PUBLISH_INTERVAL seconds. One process on the host binds the port and
+serves percentiles computed over the merged samples of every job, so
+/metrics describes the whole worker. When that process exits, another one
+takes the port over at its next publish. Snapshots not updated for
+METRICS_RETENTION seconds are dropped, so the counters of jobs that ended
+earlier leave the totals.
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from opentelemetry import trace
+
+from telemetry.logger import get_logger
+
+QUANTILES = (0.5, 0.95, 0.99)
+DEFAULT_METRICS_DIR = Path(__file__).parent.parent / "data" / "metrics"
+
+log = get_logger("telemetry")
+
+
+class LatencyHistogram:
+    """Sliding window of recent durations for one stage."""
+
+    def __init__(self, max_samples: int = 2048):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            **{f"p{int(q * 100)}_ms": round(self.percentile(q) * 1000, 2) for q in QUANTILES},
+        }
+
+
+class Telemetry:
+    """Span timing, histograms and counters for one worker process."""
+
+    def __init__(
+        self,
+        max_samples: int = 2048,
+        metrics_dir: Path = DEFAULT_METRICS_DIR,
+        publish_interval: float = 5.0,
+        retention: float = 300.0,
+    ):
+        self.max_samples = max_samples
+        self.metrics_dir = Path(metrics_dir)
+        self.publish_interval = publish_interval
+        self.retention = retention
+        self.histograms: dict = {}
+        self.counters: Counter = Counter()
+        self.gauges: dict = {}
+        self.tracer = trace.get_tracer("gymmando")
+        self._metrics_server: Optional[ThreadingHTTPServer] = None
+        self._publisher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def record(self, name: str, seconds: float):
+        """Add one duration sample for a stage."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram(self.max_samples)
+        histogram.observe(seconds)
+
+    def add(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        """Set a point-in-time value, e.g. memory held by session state."""
+        self.gauges[name] = value
+
+    def reset(self):
+        """Drop all samples, counters and gauges."""
+        self.histograms.clear()
+        self.counters.clear()
+        self.gauges.clear()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block as a span and record it in the stage histogram."""
+        start = time.perf_counter()
+        with self.tracer.start_as_current_span(name, attributes=attributes) as span:
+            try:
+                yield span
+            finally:
+                self.record(name, time.perf_counter() - start)
+
+    def traced(self, name: str, fn):
+        """Wrap an async graph node so each call is a span."""
+
+        @functools.wraps(fn)
+        async def wrapper(state):
+            with self.span(name):
+                return await fn(state)
+
+        return wrapper
+
+    async def timed_stream(self, name: str, stream):
+        """Pass an async stream through as a span, also recording time to first item."""
+        with self.span(name) as span:
+            start = time.perf_counter()
+            first = True
+            async for item in stream:
+                if first:
+                    first = False
+                    self.record(f"{name}.first_chunk", time.perf_counter() - start)
+                    span.add_event("first_chunk")
+                yield item
+
+    def record_livekit_metrics(self, metrics):
+        """Record a LiveKit `metrics_collected` event."""
+        kind = type(metrics).__name__
+        if kind == "TTSMetrics":
+            self.record("livekit.tts.ttfb", metrics.ttfb)
+        elif kind == "LLMMetrics":
+            self.record("livekit.llm.ttft", metrics.ttft)
+            self.add("livekit.llm.prompt_tokens", metrics.prompt_tokens)
+            self.add("livekit.llm.completion_tokens", metrics.completion_tokens)
+        elif kind == "STTMetrics":
+            self.record("livekit.stt.duration", metrics.duration)
+        elif kind == "EOUMetrics":
+            self.record("livekit.eou.end_of_utterance_delay", metrics.end_of_utterance_delay)
+            self.record("livekit.eou.transcription_delay", metrics.transcription_delay)
+
+    def summary(self) -> dict:
+        return {
+            "stages": {name: h.summary() for name, h in sorted(self.histograms.items())},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def dump(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2))
+
+    def prometheus_text(self) -> str:
+        """Histograms, counters and gauges in the Prometheus text exposition format."""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            metric = "gymmando_" + name.replace(".", "_").replace("-", "_") + "_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {histogram.percentile(q)}')
+            lines.append(f"{metric}_sum {histogram.total}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, value in sorted(self.counters.items()):
+            metric = "gymmando_" + name.replace(".", "_").replace("-", "_") + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, value in sorted(self.gauges.items()):
+            metric = "gymmando_" + name.replace(".", "_").replace("-", "_")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """This process's raw samples, counters and gauges, for merging across processes."""
+        return {
+            "pid": os.getpid(),
+            "written_at": time.time(),
+            "histograms": {
+                name: {"samples": list(h.samples), "count": h.count, "total": h.total}
+                for name, h in list(self.histograms.items())
+            },
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    @classmethod
+    def merged(cls, snapshots: list, max_samples: int = 2048) -> "Telemetry":
+        """Telemetry holding the combined samples of several processes; gauges are summed."""
+        merged = cls(max_samples=max_samples * max(1, len(snapshots)))
+        for snapshot in snapshots:
+            for name, data in snapshot.get("histograms", {}).items():
+                histogram = merged.histograms.get(name)
+                if histogram is None:
+                    histogram = merged.histograms[name] = LatencyHistogram(merged.max_samples)
+                histogram.samples.extend(data["samples"])
+                histogram.count += data["count"]
+                histogram.total += data["total"]
+            merged.counters.update(snapshot.get("counters", {}))
+            for name, value in snapshot.get("gauges", {}).items():
+                merged.gauges[name] = merged.gauges.get(name, 0) + value
+        return merged
+
+    def _snapshot_path(self) -> Path:
+        return self.metrics_dir / f"metrics-{os.getpid()}.json"
+
+    def publish(self):
+        """Write this process's snapshot where the metrics endpoint can read it."""
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path()
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def worker_snapshots(self) -> list:
+        """Recent snapshots of every job process on the host, this one included."""
+        snapshots = [self.snapshot()]
+        own = self._snapshot_path()
+        cutoff = time.time() - self.retention
+        for path in self.metrics_dir.glob("metrics-*.json"):
+            if path == own:
+                continue
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # Removed, or replaced mid-read
+            if snapshot.get("written_at", 0) < cutoff:
+                path.unlink(missing_ok=True)  # Left by a job that ended
+                continue
+            snapshots.append(snapshot)
+        return snapshots
+
+    def serve_prometheus(self, port: int) -> bool:
+        """Serve the worker's merged /metrics from a background thread.
+
+        Returns False if another job process on the host already serves the port.
+        """
+        if self._metrics_server is not None:
+            return True
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                merged = Telemetry.merged(telemetry.worker_snapshots(), telemetry.max_samples)
+                body = merged.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._metrics_server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        except OSError:
+            return False
+        threading.Thread(target=self._metrics_server.serve_forever, daemon=True).start()
+        log.info("metrics_serving", port=port, metrics_dir=str(self.metrics_dir))
+        return True
+
+    def _publish_loop(self, port: int):
+        while not self._stopping.wait(self.publish_interval):
+            try:
+                self.publish()
+            except OSError as e:
+                log.warning("metrics_publish_failed", error=str(e))
+            # Take the endpoint over if the process serving it has exited
+            self.serve_prometheus(port)
+
+    def start(self):
+        """Start the exporters configured by environment variables."""
+        port = os.getenv("METRICS_PORT")
+        if not port or self._publisher is not None:
+            return
+        try:
+            self.publish()
+        except OSError as e:
+            log.warning("metrics_publish_failed", error=str(e))
+        if not self.serve_prometheus(int(port)):
+            log.debug("metrics_port_taken", port=int(port))
+        self._publisher = threading.Thread(target=self._publish_loop, args=(int(port),), daemon=True)
+        self._publisher.start()
+
+    async def shutdown(self):
+        """Publish a final snapshot and write this process's histograms to TELEMETRY_DUMP_DIR, if set."""
+        dump_dir = os.getenv("TELEMETRY_DUMP_DIR")
+        if dump_dir and self.histograms:
+            self.dump(Path(dump_dir) / f"latency-{os.getpid()}.json")
+        if self._publisher is not None:
+            self._stopping.set()
+            # This job's sessions are gone; its samples stay for METRICS_RETENTION
+            self.gauges.clear()
+            try:
+                self.publish()
+            except OSError as e:
+                log.warning("metrics_publish_failed", error=str(e))
+
+
+def configure_otlp_exporter():
+    """Export spans over OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT."""
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise ImportError(
+            "OTEL_EXPORTER_OTLP_ENDPOINT requires opentelemetry-sdk and "
+            "opentelemetry-exporter-otlp-proto-http: "
+            "pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http"
+        ) from e
+    provider = TracerProvider(resource=Resource.create({"service.name": "gymmando-agent"}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+
+
+def create_telemetry() -> Telemetry:
+    """Create the telemetry configured by environment variables."""
+    if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        configure_otlp_exporter()
+    return Telemetry(
+        max_samples=int(os.getenv("TELEMETRY_MAX_SAMPLES", "2048")),
+        metrics_dir=Path(os.getenv("METRICS_DIR", DEFAULT_METRICS_DIR)),
+        publish_interval=float(os.getenv("METRICS_PUBLISH_INTERVAL", "5")),
+        retention=float(os.getenv("METRICS_RETENTION", "300")),
+    )
+
+
+telemetry = create_telemetry()
@@ -0,0 +1,19 @@
+"""
+Shared test setup: run from `agent/` with the offline LLM stub.
+
+    cd agent
+    python -m pytest tests
+"""
+
+import os
+import sys
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+if str(AGENT_DIR) not in sys.path:
+    sys.path.insert(0, str(AGENT_DIR))
+
+# Must be set before llm.registry is imported
+os.environ.setdefault("GYMMANDO_LLM_BACKEND", "stub")
+os.environ.setdefault("SESSION_SWEEP_INTERVAL", "0")
+os.environ.setdefault("INTENT_CACHE_SHARED", "0")
@@ -0,0 +1,25 @@
+import asyncio
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from benchmarks.graph_benchmark import CONVERSATIONS, run_level
+from graphs.gymmando import GymmandoGraph
+
+
+def test_run_level_drives_every_turn(tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKOUT_JOURNAL_DIR", str(tmp_path))
+    repository = FakeSupabaseRepository(LatencyModel(0))
+    gymmando = GymmandoGraph(repository=repository)
+    conversations = [CONVERSATIONS["one_shot_log"], CONVERSATIONS["views"]]
+
+    async def run():
+        await gymmando.setup()
+        try:
+            return await run_level(gymmando, repository, conversations, sessions=2, tag="test")
+        finally:
+            await gymmando.workout_agent.write_queue.close()
+
+    level = asyncio.run(run())
+    assert level["turns"] == 5
+    assert level["latencies"].count == 5
+    # Each session's history was seeded before its turns ran
+    assert {"bench_test_0", "bench_test_1"} <= set(repository.rows)
@@ -0,0 +1,33 @@
+import asyncio
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from graphs.gymmando import GymmandoGraph
+
+PENDING = {"id": "chest_custom_1", "muscle_group": "chest", "exercises": ["bench press"]}
+
+
+def test_sessions_of_one_user_keep_separate_threads():
+    gymmando = GymmandoGraph(repository=FakeSupabaseRepository(LatencyModel(0)))
+    graph = gymmando.build()
+    room_a = gymmando.thread_config("user-1", "room-a")
+    room_b = gymmando.thread_config("user-1", "room-b")
+    assert room_a != room_b
+
+    async def run():
+        await graph.aupdate_state(room_a, {"pending_workout": PENDING, "response": "Is this correct?"}, as_node="respond")
+        await graph.aupdate_state(room_b, {"response": "Hey!"}, as_node="respond")
+        assert (await graph.aget_state(room_a)).values["pending_workout"] == PENDING
+        assert not (await graph.aget_state(room_b)).values.get("pending_workout")
+
+        # Eviction compacts every thread of the user, keeping the slots
+        await gymmando._compact_thread("user-1")
+        state_a = (await graph.aget_state(room_a)).values
+        assert state_a["pending_workout"] == PENDING and state_a["response"] == ""
+        assert (await graph.aget_state(room_b)).values["response"] == ""
+
+        # A later eviction still finds the user's threads
+        await graph.aupdate_state(room_b, {"response": "Welcome back!"}, as_node="respond")
+        await gymmando._compact_thread("user-1")
+        assert (await graph.aget_state(room_b)).values["response"] == ""
+
+    asyncio.run(run())
@@ -0,0 +1,31 @@
+import asyncio
+import os
+
+from tts.audio_cache import CachedAudio, TTSAudioCache
+
+AUDIO = CachedAudio(pcm=b"\x01\x00" * 4800, sample_rate=24000, num_channels=1)
+
+
+def test_disk_budget_covers_every_process_sharing_the_directory(tmp_path):
+    first = TTSAudioCache("alloy", directory=tmp_path)
+    asyncio.run(first.put("Let's go!", AUDIO))
+    file_bytes = first.stats()["disk_bytes"]
+    os.utime(first._path(first.key("Let's go!")), (1, 1))  # Least recently used
+
+    # A second job process with room for two files sees the first one's entry
+    second = TTSAudioCache("alloy", directory=tmp_path, max_disk_bytes=2 * file_bytes)
+    asyncio.run(second.put("Nice work!", AUDIO))
+    asyncio.run(second.put("Keep it up!", AUDIO))
+
+    assert sorted(p.stem for p in tmp_path.glob("*.wav")) == sorted(
+        second.key(text) for text in ("Nice work!", "Keep it up!")
+    )
+    assert second.stats()["disk_bytes"] == 2 * file_bytes
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_entries_written_by_another_process_are_read_from_disk(tmp_path):
+    asyncio.run(TTSAudioCache("alloy", directory=tmp_path).put("Let's go!", AUDIO))
+    cache = TTSAudioCache("alloy", directory=tmp_path)
+    audio = asyncio.run(cache.get("Let's go!"))
+    assert audio == AUDIO and cache.hits == 1
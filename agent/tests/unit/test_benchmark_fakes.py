@@ -0,0 +1,64 @@
+import asyncio
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel, rule_based_intent
+from benchmarks.graph_benchmark import synthetic_history
+
+USER_ID = "user-1"
+
+
+def test_latency_is_repeatable_for_a_seed():
+    a = LatencyModel(40, 40, seed=3)
+    b = LatencyModel(40, 40, seed=3)
+    samples = [a.sample() for _ in range(20)]
+    assert samples == [b.sample() for _ in range(20)]
+    assert all(0.04 <= s <= 0.08 for s in samples)
+    assert LatencyModel(0).sample() == 0
+
+
+def test_rule_based_intents():
+    logged = rule_based_intent('User message: "I did 3 sets of 10 squats for legs"')
+    assert logged["type"] == "log_workout"
+    assert logged["data"]["exercises"] == ["squats"]
+    assert logged["data"]["muscle_group"] == "legs"
+
+    viewed = rule_based_intent("show my legs workouts from the last 14 days")
+    assert viewed == {"type": "view_workouts", "data": {"muscle_group": "legs", "days": 14}}
+    assert rule_based_intent("show my workouts from last week")["data"]["days"] == 7
+    assert rule_based_intent("thanks")["type"] == "general_query"
+
+
+def test_synthetic_history_cycles_groups_newest_first():
+    workouts = synthetic_history(USER_ID, 8)
+    assert len({w["id"] for w in workouts}) == 8
+    assert [w["muscle_group"] for w in workouts[:4]] == ["chest", "legs", "back", "arms"]
+    assert [w["created_at"] for w in workouts] == sorted((w["created_at"] for w in workouts), reverse=True)
+
+
+def test_fake_repository_pages_with_a_keyset_cursor():
+    repository = FakeSupabaseRepository(LatencyModel(0))
+    repository.seed_history(USER_ID, synthetic_history(USER_ID, 10))
+
+    async def run():
+        first = await repository.fetch_workout_page(USER_ID, limit=4, with_count=True)
+        last = first.data[-1]
+        second = await repository.fetch_workout_page(USER_ID, limit=4, before=(last["created_at"], last["id"]))
+        legs = await repository.fetch_workout_page(USER_ID, muscle_group="legs", with_count=True)
+        return first, second, legs
+
+    first, second, legs = asyncio.run(run())
+    assert first.count == 10 and len(first.data) == 4
+    assert second.count is None
+    assert [w["id"] for w in second.data] == [w["id"] for w in repository.rows[USER_ID][4:8]]
+    assert legs.count == 3 and all(w["muscle_group"] == "legs" for w in legs.data)
+
+
+def test_fake_repository_upserts_skip_known_ids():
+    repository = FakeSupabaseRepository(LatencyModel(0))
+    workout = synthetic_history(USER_ID, 1)[0]
+
+    async def run():
+        assert await repository.upsert_workouts([workout]) == [workout]
+        assert await repository.insert_workout(workout) == []
+
+    asyncio.run(run())
+    assert len(repository.rows[USER_ID]) == 1
@@ -0,0 +1,55 @@
+import operator
+from typing import Annotated, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from graphs.checkpointer import LRUMemorySaver, create_checkpointer
+
+
+class CounterState(TypedDict):
+    turns: Annotated[list, operator.add]
+
+
+def counter_graph(checkpointer):
+    builder = StateGraph(CounterState)
+    builder.add_node("turn", lambda state: {"turns": [len(state["turns"])]})
+    builder.add_edge(START, "turn")
+    builder.add_edge("turn", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_keeps_only_the_latest_checkpoint():
+    saver = LRUMemorySaver()
+    graph = counter_graph(saver)
+    for _ in range(5):
+        graph.invoke({"turns": []}, config("a"))
+
+    assert graph.get_state(config("a")).values["turns"] == [0, 1, 2, 3, 4]
+    assert len(saver.storage["a"][""]) == 1
+    assert len({key for key in saver.blobs if key[0] == "a" and key[2] == "turns"}) == 1
+
+
+def test_evicts_least_recently_used_threads():
+    saver = LRUMemorySaver(max_threads=2)
+    graph = counter_graph(saver)
+    graph.invoke({"turns": []}, config("a"))
+    graph.invoke({"turns": []}, config("b"))
+    graph.get_state(config("a"))
+    graph.invoke({"turns": []}, config("c"))
+
+    assert set(saver.storage) == {"a", "c"}
+    assert all(key[0] != "b" for key in saver.blobs)
+    assert graph.get_state(config("b")).values == {}
+    assert graph.get_state(config("a")).values["turns"] == [0]
+
+
+def test_memory_backend_is_the_default(monkeypatch):
+    monkeypatch.delenv("GRAPH_CHECKPOINTER", raising=False)
+    monkeypatch.setenv("GRAPH_CHECKPOINT_MAX_THREADS", "7")
+    saver = create_checkpointer()
+    assert isinstance(saver, LRUMemorySaver)
+    assert saver.max_threads == 7
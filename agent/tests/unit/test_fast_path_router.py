@@ -0,0 +1,66 @@
+from agents.fast_path_router import FastPathRouter, classify_confirmation, extract_slots
+
+PENDING = {"id": "chest_custom_1", "muscle_group": "chest", "exercises": ["bench press"]}
+
+
+def test_confirmations():
+    for reply in [
+        "yes",
+        "yeah save it",
+        "correct",
+        "yep no problem",
+        "yes please, nothing to change",
+        "not bad, save it",
+        "no problem",
+    ]:
+        assert classify_confirmation(reply) is True, reply
+
+
+def test_denials():
+    for reply in [
+        "no",
+        "nope",
+        "no wait, it was 4 sets",
+        "change the weight to 200 pounds",
+        "actually it was 4 sets",
+        "that's not right",
+    ]:
+        assert classify_confirmation(reply) is False, reply
+
+
+def test_unclear_replies():
+    for reply in ["absolutely", "yes, cancel it", "sure but make it 4 sets", "I want to change it"]:
+        assert classify_confirmation(reply) is None, reply
+
+
+def test_pending_workout_confirmation_is_routed():
+    router = FastPathRouter()
+    intent = router.route({"transcript": "yep no problem", "pending_workout": PENDING})
+    assert intent == {"type": "confirm_workout", "data": {"confirmed": True}}
+    intent = router.route({"transcript": "no", "pending_workout": PENDING})
+    assert intent == {"type": "confirm_workout", "data": {"confirmed": False}}
+
+
+def test_unclear_reply_is_left_to_the_parser():
+    router = FastPathRouter()
+    assert router.route({"transcript": "absolutely", "pending_workout": PENDING}) is None
+
+
+def test_slot_answers():
+    router = FastPathRouter()
+    state = {"transcript": "3 sets of 10", "collected_workout_data": {"muscle_group": "chest"}}
+    assert router.route(state) == {"type": "log_workout", "data": {"sets": 3, "reps": 10}}
+    state["transcript"] = "3 sets of 10 and then some dips"
+    assert router.route(state) is None
+
+
+def test_extract_slots():
+    slots, leftover = extract_slots("I did three sets of twelve at 100 kg for 45 minutes")
+    assert slots == {"sets": 3, "reps": 12, "weight": "100 kg", "duration": "45 minutes"}
+    assert leftover == []
+
+
+def test_small_talk():
+    router = FastPathRouter()
+    assert router.route({"transcript": "Hey!"}) == {"type": "general_query", "data": {}}
+    assert router.route({"transcript": "I did bench press"}) is None
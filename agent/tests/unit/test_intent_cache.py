@@ -0,0 +1,96 @@
+import asyncio
+
+from agents.intent_cache import IntentCache, SharedIntentStore, hashed_ngram_embedding
+
+VIEW = {"type": "view_workouts", "data": {}}
+
+
+def state(transcript: str, **extra) -> dict:
+    return {"transcript": transcript, **extra}
+
+
+def get(cache: IntentCache, turn: dict):
+    return asyncio.run(cache.get(turn))
+
+
+def test_hit_on_normalized_transcript():
+    cache = IntentCache()
+    cache.put(state("Show my workouts!"), VIEW)
+    assert get(cache, state("show my workouts")) == VIEW
+    assert cache.hits == 1
+
+
+def test_returns_copies():
+    cache = IntentCache()
+    cache.put(state("show my workouts"), VIEW)
+    get(cache, state("show my workouts"))["data"]["muscle_group"] = "legs"
+    assert get(cache, state("show my workouts")) == VIEW
+
+
+def test_context_dependent_turns_are_not_cached():
+    cache = IntentCache()
+    for turn in [
+        state("yes", pending_workout={"id": "w1"}),
+        state("3 sets of 10", collected_workout_data={"muscle_group": "chest"}),
+        state("do that again"),
+    ]:
+        cache.put(turn, VIEW)
+        assert get(cache, turn) is None
+    assert cache.bypassed == 3
+
+
+def test_malformed_intents_are_not_cached():
+    cache = IntentCache()
+    cache.put(state("show my workouts"), {"type": "general_query", "data": {}, "malformed": True})
+    assert not cache.contains(state("show my workouts"))
+
+
+def test_entries_expire():
+    cache = IntentCache(ttl_seconds=0)
+    cache.put(state("show my workouts"), VIEW)
+    assert get(cache, state("show my workouts")) is None
+
+
+def test_lru_eviction():
+    cache = IntentCache(max_size=2)
+    cache.put(state("show my workouts"), VIEW)
+    cache.put(state("what did I do"), VIEW)
+    get(cache, state("show my workouts"))
+    cache.put(state("view my history"), VIEW)
+    assert cache.contains(state("show my workouts"))
+    assert not cache.contains(state("what did I do"))
+
+
+def test_similarity_tier_skips_entities():
+    cache = IntentCache(embed_fn=hashed_ngram_embedding, similarity_threshold=0.8)
+    cache.put(state("show my workouts"), VIEW)
+    assert get(cache, state("show me my workouts")) == VIEW
+    assert cache.similarity_hits == 1
+    assert get(cache, state("show my legs workouts")) is None
+
+
+def test_shared_store_outlives_the_process(tmp_path):
+    first = IntentCache(store=SharedIntentStore(tmp_path))
+    running = IntentCache(store=SharedIntentStore(tmp_path))
+    first.put(state("show my workouts"), VIEW)
+    first._io.shutdown(wait=True)
+
+    # A process started later loads the entry up front
+    later = IntentCache(store=SharedIntentStore(tmp_path))
+    assert later.contains(state("show my workouts"))
+    assert get(later, state("show my workouts")) == VIEW and later.hits == 1
+
+    # A process that was already running finds it on a memory miss
+    assert get(running, state("show my workouts")) == VIEW
+    assert running.shared_hits == 1 and running.hit_rate == 1.0
+    assert get(running, state("view my history")) is None
+
+
+def test_shared_store_skips_expired_entries_and_is_bounded(tmp_path):
+    store = SharedIntentStore(tmp_path, max_entries=2, prune_every=1)
+    store.write("show my workouts", VIEW, expires_at=0)
+    assert store.read("show my workouts") is None
+    for transcript in ["what did I do", "view my history", "show my history"]:
+        store.write(transcript, VIEW, expires_at=2**40)
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert IntentCache(store=store).stats()["size"] == 2
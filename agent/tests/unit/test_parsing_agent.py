@@ -0,0 +1,27 @@
+import asyncio
+
+from agents.intent_cache import IntentCache
+from agents.parsing_agent import ParsingAgent
+
+PENDING = {"id": "chest_custom_1", "muscle_group": "chest", "exercises": ["bench press"], "sets_reps": "3 sets of 10 reps"}
+
+
+def test_pending_workout_is_in_the_parse_prompt():
+    prompt = ParsingAgent.user_prompt({"transcript": "absolutely", "pending_workout": PENDING})
+    assert "chest workout: bench press (3 sets of 10 reps)" in prompt
+    assert 'User message: "absolutely"' in prompt
+    assert "chest" not in ParsingAgent.user_prompt({"transcript": "absolutely"})
+
+
+def test_pending_replies_skip_the_intent_cache():
+    cache = IntentCache()
+    agent = ParsingAgent(intent_cache=cache)
+    cache.put({"transcript": "absolutely"}, {"type": "general_query", "data": {}})
+
+    state = asyncio.run(agent.execute({"transcript": "absolutely", "user_id": "user-1", "pending_workout": PENDING}))
+    assert agent.parse_calls == 1
+    assert cache.hits == 0 and cache.bypassed == 0
+    assert "intent" in state
+
+    asyncio.run(agent.execute({"transcript": "absolutely", "user_id": "user-1"}))
+    assert cache.hits == 1 and agent.parse_calls == 1
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from prompt_templates.prompt_template_loader import PromptTemplateLoader
+
+REQUIRED = {"greeting": {"user"}}
+
+
+def loader_for(tmp_path) -> PromptTemplateLoader:
+    (tmp_path / "greeting.md").write_text("Hi $user!")
+    return PromptTemplateLoader(tmp_path, hot_reload=True, poll_interval=0, required=REQUIRED)
+
+
+def edit(path, text: str):
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+
+def test_renders_and_validates(tmp_path):
+    loader = loader_for(tmp_path)
+    assert loader.render("greeting", user="Sam") == "Hi Sam!"
+    with pytest.raises(KeyError):
+        loader.render("greeting")
+    (tmp_path / "greeting.md").write_text("Hi $who!")
+    with pytest.raises(ValueError):
+        PromptTemplateLoader(tmp_path, required=REQUIRED)
+
+
+def test_hot_reload_keeps_the_last_good_version(tmp_path):
+    loader = loader_for(tmp_path)
+    edit(tmp_path / "greeting.md", "Hello $user!")
+    assert loader.render("greeting", user="Sam") == "Hello Sam!"
+    edit(tmp_path / "greeting.md", "Hello $nme!")
+    assert loader.render("greeting", user="Sam") == "Hello Sam!"
+
+
+def test_unreadable_files_do_not_break_rendering(tmp_path):
+    loader = loader_for(tmp_path)
+    # Still listed by the directory scan, but stat() fails
+    (tmp_path / "greeting.md").unlink()
+    (tmp_path / "greeting.md").symlink_to(tmp_path / "missing.md")
+    assert loader.render("greeting", user="Sam") == "Hi Sam!"
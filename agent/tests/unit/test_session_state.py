@@ -0,0 +1,55 @@
+import asyncio
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from benchmarks.graph_benchmark import synthetic_history
+from graphs.session_state import SessionStateManager
+
+USER_ID = "user-1"
+
+
+def manager(**kwargs) -> SessionStateManager:
+    repository = FakeSupabaseRepository(LatencyModel(0))
+    repository.seed_history(USER_ID, synthetic_history(USER_ID, 30))
+    return SessionStateManager(repository, **kwargs)
+
+
+def test_history_bytes_grow_as_rows_load():
+    sessions = manager()
+    history = sessions.history_for(USER_ID)
+    assert sessions.total_bytes() == 0
+
+    asyncio.run(history.recent(5))
+    first_page = history.bytes
+    assert first_page > 0
+
+    # Rows shared by a filtered window only add a reference each
+    asyncio.run(history.recent(5, muscle_group="legs"))
+    assert first_page < history.bytes < 2 * first_page
+
+    history.record({**synthetic_history(USER_ID, 1)[0], "id": "new"})
+    assert history.bytes > first_page
+    assert sessions.stats()["bytes"] == history.bytes
+
+
+def test_idle_sweep_keeps_connected_users():
+    sessions = manager(idle_seconds=60)
+    sessions.history_for(USER_ID)
+    sessions.history_for("user-2")
+    sessions.end_session("user-2")
+
+    later = sessions._sessions[USER_ID].last_active + 120
+    stats = sessions.sweep(now=later)
+    assert stats["sessions"] == 1
+    assert USER_ID in sessions.session_bytes()
+
+
+def test_memory_sweep_evicts_ended_sessions_first():
+    sessions = manager(max_bytes=1)
+    for user_id in (USER_ID, "user-2"):
+        sessions.repository.seed_history(user_id, synthetic_history(user_id, 5))
+        asyncio.run(sessions.history_for(user_id).recent(5))
+    sessions.end_session("user-2")
+    sessions.max_bytes = sessions.session_bytes()[USER_ID]
+
+    sessions.sweep()
+    assert list(sessions.session_bytes()) == [USER_ID]
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import socket
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from telemetry.tracing import Telemetry
+
+
+class RecordingTracer:
+    """Stands in for the OpenTelemetry tracer and keeps the spans it started."""
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = RecordingSpan(name)
+        self.spans.append(span)
+        yield span
+
+
+class RecordingSpan:
+    def __init__(self, name: str):
+        self.name = name
+        self.events = []
+
+    def add_event(self, name: str):
+        self.events.append(name)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def snapshot(samples: list, written_at: float = None, **counters) -> dict:
+    return {
+        "pid": 1,
+        "written_at": written_at or time.time(),
+        "histograms": {"node.parse": {"samples": samples, "count": len(samples), "total": sum(samples)}},
+        "counters": counters,
+        "gauges": {"session_state.sessions": 1},
+    }
+
+
+def test_timed_stream_is_a_span():
+    telemetry = Telemetry()
+    telemetry.tracer = RecordingTracer()
+
+    async def sentences():
+        for sentence in ["Hi.", "Logged it."]:
+            yield sentence
+
+    async def run():
+        return [s async for s in telemetry.timed_stream("process_command", sentences())]
+
+    assert asyncio.run(run()) == ["Hi.", "Logged it."]
+    [span] = telemetry.tracer.spans
+    assert span.name == "process_command" and span.events == ["first_chunk"]
+    assert telemetry.histograms["process_command"].count == 1
+    assert telemetry.histograms["process_command.first_chunk"].count == 1
+
+
+def test_percentiles_are_computed_over_every_process():
+    merged = Telemetry.merged([snapshot([0.1] * 90, turns=3), snapshot([1.0] * 10, turns=2)])
+    histogram = merged.histograms["node.parse"]
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == 0.1 and histogram.percentile(0.95) == 1.0
+    assert merged.counters["turns"] == 5
+    assert merged.gauges["session_state.sessions"] == 2
+
+
+def test_stale_snapshots_are_dropped(tmp_path):
+    telemetry = Telemetry(metrics_dir=tmp_path, retention=60)
+    (tmp_path / "metrics-101.json").write_text(json.dumps(snapshot([0.2])))
+    (tmp_path / "metrics-102.json").write_text(json.dumps(snapshot([0.3], written_at=time.time() - 120)))
+    (tmp_path / "metrics-103.json").write_text("{torn")
+    telemetry.record("node.parse", 0.1)
+
+    snapshots = telemetry.worker_snapshots()
+    assert sorted(s["histograms"]["node.parse"]["samples"][0] for s in snapshots) == [0.1, 0.2]
+    assert not (tmp_path / "metrics-102.json").exists()
+
+
+def test_one_process_serves_the_merged_metrics(tmp_path, monkeypatch):
+    port = free_port()
+    monkeypatch.setenv("METRICS_PORT", str(port))
+    serving = Telemetry(metrics_dir=tmp_path)
+    serving.record("node.parse", 0.1)
+    serving.start()
+    # Another job process on the host publishes its samples and finds the port taken
+    (tmp_path / "metrics-999999.json").write_text(json.dumps(snapshot([0.2, 0.3], turns=2)))
+    assert not Telemetry(metrics_dir=tmp_path).serve_prometheus(port)
+
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+    finally:
+        serving._stopping.set()
+        serving._metrics_server.shutdown()
+        serving._metrics_server.server_close()
+    assert "gymmando_node_parse_seconds_count 3" in body
+    assert "gymmando_turns_total 2" in body
+    assert (tmp_path / "metrics-999999.json").exists()
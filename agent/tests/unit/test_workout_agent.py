@@ -0,0 +1,57 @@
+import asyncio
+
+from agents.workout_agent import CONFIRM_AGAIN_PROMPT, CORRECTION_PROMPT, WorkoutAgent
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from database.write_behind import WorkoutWriteQueue
+from graphs.session_state import create_session_state
+
+PENDING = {
+    "id": "chest_custom_1",
+    "name": "Chest Session",
+    "muscle_group": "chest",
+    "exercises": ["bench press"],
+    "sets_reps": "3 sets of 10 reps",
+}
+
+
+def reply(tmp_path, transcript: str, intent: dict) -> dict:
+    repository = FakeSupabaseRepository(LatencyModel(0))
+    queue = WorkoutWriteQueue(repository, journal_dir=tmp_path, flush_interval=0.001)
+    agent = WorkoutAgent(repository, write_queue=queue, sessions=create_session_state(repository))
+    state = {"user_id": "user-1", "transcript": transcript, "intent": intent, "pending_workout": dict(PENDING)}
+
+    async def run():
+        result = await agent.execute(state)
+        await queue.close()
+        return result
+
+    return asyncio.run(run())
+
+
+def test_confirmed_workout_is_saved(tmp_path):
+    state = reply(tmp_path, "absolutely", {"type": "confirm_workout", "data": {"confirmed": True}})
+    assert state["workout_data"]["status"] == "success"
+    assert state["pending_workout"] is None
+
+
+def test_denied_workout_asks_what_to_change(tmp_path):
+    state = reply(tmp_path, "nope", {"type": "confirm_workout", "data": {"confirmed": False}})
+    assert state["response"] == CORRECTION_PROMPT
+    assert state["pending_workout"] is None
+
+
+def test_unclear_reply_asks_again(tmp_path):
+    for transcript, intent in [
+        ("absolutely", {"type": "general_query", "data": {}}),
+        ("hmm", {"type": "confirm_workout", "data": {}}),
+        ("show my workouts", {"type": "view_workouts", "data": {}}),
+    ]:
+        state = reply(tmp_path, transcript, intent)
+        assert state["response"] == CONFIRM_AGAIN_PROMPT, transcript
+        assert state["workout_data"]["status"] == "pending_confirmation"
+        assert state["pending_workout"] == PENDING
+
+
+def test_clear_reply_is_classified_without_the_parser(tmp_path):
+    state = reply(tmp_path, "yes save it", {"type": "general_query", "data": {}})
+    assert state["workout_data"]["status"] == "success"
@@ -0,0 +1,146 @@
+import asyncio
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from benchmarks.graph_benchmark import synthetic_history
+from database.workout_history import WorkoutHistory
+
+USER_ID = "user-1"
+
+
+class CountingRepository(FakeSupabaseRepository):
+    """Fake workouts table that counts page fetches."""
+
+    def __init__(self, workouts: list):
+        super().__init__(LatencyModel(0))
+        self.seed_history(USER_ID, workouts)
+        self.fetches = 0
+
+    async def fetch_workout_page(self, *args, **kwargs):
+        self.fetches += 1
+        return await super().fetch_workout_page(*args, **kwargs)
+
+
+def workout(i: int, exercises: list, muscle_group: str = "arms") -> dict:
+    return {
+        "id": f"{muscle_group}_{i}",
+        "user_id": USER_ID,
+        "name": "Session",
+        "muscle_group": muscle_group,
+        "exercises": exercises,
+        "sets_reps": "3 sets of 10 reps",
+        "created_at": f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00",
+    }
+
+
+def test_pages_are_fetched_only_when_needed():
+    repository = CountingRepository(synthetic_history(USER_ID, 50))
+    history = WorkoutHistory(USER_ID, repository, page_size=20)
+
+    async def run():
+        workouts, total = await history.recent(5)
+        assert len(workouts) == 5 and total == 50
+        assert repository.fetches == 1
+        await history.recent(20)
+        assert repository.fetches == 1
+        workouts, _ = await history.recent(30)
+        assert len(workouts) == 30 and repository.fetches == 2
+        assert len(await history.load_more()) == 10
+        assert await history.load_more() == []
+        assert repository.fetches == 3
+
+    asyncio.run(run())
+
+
+def test_since_days_windows_are_reused():
+    repository = CountingRepository(synthetic_history(USER_ID, 60))
+    history = WorkoutHistory(USER_ID, repository)
+
+    async def run():
+        for _ in range(3):
+            await history.recent(5, since=WorkoutHistory.since_days(7))
+
+    asyncio.run(run())
+    assert WorkoutHistory.since_days(7).endswith("T00:00:00+00:00")
+    assert WorkoutHistory.since_days(0) is None
+    assert WorkoutHistory.since_days("soon") is None
+    assert len(history._windows) == 1
+    assert repository.fetches == 1
+
+
+def test_exercise_lookup_is_filtered_by_the_repository():
+    rows = [workout(i, ["bench press"], "chest") for i in range(400)]
+    rows += [workout(i, ["Hammer Curls"]) for i in range(3)]
+    repository = CountingRepository(rows)
+    history = WorkoutHistory(USER_ID, repository)
+
+    workouts, total = asyncio.run(history.recent(5, exercise="hammer curls"))
+    assert total == 3
+    assert [w["id"] for w in workouts] == ["arms_2", "arms_1", "arms_0"]
+    assert repository.fetches == 1
+
+
+def test_lookups_use_the_index_once_history_is_loaded():
+    repository = CountingRepository(synthetic_history(USER_ID, 10))
+    history = WorkoutHistory(USER_ID, repository)
+
+    async def run():
+        await history.recent(20)
+        assert repository.fetches == 1
+        workouts, total = await history.recent(5, muscle_group="legs")
+        assert total == 3 and all(w["muscle_group"] == "legs" for w in workouts)
+        _, total = await history.recent(5, exercise="curls")
+        assert total == 2
+
+    asyncio.run(run())
+    assert repository.fetches == 1
+
+
+def test_unflushed_workouts_are_included():
+    repository = CountingRepository(synthetic_history(USER_ID, 30))
+    unflushed = dict(synthetic_history(USER_ID, 1)[0], id="chest_unflushed")
+    history = WorkoutHistory(USER_ID, repository, pending=lambda user_id: [unflushed])
+
+    workouts, total = asyncio.run(history.recent(5))
+    assert total == 31
+    assert workouts[0]["id"] == "chest_unflushed"
+    _, total = asyncio.run(history.recent(5, muscle_group="legs"))
+    assert total == 8
+
+
+def test_record_updates_loaded_windows():
+    repository = CountingRepository(synthetic_history(USER_ID, 30))
+    history = WorkoutHistory(USER_ID, repository)
+
+    async def run():
+        await history.recent(5)
+        await history.recent(5, muscle_group="chest")
+        await history.recent(5, muscle_group="legs")
+
+    asyncio.run(run())
+    saved = dict(synthetic_history(USER_ID, 1)[0], id="chest_new")
+    history.record(saved)
+    history.record(saved)
+
+    assert history.loaded_latest()["id"] == "chest_new"
+    workouts, total = asyncio.run(history.recent(5, muscle_group="chest"))
+    assert workouts[0]["id"] == "chest_new" and total == 9
+    workouts, total = asyncio.run(history.recent(5, muscle_group="legs"))
+    assert workouts[0]["id"] != "chest_new" and total == 8
+    assert repository.fetches == 3
+
+
+def test_date_windows_use_the_index_once_history_is_loaded():
+    repository = CountingRepository(synthetic_history(USER_ID, 10))
+    history = WorkoutHistory(USER_ID, repository)
+
+    async def run():
+        await history.recent(20)
+        workouts, total = await history.recent(2, since=WorkoutHistory.since_days(7))
+        assert [w["id"] for w in workouts] == ["chest_seed_user-1_0", "legs_seed_user-1_1"]
+        assert total == 4
+        # Combined filters are still counted by the repository
+        _, total = await history.recent(5, muscle_group="chest", exercise="bench press")
+        assert total == 3
+
+    asyncio.run(run())
+    assert repository.fetches == 2
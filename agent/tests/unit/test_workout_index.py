@@ -0,0 +1,60 @@
+from collections import deque
+
+from database.workout_index import WorkoutIndex
+
+
+def workout(i: int, muscle_group: str, exercises: list, date: str) -> dict:
+    return {"id": f"w{i}", "muscle_group": muscle_group, "exercises": exercises, "created_at": f"{date}T10:00:00+00:00"}
+
+
+def build() -> WorkoutIndex:
+    index = WorkoutIndex()
+    # Pages arrive newest first and are appended at the old end
+    index.add(workout(3, "chest", ["Bench Press"], "2026-01-03"), newest=False)
+    index.add(workout(2, "legs", ["squats"], "2026-01-02"), newest=False)
+    index.add(workout(1, "chest", ["bench press", "flyes"], "2026-01-01"), newest=False)
+    # A workout saved during the session goes ahead of everything
+    index.add(workout(4, "Chest", ["flyes"], "2026-01-04"))
+    return index
+
+
+def test_lookups_are_newest_first_with_running_totals():
+    index = build()
+    assert len(index) == 4
+    workouts, total = index.for_muscle_group("chest", limit=2)
+    assert [w["id"] for w in workouts] == ["w4", "w3"] and total == 3
+    workouts, total = index.for_exercise("Bench Press ")
+    assert [w["id"] for w in workouts] == ["w3", "w1"] and total == 2
+    assert index.for_exercise("deadlifts") == ([], 0)
+    assert [w["id"] for w in index.on_date("2026-01-02")] == ["w2"]
+
+
+def test_since_walks_only_the_dates_in_the_window():
+    index = build()
+    workouts, total = index.since("2026-01-02", limit=2)
+    assert [w["id"] for w in workouts] == ["w4", "w3"] and total == 3
+    assert index.since("2026-02-01") == ([], 0)
+    assert index.dates == ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"]
+
+
+def test_duplicates_are_ignored():
+    index = build()
+    assert not index.add(workout(4, "chest", ["flyes"], "2026-01-04"))
+    assert index.muscle_group_counts["chest"] == 3 and index.exercise_counts["flyes"] == 2
+
+
+def test_limited_lookups_do_not_copy_the_bucket():
+    class CountingDeque(deque):
+        reads = 0
+
+        def __iter__(self):
+            for item in super().__iter__():
+                CountingDeque.reads += 1
+                yield item
+
+    index = WorkoutIndex()
+    index.by_muscle_group["chest"] = CountingDeque({"id": f"w{i}"} for i in range(10_000))
+    index.muscle_group_counts["chest"] = 10_000
+    workouts, total = index.for_muscle_group("chest", limit=5)
+    assert len(workouts) == 5 and total == 10_000
+    assert CountingDeque.reads == 5
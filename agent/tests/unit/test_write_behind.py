@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+from postgrest.exceptions import APIError
+
+from benchmarks.fakes import FakeSupabaseRepository, LatencyModel
+from database.write_behind import DEAD_LETTER_FILE, WorkoutWriteQueue, _read_pending, is_permanent
+
+
+def workout(i: int, user_id: str = "user-1") -> dict:
+    return {
+        "id": f"chest_{i}",
+        "user_id": user_id,
+        "muscle_group": "chest",
+        "exercises": ["bench press"],
+        "created_at": f"2026-01-01T00:00:{i:02d}+00:00",
+    }
+
+
+class FlakyRepository(FakeSupabaseRepository):
+    """Fake workouts table that fails the first upserts, or rejects bad rows."""
+
+    def __init__(self, transient_failures: int = 0, bad_ids: tuple = ()):
+        super().__init__(LatencyModel(0))
+        self.transient_failures = transient_failures
+        self.bad_ids = set(bad_ids)
+        self.calls = 0
+
+    async def upsert_workouts(self, workouts: list) -> list:
+        self.calls += 1
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("connection reset")
+        if any(w["id"] in self.bad_ids for w in workouts):
+            raise APIError({"code": "23502", "message": "null value in column \"name\""})
+        return await super().upsert_workouts(workouts)
+
+
+def queue_for(repository, journal_dir) -> WorkoutWriteQueue:
+    return WorkoutWriteQueue(repository, journal_dir=journal_dir, flush_interval=0.001, max_backoff=0.01)
+
+
+def stored_ids(repository, user_id: str = "user-1") -> set:
+    return {row["id"] for row in repository.rows.get(user_id, [])}
+
+
+def test_workouts_are_flushed_and_journal_removed(tmp_path):
+    repository = FlakyRepository()
+    queue = queue_for(repository, tmp_path)
+
+    async def run():
+        for i in range(5):
+            await queue.enqueue(workout(i))
+        assert [w["id"] for w in queue.pending_for("user-1")][0] == "chest_4"
+        assert queue.pending_for("user-2") == []
+        await queue.close()
+
+    asyncio.run(run())
+    assert stored_ids(repository) == {f"chest_{i}" for i in range(5)}
+    assert queue.flushed == 5 and queue.pending_count == 0
+    assert list(tmp_path.glob("workouts-*.jsonl")) == []
+
+
+def test_transient_errors_are_retried(tmp_path):
+    repository = FlakyRepository(transient_failures=2)
+    queue = queue_for(repository, tmp_path)
+
+    async def run():
+        await queue.enqueue(workout(0))
+        await queue.close()
+
+    asyncio.run(run())
+    assert stored_ids(repository) == {"chest_0"}
+    assert queue.failed_attempts == 2 and queue.dead_lettered == 0
+
+
+def test_bad_rows_are_dead_lettered(tmp_path):
+    repository = FlakyRepository(bad_ids=("chest_3",))
+    queue = queue_for(repository, tmp_path)
+
+    async def run():
+        await asyncio.gather(*(queue.enqueue(workout(i)) for i in range(7)))
+        await queue.close()
+
+    asyncio.run(run())
+    assert stored_ids(repository) == {f"chest_{i}" for i in range(7)} - {"chest_3"}
+    assert queue.flushed == 6 and queue.dead_lettered == 1
+    lines = (tmp_path / DEAD_LETTER_FILE).read_text().splitlines()
+    assert [json.loads(line)["row"]["id"] for line in lines] == ["chest_3"]
+
+
+def test_orphaned_journal_is_replayed(tmp_path):
+    orphan = tmp_path / "workouts-1-dead.jsonl"
+    entries = [
+        {"op": "insert", "id": "chest_0", "row": workout(0)},
+        {"op": "insert", "id": "chest_1", "row": workout(1)},
+        {"op": "ack", "ids": ["chest_0"]},
+    ]
+    orphan.write_text("".join(json.dumps(e) + "\n" for e in entries) + '{"op": "ins')
+    assert list(_read_pending(orphan)) == ["chest_1"]
+
+    repository = FlakyRepository()
+    queue = queue_for(repository, tmp_path)
+
+    async def run():
+        await queue.start()
+        await queue.close()
+
+    asyncio.run(run())
+    assert stored_ids(repository) == {"chest_1"}
+    assert not orphan.exists()
+
+
+def test_unflushed_writes_stay_in_the_journal(tmp_path):
+    queue = queue_for(FlakyRepository(transient_failures=1000), tmp_path)
+
+    async def run():
+        await queue.enqueue(workout(0))
+        await queue.close(timeout=0.05)
+
+    asyncio.run(run())
+    journals = list(tmp_path.glob("workouts-*.jsonl"))
+    assert len(journals) == 1
+    assert list(_read_pending(journals[0])) == ["chest_0"]
+
+
+def test_permanent_errors():
+    assert is_permanent(APIError({"code": "23505", "message": "duplicate key"}))
+    assert is_permanent(APIError({"code": "PGRST204", "message": "unknown column"}))
+    assert is_permanent(TypeError("Object of type set is not JSON serializable"))
+    assert not is_permanent(APIError({"code": "57014", "message": "statement timeout"}))
+    assert not is_permanent(ConnectionError("connection reset"))
@@ -0,0 +1,254 @@
+"""
+Content-addressed cache of synthesized speech.
+
+Audio is keyed by a hash of (voice, sentence text), so a sentence that is
+spoken again, such as a missing-field prompt, a confirmation reply or a
+greeting, is played from the cache instead of being synthesized again.
+Entries live in an in-memory LRU bounded by bytes and, when a directory is
+configured, in WAV files on disk that survive restarts. The disk tier is
+shared by every job process on the host, so its budget covers the whole
+directory: after each write the directory is rescanned and the least
+recently used files (by mtime, which reads refresh) are removed first.
+`tts.prerender` fills it with the known static phrases at deploy time.
+
+Configuration:
+- TTS_CACHE=0 disables the cache.
+- TTS_CACHE_DIR sets the on-disk cache directory (default agent/data/tts_cache).
+- TTS_CACHE_MEMORY_MB is the in-memory budget per process (default 32).
+- TTS_CACHE_DISK_MB is the on-disk budget for the directory (default 256).
+- TTS_CACHE_MAX_CHARS: longer sentences are not cached, since they are
+  mostly one-off workout lists (default 160).
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from livekit import rtc
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "tts_cache"
+FRAME_MS = 100  # Cached audio is replayed in 100 ms frames
+
+
+@dataclass
+class CachedAudio:
+    """Raw 16-bit PCM for one sentence."""
+
+    pcm: bytes
+    sample_rate: int
+    num_channels: int
+
+    @classmethod
+    def from_frames(cls, frames: list) -> "CachedAudio":
+        first = frames[0]
+        return cls(
+            pcm=b"".join(bytes(frame.data) for frame in frames),
+            sample_rate=first.sample_rate,
+            num_channels=first.num_channels,
+        )
+
+    def frames(self) -> Iterator[rtc.AudioFrame]:
+        bytes_per_frame = self.sample_rate * FRAME_MS // 1000 * self.num_channels * 2
+        for start in range(0, len(self.pcm), bytes_per_frame):
+            chunk = self.pcm[start:start + bytes_per_frame]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (2 * self.num_channels),
+            )
+
+
+class TTSAudioCache:
+    """Two-tier (memory, disk) LRU cache of sentence audio for one voice."""
+
+    def __init__(
+        self,
+        voice: str,
+        directory: Optional[Path] = None,
+        max_memory_bytes: int = 32 * 2**20,
+        max_disk_bytes: int = 256 * 2**20,
+        max_chars: int = 160,
+    ):
+        self.voice = voice
+        self.directory = Path(directory) if directory else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_chars = max_chars
+
+        self._memory: OrderedDict = OrderedDict()  # key -> CachedAudio
+        self._memory_bytes = 0
+        # The directory as of the last scan: key -> file size, LRU first
+        self._disk: OrderedDict = OrderedDict()
+        self._disk_bytes = 0
+        self._writing: set = set()  # Keys this process is writing
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
+
+        # Hit-rate metrics
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk, self._disk_bytes = self._scan()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.voice}\0{text.strip()}".encode()).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(text.strip()) <= self.max_chars
+
+    async def _run_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    async def get(self, text: str) -> Optional[CachedAudio]:
+        """Audio for a sentence, from memory or disk, or None."""
+        if not self.cacheable(text):
+            return None
+        key = self.key(text)
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return audio
+        if key in self._disk:
+            audio = await self._run_io(self._read, key)
+            if audio is not None:
+                self._disk.move_to_end(key)
+                self._remember(key, audio)
+                self.hits += 1
+                return audio
+        self.misses += 1
+        return None
+
+    async def put(self, text: str, audio: CachedAudio):
+        """Cache a sentence's audio in memory and, if configured, on disk."""
+        if not self.cacheable(text) or not audio.pcm:
+            return
+        key = self.key(text)
+        self._remember(key, audio)
+        if self.directory and key not in self._disk and key not in self._writing:
+            self._writing.add(key)  # So a concurrent put doesn't write it twice
+            try:
+                self._disk, self._disk_bytes = await self._run_io(self._write_and_trim, key, audio)
+            finally:
+                self._writing.discard(key)
+
+    def _remember(self, key: str, audio: CachedAudio):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio.pcm)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.pcm)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def _read(self, key: str) -> Optional[CachedAudio]:
+        path = self._path(key)
+        try:
+            with wave.open(str(path), "rb") as f:
+                audio = CachedAudio(
+                    pcm=f.readframes(f.getnframes()),
+                    sample_rate=f.getframerate(),
+                    num_channels=f.getnchannels(),
+                )
+            os.utime(path)  # Recency for the LRU order after a restart
+            return audio
+        except (OSError, wave.Error, EOFError):
+            return None
+
+    def _write(self, key: str, audio: CachedAudio):
+        path = self._path(key)
+        # Written under a name unique to this write, so readers never see a
+        # partial file and processes writing the same sentence don't collide
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            with wave.open(str(tmp_path), "wb") as f:
+                f.setnchannels(audio.num_channels)
+                f.setsampwidth(2)
+                f.setframerate(audio.sample_rate)
+                f.writeframes(audio.pcm)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _scan(self) -> tuple:
+        """`(files, total bytes)` for the directory, files LRU first."""
+        files = []
+        for path in self.directory.glob("*.wav"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        files.sort()
+        return OrderedDict((key, size) for _, key, size in files), sum(size for _, _, size in files)
+
+    def _write_and_trim(self, key: str, audio: CachedAudio) -> tuple:
+        """Write an entry, then evict the oldest files until the directory fits the budget."""
+        self._write(key, audio)
+        disk, total = self._scan()
+        while total > self.max_disk_bytes and len(disk) > 1:
+            evicted, size = disk.popitem(last=False)
+            total -= size
+            self._path(evicted).unlink(missing_ok=True)
+        return disk, total
+
+    async def prerender(self, tts, sentences: list, concurrency: int = 4) -> int:
+        """Synthesize the sentences not cached yet; returns how many were added."""
+        limit = asyncio.Semaphore(concurrency)
+        rendered = 0
+
+        async def render(sentence: str):
+            nonlocal rendered
+            if not self.cacheable(sentence) or await self.get(sentence) is not None:
+                return
+            async with limit:
+                async with tts.synthesize(sentence) as stream:
+                    frames = [ev.frame async for ev in stream]
+            if frames:
+                await self.put(sentence, CachedAudio.from_frames(frames))
+                rendered += 1
+
+        await asyncio.gather(*(render(s) for s in sentences))
+        return rendered
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def create_audio_cache(voice: str) -> Optional[TTSAudioCache]:
+    """Create the audio cache configured by environment variables, or None if disabled."""
+    if os.getenv("TTS_CACHE", "1") != "1":
+        return None
+    return TTSAudioCache(
+        voice=voice,
+        directory=Path(os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR)),
+        max_memory_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 2**20),
+        max_disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "256")) * 2**20),
+        max_chars=int(os.getenv("TTS_CACHE_MAX_CHARS", "160")),
+    )
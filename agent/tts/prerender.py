@@ -0,0 +1,91 @@
+"""
+Pre-render the audio of known static phrases into the TTS cache.
+
+Run at deploy time (from agent/), so the first user to hear a phrase doesn't
+wait for synthesis:
+    python -m tts.prerender
+    python -m tts.prerender --dry-run   # list the sentences only
+
+Phrases are split into sentences the same way `GymmandoAssistant.tts_node`
+splits speech, so the cache keys match what is spoken.
+"""
+
+import argparse
+import asyncio
+from string import Template
+
+from agents.greetings import SEED_GREETINGS, create_greeting_pool
+from agents.response_templates import PHRASE_BANKS
+from agents.workout_agent import CONFIRM_AGAIN_PROMPT, CORRECTION_PROMPT, MISSING_FIELD_PROMPTS
+from main import (
+    ERROR_RESPONSE,
+    FALLBACK_RESPONSE,
+    TTS_CACHE_VOICE,
+    TTS_MODEL,
+    TTS_VOICE,
+    sentences_of,
+)
+from tts.audio_cache import create_audio_cache
+
+
+def static_phrases() -> list:
+    """Every fixed phrase the agent speaks, across personalities."""
+    phrases = [FALLBACK_RESPONSE, ERROR_RESPONSE, CORRECTION_PROMPT, CONFIRM_AGAIN_PROMPT]
+    # Seed greetings plus whatever the saved pool holds
+    phrases += [g for seeds in SEED_GREETINGS.values() for g in seeds]
+    phrases += create_greeting_pool().all_greetings()
+    phrases += list(MISSING_FIELD_PROMPTS.values())
+    for mode, statuses in PHRASE_BANKS.items():
+        phrases.append(f"Switched to {mode} mode!")
+        for status, bank in statuses.items():
+            for phrase in bank:
+                template = Template(phrase)
+                identifiers = set(template.get_identifiers())
+                if not identifiers:
+                    phrases.append(phrase)
+                elif identifiers == {"question"}:
+                    # Missing-field prompts are the only questions asked
+                    phrases += [template.substitute(question=q) for q in MISSING_FIELD_PROMPTS.values()]
+                else:
+                    # Only the fixed sentences around the slots are reusable
+                    phrases += [s for s in sentences_of(phrase) if "$" not in s]
+    return phrases
+
+
+def static_sentences() -> list:
+    seen = {}
+    for phrase in static_phrases():
+        for sentence in sentences_of(phrase):
+            seen.setdefault(sentence.strip(), None)
+    return list(seen)
+
+
+async def prerender(sentences: list, concurrency: int):
+    from livekit.plugins import openai
+
+    cache = create_audio_cache(voice=TTS_CACHE_VOICE)
+    if cache is None:
+        print("⚠️  TTS_CACHE is disabled; nothing to pre-render")
+        return
+    tts = openai.TTS(model=TTS_MODEL, voice=TTS_VOICE)
+    rendered = await cache.prerender(tts, sentences, concurrency)
+    print(f"🔊 Pre-rendered {rendered} new sentence(s); cache: {cache.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render static phrases into the TTS cache")
+    parser.add_argument("--dry-run", action="store_true", help="List the sentences without synthesizing")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    sentences = static_sentences()
+    if args.dry_run:
+        for sentence in sentences:
+            print(sentence)
+        print(f"\n{len(sentences)} sentence(s)")
+        return
+    asyncio.run(prerender(sentences, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
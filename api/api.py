@@ -1,4 +1,9 @@
+import asyncio
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -7,84 +12,170 @@ from livekit import api
 import firebase_admin
 from firebase_admin import credentials, auth
 
+from token_cache import (
+    FirebaseCertificateCache,
+    MintedTokenCache,
+    UnknownSigningKeyError,
+    VerifiedTokenCache,
+    verify_with_certs,
+)
+
 load_dotenv()
 
-app = FastAPI()
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+log = logging.getLogger("gymmando.api")
+
+token_cache = VerifiedTokenCache(max_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+cert_cache = FirebaseCertificateCache()
+minted_tokens = MintedTokenCache()
+
+# LiveKit signing credentials are read once per process
+LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
+LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET")
+LIVEKIT_TOKEN_TTL = timedelta(hours=int(os.getenv("LIVEKIT_TOKEN_TTL_HOURS", "6")))
+ROOM_PREFIX = os.getenv("ROOM_PREFIX", "gym")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep Firebase signing certificates fresh so verification never waits on a download
+    cert_cache.start()
+    yield
+    await cert_cache.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Initialize Firebase Admin SDK
 firebase_credentials_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
 if firebase_credentials_path and os.path.exists(firebase_credentials_path):
     cred = credentials.Certificate(firebase_credentials_path)
     firebase_admin.initialize_app(cred)
-    print("✅ Firebase Admin SDK initialized")
+    log.info("firebase_initialized")
 else:
     # Try using service account from environment variable (for GCP deployment)
     try:
         firebase_admin.initialize_app()
-        print("✅ Firebase Admin SDK initialized (using default credentials)")
+        log.info("firebase_initialized credentials=default")
     except Exception as e:
-        print(f"⚠️  Firebase Admin SDK not initialized: {e}")
-        print("⚠️  Token verification will be disabled")
+        log.warning("firebase_not_initialized error=%s (token verification disabled)", e)
 
 
-def verify_firebase_token(id_token: str) -> Optional[dict]:
-    """Verify Firebase ID token and return decoded token."""
+def _get_firebase_project_id() -> Optional[str]:
+    """Project ID that Firebase ID tokens must be issued for."""
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        project_id = firebase_admin.get_app().project_id
+    except ValueError:
+        project_id = None
+    return project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+
+
+firebase_project_id = _get_firebase_project_id()
+
+
+async def verify_firebase_token(id_token: str) -> Optional[dict]:
+    """Verify Firebase ID token and return decoded token."""
+    decoded_token = token_cache.get(id_token)
+    if decoded_token:
         return decoded_token
+    try:
+        decoded_token = None
+        if cert_cache.fresh and firebase_project_id:
+            try:
+                decoded_token = verify_with_certs(
+                    id_token, cert_cache.certs, firebase_project_id
+                )
+            except UnknownSigningKeyError:
+                pass  # Keys rotated since our last refresh; let the SDK fetch them
+        if decoded_token is None:
+            # The SDK may download certificates; keep it off the event loop
+            decoded_token = await asyncio.to_thread(auth.verify_id_token, id_token)
     except Exception as e:
-        print(f"❌ Firebase token verification failed: {e}")
+        log.warning("token_verification_failed error=%s", e)
         return None
+    token_cache.put(id_token, decoded_token)
+    return decoded_token
+
 
+def room_for_user(user_id: str) -> str:
+    """Each user gets their own room so sessions never contend."""
+    return f"{ROOM_PREFIX}-{user_id}"
 
-def create_livekit_token(user_id: str, user_name: str = "Gym User"):
-    """Create LiveKit access token with user identity."""
-    token = api.AccessToken(
-        api_key=os.getenv("LIVEKIT_API_KEY"), api_secret=os.getenv("LIVEKIT_API_SECRET")
-    )
+
+def create_livekit_token(user_id: str, user_name: str = "Gym User") -> dict:
+    """Create (or reuse) a LiveKit access token with user identity."""
+    room = room_for_user(user_id)
+    key = (user_id, user_name, room)
+    cached = minted_tokens.get(key)
+    if cached:
+        token, expires_at = cached
+        return {"token": token, "room": room, "expires_at": int(expires_at)}
+
+    token = api.AccessToken(api_key=LIVEKIT_API_KEY, api_secret=LIVEKIT_API_SECRET)
 
     # Set identity to user_id (Firebase UID) - this will be available as participant.identity
     token.with_identity(user_id)
     token.with_name(user_name)
-    token.with_grants(api.VideoGrants(room_join=True, room="gym-room"))
+    token.with_grants(api.VideoGrants(room_join=True, room=room))
+    token.with_ttl(LIVEKIT_TOKEN_TTL)
 
-    return token.to_jwt()
+    jwt = token.to_jwt()
+    expires_at = time.time() + LIVEKIT_TOKEN_TTL.total_seconds()
+    minted_tokens.put(key, jwt, expires_at)
+    return {"token": jwt, "room": room, "expires_at": int(expires_at)}
 
 
-@app.get("/token")
-def get_token(authorization: Optional[str] = Header(None)):
-    """
-    Generate LiveKit token after verifying Firebase authentication.
-    
-    Expects: Authorization header with "Bearer <firebase_id_token>"
-    """
+async def issue_token(authorization: Optional[str]) -> dict:
+    """Verify the Firebase bearer token and return a LiveKit token for the user."""
     if not authorization:
-        print("❌ No authorization header provided")
+        log.info("authorization_missing")
         raise HTTPException(status_code=401, detail="Authorization header required")
-    
+
     # Extract token from "Bearer <token>"
     try:
         scheme, id_token = authorization.split(" ", 1)
         if scheme.lower() != "bearer":
             raise ValueError("Invalid authorization scheme")
-        print(f"✅ Extracted Firebase token (length: {len(id_token)})")
     except ValueError as e:
-        print(f"❌ Invalid authorization header format: {e}")
+        log.info("authorization_malformed error=%s", e)
         raise HTTPException(status_code=401, detail="Invalid authorization header format")
-    
+
     # Verify Firebase token
-    decoded_token = verify_firebase_token(id_token)
+    decoded_token = await verify_firebase_token(id_token)
     if not decoded_token:
-        print("❌ Firebase token verification failed")
+        log.info("token_rejected")
         raise HTTPException(status_code=401, detail="Invalid or expired Firebase token")
-    
+
     # Extract user info
     user_id = decoded_token.get("uid")
     user_name = decoded_token.get("name", decoded_token.get("email", "Gym User"))
-    
-    print(f"✅ Verified Firebase user: {user_id} ({user_name})")
-    
+
     # Generate LiveKit token with user identity
-    token = create_livekit_token(user_id, user_name)
-    print(f"✅ Generated LiveKit token with identity: {user_id}")
-    return {"token": token}
+    return create_livekit_token(user_id, user_name)
+
+
+@app.get("/token")
+async def get_token(authorization: Optional[str] = Header(None)):
+    """
+    Generate LiveKit token after verifying Firebase authentication.
+    
+    Expects: Authorization header with "Bearer <firebase_id_token>"
+    Returns the token and the user's room.
+    """
+    issued = await issue_token(authorization)
+    return {"token": issued["token"], "room": issued["room"]}
+
+
+@app.get("/token/prefetch")
+async def prefetch_token(authorization: Optional[str] = Header(None)):
+    """
+    Fetch a LiveKit token ahead of time, e.g. when the app opens.
+
+    The same token is returned by /token until it is close to expiring, so
+    clients can connect as soon as the user taps "start". `expires_at` (epoch
+    seconds) tells the client when to prefetch again.
+    """
+    return await issue_token(authorization)
@@ -0,0 +1,105 @@
+"""
+Load test for the /token endpoint.
+
+Starts the API under uvicorn with an increasing number of worker processes and
+measures /token throughput and latency at each setting.
+
+Usage:
+    LOADTEST_ID_TOKEN=<firebase_id_token> python loadtest.py --workers 1 2 4
+
+Without LOADTEST_ID_TOKEN the requests are unauthenticated and measure the
+401 path only.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"API did not start at {url}")
+
+
+async def run_load(url: str, headers: dict, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses: dict = {}
+    remaining = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure /token throughput per uvicorn worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/token")
+    args = parser.parse_args()
+
+    id_token = os.getenv("LOADTEST_ID_TOKEN")
+    headers = {"Authorization": f"Bearer {id_token}"} if id_token else {}
+    if not id_token:
+        print("⚠️  LOADTEST_ID_TOKEN not set, measuring unauthenticated requests")
+
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "api:app",
+                "--port", str(args.port),
+                "--workers", str(workers),
+                "--log-level", "warning",
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            await wait_until_ready(url)
+            # Warm up caches in every worker before measuring
+            await run_load(url, headers, workers * 50, args.concurrency)
+            result = await run_load(url, headers, args.requests, args.concurrency)
+            print(
+                f"📊 workers={workers}: {result['rps']:.0f} req/s, "
+                f"p50 {result['p50_ms']:.1f}ms, p95 {result['p95_ms']:.1f}ms, "
+                f"statuses {result['statuses']}"
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
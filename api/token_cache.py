@@ -0,0 +1,159 @@
+"""
+Caching for Firebase ID token verification and LiveKit token minting.
+
+`VerifiedTokenCache` remembers tokens that already passed verification, keyed
+by a SHA-256 of the token and valid until the token's own `exp`, with an LRU
+size cap. `FirebaseCertificateCache` downloads Google's public signing
+certificates in the background and refreshes them before they expire, so
+verifying a new token is a local signature check that never waits on a
+certificate download. `MintedTokenCache` hands back a user's existing LiveKit
+token while it still has plenty of lifetime, so repeat requests skip signing.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+from google.auth import jwt
+
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+log = logging.getLogger("gymmando.token_cache")
+
+
+class UnknownSigningKeyError(ValueError):
+    """The token's key ID is not in the cached certificates (keys may have rotated)."""
+
+
+class VerifiedTokenCache:
+    """LRU cache of verified token claims, bounded by each token's expiry."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # token hash -> claims
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+    def get(self, id_token: str) -> Optional[dict]:
+        key = self._key(id_token)
+        claims = self._entries.get(key)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims.get("exp", 0) <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, id_token: str, claims: dict):
+        if claims.get("exp", 0) <= time.time():
+            return
+        key = self._key(id_token)
+        self._entries[key] = claims
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class MintedTokenCache:
+    """Reuses a user's LiveKit token while it has enough lifetime left."""
+
+    def __init__(self, min_remaining: float = 1800.0, max_size: int = 10000):
+        self.min_remaining = min_remaining
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # key -> (jwt, expires_at)
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] - time.time() < self.min_remaining:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, token: str, expires_at: float):
+        self._entries[key] = (token, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class FirebaseCertificateCache:
+    """Keeps Firebase's public signing certificates fresh in the background."""
+
+    def __init__(self, refresh_margin: float = 300.0, retry_interval: float = 30.0):
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.certs: dict = {}
+        self.expires_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def fresh(self) -> bool:
+        return bool(self.certs) and time.time() < self.expires_at
+
+    async def refresh(self, client: httpx.AsyncClient):
+        response = await client.get(FIREBASE_CERTS_URL, timeout=10.0)
+        response.raise_for_status()
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        # Swap in a new dict so readers never see a partial update
+        self.certs = response.json()
+        self.expires_at = time.time() + max_age
+        log.info("firebase_certs_refreshed keys=%d max_age=%d", len(self.certs), max_age)
+
+    async def _refresh_loop(self):
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    await self.refresh(client)
+                    delay = max(self.expires_at - time.time() - self.refresh_margin, self.retry_interval)
+                except Exception as e:
+                    log.warning("firebase_certs_refresh_failed error=%s", e)
+                    delay = self.retry_interval
+                await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+def verify_with_certs(id_token: str, certs: dict, project_id: str) -> dict:
+    """Verify a Firebase ID token locally against prefetched certificates.
+
+    Mirrors the checks `firebase_admin.auth.verify_id_token` performs
+    (signature, algorithm, audience, issuer, expiry and subject) and raises
+    ValueError on any failure.
+    """
+    header = jwt.decode_header(id_token)
+    if header.get("alg") != "RS256":
+        raise ValueError(f"Unexpected token algorithm: {header.get('alg')}")
+    if header.get("kid") not in certs:
+        raise UnknownSigningKeyError("Token signed with an unknown key")
+    claims = jwt.decode(id_token, certs=certs, audience=project_id)
+    if claims.get("iss") != FIREBASE_ISSUER_PREFIX + project_id:
+        raise ValueError(f"Unexpected token issuer: {claims.get('iss')}")
+    subject = claims.get("sub")
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise ValueError("Token has an invalid subject")
+    claims["uid"] = subject
+    return claims